@@ -7,10 +7,14 @@
 # License, or (at your option) any later version.
 
 from django.contrib.admin              import RelatedOnlyFieldListFilter
+from django.contrib                    import messages
 from django.contrib.contenttypes.admin import GenericTabularInline
+from django.core.exceptions            import PermissionDenied
+from django.http                       import HttpRequest
 from django.utils.translation          import gettext_lazy as _
 from import_export.fields              import Field
 from unfold.admin                      import TabularInline
+from unfold.decorators                 import action
 
 from openbook.admin                    import CustomModelAdmin
 from .mixins.audit                     import created_modified_by_fields
@@ -75,6 +79,7 @@ class AccessRequestAdmin(CustomModelAdmin):
     ordering            = ["scope_type", "scope_uuid", "role", "user"]
     search_fields       = ["role__name", "user__username", "user__first_name", "user__last_name"]
     readonly_fields     = ["decision_date", *created_modified_by_fields]
+    actions             = ["accept_requests", "deny_requests"]
 
     list_filter = [
         scope_type_filter,
@@ -130,4 +135,28 @@ class AccessRequestAdmin(CustomModelAdmin):
                 ("decision", "decision_date"),
             ],
         }),
-    ]
\ No newline at end of file
+    ]
+
+    @action(description=_("Accept selected access requests"))
+    def accept_requests(self, request: HttpRequest, queryset):
+        self._bulk_decide(request, queryset, AccessRequest.Decision.ACCEPTED)
+
+    @action(description=_("Deny selected access requests"))
+    def deny_requests(self, request: HttpRequest, queryset):
+        self._bulk_decide(request, queryset, AccessRequest.Decision.DENIED)
+
+    def _bulk_decide(self, request: HttpRequest, queryset, decision: AccessRequest.Decision):
+        """
+        Accept or deny all selected access requests at once.
+        """
+        try:
+            result = AccessRequest.bulk_decide(
+                ids             = list(queryset.values_list("pk", flat=True)),
+                decision        = decision,
+                permission_user = request.user,
+            )
+        except PermissionDenied:
+            self.message_user(request, _("You are not allowed to decide all selected access requests."), messages.ERROR)
+            return
+
+        self.message_user(request, _("{decided} access requests changed, {unchanged} unchanged.").format(**result), messages.SUCCESS)
@@ -12,9 +12,11 @@ from import_export.fields              import Field
 
 from openbook.admin                    import CustomModelAdmin
 from openbook.admin                    import ImportExportModelResource
+from openbook.core.models.mixins.i18n  import prefetch_translations
 from .mixins.scope                     import scope_type_filter
 from ..models.allowed_role_permission  import AllowedRolePermission
 from ..models.mixins.scope             import ScopedRolesMixin
+from ..models.permission_text          import PermissionText
 from ..import_export.permission        import PermissionForeignKeyWidget
 from ..import_export.scope             import ScopeTypeForeignKeyWidget
 from ..validators                      import validate_scope_type
@@ -67,6 +69,14 @@ class AllowedRolePermissionAdmin(CustomModelAdmin):
     list_filter        = [scope_type_filter, ("permission", RelatedOnlyFieldListFilter)]
     search_fields      = ["scope_type", "permission__codename"]
 
+    def get_queryset(self, request):
+        """
+        Prefetch the permissions with their translations for the changelist.
+        """
+        return super().get_queryset(request).select_related("scope_type", "permission").prefetch_related(
+            prefetch_translations(PermissionText, "permission__translations"),
+        )
+
     fieldsets = [
         (None, {
             "fields": [("scope_type", "permission")]
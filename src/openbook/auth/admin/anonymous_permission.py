@@ -6,13 +6,15 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from django.contrib.admin          import RelatedOnlyFieldListFilter
-from import_export.fields          import Field
+from django.contrib.admin             import RelatedOnlyFieldListFilter
+from import_export.fields             import Field
 
-from openbook.admin                import CustomModelAdmin
-from openbook.admin                import ImportExportModelResource
-from ..models.anonymous_permission import AnonymousPermission
-from ..import_export.permission    import PermissionForeignKeyWidget
+from openbook.admin                   import CustomModelAdmin
+from openbook.admin                   import ImportExportModelResource
+from openbook.core.models.mixins.i18n import prefetch_translations
+from ..models.anonymous_permission    import AnonymousPermission
+from ..models.permission_text         import PermissionText
+from ..import_export.permission       import PermissionForeignKeyWidget
 
 class AnonymousPermissionResource(ImportExportModelResource):
     permission = Field(attribute="permission", widget=PermissionForeignKeyWidget())
@@ -29,6 +31,14 @@ class AnonymousPermissionAdmin(CustomModelAdmin):
     list_filter        = [("permission", RelatedOnlyFieldListFilter)]
     search_fields      = ["permission__codename"]
 
+    def get_queryset(self, request):
+        """
+        Prefetch the permissions with their translations for the changelist.
+        """
+        return super().get_queryset(request).select_related("permission").prefetch_related(
+            prefetch_translations(PermissionText, "permission__translations"),
+        )
+
     fieldsets = [
         (None, {
             "fields": ["permission"]
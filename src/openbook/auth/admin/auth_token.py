@@ -34,12 +34,12 @@ class AuthTokenAdmin(CustomModelAdmin):
     model               = AuthToken
     resource_classes    = [AuthTokenResource]
     ordering            = ["user__username", "token"]
-    list_display        = ["user__username", "name", "is_active", "start_date", "end_date", *created_modified_by_fields]
+    list_display        = ["user__username", "name", "is_active", "start_date", "end_date", "last_used_at", "request_count", *created_modified_by_fields]
     list_display_links  = ["user__username", "name", "is_active", "start_date", "end_date"]
     list_filter         = ["user__username", "is_active", "start_date", "end_date", *created_modified_by_filter]
     list_select_related = ["user", *created_modified_by_related]
     search_fields       = ["user__username", "token", "name" "description"]
-    readonly_fields     = ["token", *created_modified_by_fields]
+    readonly_fields     = ["token", "last_used_at", "request_count", *created_modified_by_fields]
 
     fieldsets = [
         (None, {
@@ -49,6 +49,10 @@ class AuthTokenAdmin(CustomModelAdmin):
             "classes": ["tab"],
             "fields": ["start_date", "end_date", "is_active"]
         }),
+        (_("Usage"), {
+            "classes": ["tab"],
+            "fields": ["last_used_at", "request_count"]
+        }),
         (_("Description"), {
             "classes": ["tab"],
             "fields": ["description", "text_format"],
@@ -8,9 +8,12 @@
 
 from django.contrib.admin                import RelatedOnlyFieldListFilter
 from django.contrib.contenttypes.admin   import GenericTabularInline
+from django.http                         import HttpRequest
+from django.http                         import HttpResponse
 from django.utils.translation            import gettext_lazy as _
 from import_export.fields                import Field
 from unfold.admin                        import TabularInline
+from unfold.decorators                   import action
 
 from openbook.admin                      import CustomModelAdmin
 from openbook.core.import_export.boolean import BooleanWidget
@@ -25,6 +28,7 @@ from .mixins.scope                       import ScopeRoleFieldInlineMixin
 from .mixins.scope                       import scope_type_filter
 from ..import_export.role                import RoleForeignKeyWidget
 from ..models.enrollment_method          import EnrollmentMethod
+from ..views.bulk_enrollment             import EnrollmentMethodBulkEnrollmentView
 
 class EnrollmentMethodResource(ScopeResourceMixin):
     role      = Field(attribute="role",      widget=RoleForeignKeyWidget())
@@ -35,7 +39,7 @@ class EnrollmentMethodResource(ScopeResourceMixin):
         fields = [
             "id", "delete",
             *ScopeResourceMixin.Meta.fields,
-            "name", "role", "passphrase", "is_active",
+            "name", "role", "passphrase", "is_active", "max_enrollments",
             "duration_value", "duration_period", "end_date",
             "description", "text_format",
         ]
@@ -70,7 +74,8 @@ class EnrollmentMethodAdmin(CustomModelAdmin):
     list_select_related = [*created_modified_by_related]
     ordering            = ["scope_type", "scope_uuid", "name", "role"]
     search_fields       = ["name", "role__name", "user__username"]
-    readonly_fields     = [*created_modified_by_fields]
+    readonly_fields     = ["enrollment_count", *created_modified_by_fields]
+    actions_detail      = ["bulk_enroll"]
 
     list_filter = [
         scope_type_filter,
@@ -86,6 +91,7 @@ class EnrollmentMethodAdmin(CustomModelAdmin):
                 ("scope_type", "scope_uuid"),
                 ("name", "role"),
                 ("passphrase", "is_active"),
+                ("max_enrollments", "enrollment_count"),
             ],
         }),
         (_("Description"), {
@@ -109,6 +115,7 @@ class EnrollmentMethodAdmin(CustomModelAdmin):
                 ("scope_type", "scope_uuid"),
                 ("name", "role"),
                 ("passphrase", "is_active"),
+                "max_enrollments",
             ],
         }),
         (_("Description"), {
@@ -124,3 +131,9 @@ class EnrollmentMethodAdmin(CustomModelAdmin):
             ],
         }),
     ]
+
+    @action(description=_("Bulk enrollment"), icon="group_add", url_path="bulk_enroll")
+    def bulk_enroll(self, request: HttpRequest, object_id: str) -> HttpResponse:
+        # Directly rendering the view instead of a redirect, since the view works stand-alone
+        view = EnrollmentMethodBulkEnrollmentView.as_view(model_admin=self)
+        return view(request, object_id=object_id)
@@ -190,7 +190,7 @@ class ScopedRolesFormMixin(ModelForm):
         super().__init__(*args, **kwargs)
 
         self._scope_type = ContentType.objects.get_for_model(self.Meta.model)
-        allowed_permissions = AllowedRolePermission.get_for_scope_type(self._scope_type).values_list("permission", flat=True)
+        allowed_permissions = AllowedRolePermission.get_permission_ids(self._scope_type)
 
         self.fields["public_permissions"].queryset = Permission.objects.filter(id__in=allowed_permissions)
 
@@ -13,6 +13,7 @@ from import_export.widgets              import ForeignKeyWidget
 from openbook.admin                     import CustomModelAdmin
 from openbook.admin                     import ImportExportModelResource
 from openbook.core.models.language      import Language
+from openbook.core.models.mixins.i18n   import prefetch_translations
 from ..import_export.permission         import PermissionForeignKeyWidget
 from ..models.permission_text           import PermissionText
 
@@ -33,6 +34,14 @@ class PermissionTextAdmin(CustomModelAdmin):
     search_fields      = ["appname", "perm_name", "perm", "language", "name"]
     readonly_fields    = ["appname", "perm_name", "perm"]
 
+    def get_queryset(self, request):
+        """
+        Prefetch the permissions with their translations for the changelist.
+        """
+        return super().get_queryset(request).select_related("parent").prefetch_related(
+            prefetch_translations(PermissionText, "parent__translations"),
+        )
+
     fieldsets = [
         (None, {
             "fields": ["perm", ("appname", "perm_name"), ("language", "name")]
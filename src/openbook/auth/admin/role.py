@@ -7,9 +7,13 @@
 # License, or (at your option) any later version.
 
 from django.contrib.contenttypes.admin   import GenericTabularInline
+from django.core.exceptions              import ValidationError
+from django.http                         import HttpRequest
+from django.http                         import HttpResponse
 from django.utils.translation            import gettext_lazy as _
 from import_export.fields                import Field
 from unfold.admin                        import TabularInline
+from unfold.decorators                   import action
 from unfold.sections                     import TableSection
 
 from openbook.admin                      import CustomModelAdmin
@@ -27,6 +31,8 @@ from ..models.enrollment_method          import EnrollmentMethod
 from ..models.role                       import Role
 from ..models.role_assignment            import RoleAssignment
 from ..validators                        import validate_permissions
+from ..validators                        import validate_permissions_bulk
+from ..views.bulk_enrollment             import RoleBulkEnrollmentView
 
 class RoleResource(ScopeResourceMixin):
     is_active   = Field(attribute="is_active",   widget=BooleanWidget())
@@ -42,6 +48,29 @@ class RoleResource(ScopeResourceMixin):
             "permissions",
         ]
 
+    def before_import(self, dataset, **kwargs):
+        """
+        Check the permissions of all imported roles at once, before any row is saved, so that
+        imports with thousands of roles don't need to validate each row separately. Rows with
+        unknown scope types or permissions are skipped here and reported by the row import.
+        """
+        super().before_import(dataset, **kwargs)
+        items = []
+
+        for row in dataset.dict:
+            try:
+                items.append((self.fields["scope_type"].clean(row), self.fields["permissions"].clean(row)))
+            except Exception:
+                items.append((None, None))
+
+        errors = validate_permissions_bulk(items)
+
+        if errors:
+            raise ValidationError([
+                _("Row %(row)s: %(error)s") % {"row": index + 1, "error": " ".join(error.messages)}
+                for index, error in errors.items()
+            ])
+
 class RoleForm(ScopeFormMixin):
     class Meta:
         model  = Role
@@ -135,6 +164,7 @@ class RoleAdmin(CustomModelAdmin):
     prepopulated_fields = {"slug": ["name"]}
     filter_horizontal   = ["permissions"]
     inlines             = [_EnrollmentMethodInline, _AccessRequestInline, _RoleAssignmentInline]
+    actions_detail      = ["bulk_enroll"]
 
     def get_queryset(self, request):
         """
@@ -184,3 +214,9 @@ class RoleAdmin(CustomModelAdmin):
             "fields": ["permissions"],
         }),
     ]
+
+    @action(description=_("Bulk enrollment"), icon="group_add", url_path="bulk_enroll")
+    def bulk_enroll(self, request: HttpRequest, object_id: str) -> HttpResponse:
+        # Directly rendering the view instead of a redirect, since the view works stand-alone
+        view = RoleBulkEnrollmentView.as_view(model_admin=self)
+        return view(request, object_id=object_id)
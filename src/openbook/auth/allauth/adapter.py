@@ -8,17 +8,15 @@
 
 from allauth.account.adapter          import DefaultAccountAdapter
 from allauth.socialaccount.adapter    import DefaultSocialAccountAdapter
-from allauth.socialaccount.models     import SocialApp
 from allauth.socialaccount.models     import SocialLogin
 from django.contrib.auth.models       import AbstractUser
 from django.core.exceptions           import ValidationError
-from django.db.models                 import Q
 from django.http                      import HttpRequest
 from django.utils.text                import format_lazy as _f
 
-from openbook.core.models.site        import Site
-from ..models.auth_config             import AuthConfig
+from openbook.core.utils.site_config  import get_site_config
 from ..models.signup_group_assignment import SignupGroupAssignment
+from ..signals                        import bump_user_permissions_version
 
 class AccountAdapter(DefaultAccountAdapter):
     """
@@ -28,26 +26,20 @@ class AccountAdapter(DefaultAccountAdapter):
         """
         Check whether local account registration is allowed.
         """
-        try:
-            auth_config = AuthConfig.get_for_default_site()
-            return auth_config.local_signup_allowed
-        except AuthConfig.DoesNotExist:
-            pass
-        
-        return True
+        auth_config = get_site_config().auth_config
+        return auth_config.local_signup_allowed if auth_config else True
 
     def clean_email(self, email: str) -> str:
         """
         Restrict local account e-mail to e-mails with a certain suffix.
         """
-        try:
-            auth_config  = AuthConfig.get_for_default_site()
+        auth_config = get_site_config().auth_config
+
+        if auth_config:
             email_suffix = auth_config.signup_email_suffix.strip()
 
             if not email.endswith(email_suffix):
                 raise ValidationError(_f("This e-mail is not allowed to sign-up. The e-mail must end with {suffix}", suffix=email_suffix))
-        except AuthConfig.DoesNotExist:
-            pass
         
         return email
     
@@ -56,24 +48,10 @@ class AccountAdapter(DefaultAccountAdapter):
         Add user to groups after sign-up.
         """
         saved_user = super().save_user(request, user, form, commit)
-        groups = []
-
-        try:
-            current_site = Site.objects.get(site_ptr=request.site)
-        except Site.DoesNotExist:
-            current_site = None
+        matcher    = SignupGroupAssignment.get_matcher(site_id=request.site.pk)
 
-        group_assignments = SignupGroupAssignment.objects.filter(
-            Q(is_active = True),
-            Q(social_app = None),
-            Q(site = None) | Q(site = current_site),
-        )
-
-        for group_assignment in group_assignments.all():
-            for group in group_assignment.groups.all():
-                groups.append(group)
-        
-        saved_user.groups.set(groups)
+        saved_user.groups.set(matcher.get_group_ids())
+        bump_user_permissions_version(saved_user.pk)
         return saved_user
 
     def authenticate(self, request, **credentials):
@@ -100,37 +78,10 @@ class SocialAccountAdapter(DefaultSocialAccountAdapter):
         Add user to groups after sign-up.
         """
         saved_user = super().save_user(request, sociallogin, form)
-        social_app = None
-        groups = []
+        matcher    = SignupGroupAssignment.get_matcher(site_id=request.site.pk, provider=sociallogin.account.provider)
 
-        try:
-            social_app = SocialApp.objects.get(provider_id = sociallogin.account.provider)
-        except SocialApp.DoesNotExist:
-            pass
-    
-        if not social_app:
-            try:
-                social_app = SocialApp.objects.get(provider = sociallogin.account.provider)
-            except SocialApp.DoesNotExist:
-                pass
-
-        if social_app:
-            try:
-                current_site = Site.objects.get(site_ptr=request.site)
-            except Site.DoesNotExist:
-                current_site = None
-
-            group_assignments = SignupGroupAssignment.objects.filter(
-                Q(is_active = True),
-                Q(social_app = social_app),
-                Q(site = None) | Q(site = current_site),
-            )
+        if matcher:
+            saved_user.groups.set(matcher.get_group_ids(sociallogin.account.extra_data))
+            bump_user_permissions_version(saved_user.pk)
 
-            for group_assignment in group_assignments.all():
-                if group_assignment.match(sociallogin.account.extra_data):
-                    for group in group_assignment.groups.all():
-                        groups.append(group)
-            
-            saved_user.groups.set(groups)
-
-        return saved_user
\ No newline at end of file
+        return saved_user
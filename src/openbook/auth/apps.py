@@ -7,6 +7,7 @@
 # License, or (at your option) any later version.
 
 from django.apps              import AppConfig
+from django.apps              import apps
 from django.utils.translation import gettext_lazy as _
 
 class AuthApp(AppConfig):
@@ -16,4 +17,12 @@ class AuthApp(AppConfig):
 
     def ready(self):
         # Load OpenAPI auth extensions
-        from .middleware.current_user import CurrentUserTrackingAuthExtension
\ No newline at end of file
+        from .middleware.current_user import CurrentUserTrackingAuthExtension
+
+        # Register models that act as permission scopes
+        from .models.mixins.scope import ScopedRolesMixin
+        from .utils               import scope_type_registry
+        scope_type_registry.register([model for model in apps.get_models() if issubclass(model, ScopedRolesMixin)])
+
+        # Connect signal handlers for cache invalidation
+        from . import signals
\ No newline at end of file
@@ -6,8 +6,16 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from django.contrib.auth          import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models   import AbstractUser
+from django.core.cache            import cache
+from django.db.models             import Q
+from django.db.models             import QuerySet
+
+from openbook.core.utils.cache    import get_cache_versions
+from .middleware.permission_memo  import PermissionMemo
+from .middleware.permission_memo  import get_permission_memo
 
 class RoleBasedObjectPermissionsBackend(ModelBackend):
     """
@@ -25,8 +33,37 @@ class RoleBasedObjectPermissionsBackend(ModelBackend):
     Otherwise role-based permissions are checked. If this is not supported by the object or fails,
     we fall back to regular user permissions. Thus, the `ModelBackend` doesn't need to be included
     in the Django settings, as its function is already covered here.
+
+    Decisions are memorized for the duration of a request, when `PermissionMemoMiddleware` is active,
+    because the same permission is usually checked several times on the same object.
+
+    The regular user and group permissions of each user are kept in the Django cache, so that they
+    needn't be loaded from the database again in each request.
+
+    Additionally, `filter_queryset()` applies the same rules to a whole queryset, so that lists can
+    be filtered by permission in the database instead of checking each object one by one.
     """
     def has_perm(self, user_obj: AbstractUser, perm: str, obj=None) -> bool:
+        memo = get_permission_memo()
+        key  = PermissionMemo.get_key(user_obj, perm, obj) if memo is not None else None
+
+        if key is not None:
+            result = memo.get(key)
+
+            if result is not None:
+                return result
+
+        result = self._has_perm(user_obj, perm, obj)
+
+        if key is not None:
+            memo.set(key, result)
+
+        return result
+
+    def _has_perm(self, user_obj: AbstractUser, perm: str, obj=None) -> bool:
+        """
+        Actual permission check without memorizing the result.
+        """
         # Superuser can do anything
         if user_obj.is_superuser:
             return True
@@ -35,13 +72,9 @@ class RoleBasedObjectPermissionsBackend(ModelBackend):
 
         # Anonymous permission always apply
         from openbook.auth.models import AnonymousPermission
-        from openbook.auth.utils  import permission_for_perm_string
 
-        try:
-            AnonymousPermission.objects.get(permission=permission_for_perm_string(perm))
+        if perm in AnonymousPermission.get_perm_strings():
             return True
-        except AnonymousPermission.DoesNotExist:
-            pass
 
         # Check object permissions
         if obj is not None:
@@ -62,3 +95,136 @@ class RoleBasedObjectPermissionsBackend(ModelBackend):
             result = self.has_perm(user_obj, change_perm, obj)
 
         return result
+
+    def get_user_permissions(self, user_obj: AbstractUser, obj=None) -> set[str]:
+        return self._get_cached_permissions(user_obj, obj, "user", super().get_user_permissions)
+
+    def get_group_permissions(self, user_obj: AbstractUser, obj=None) -> set[str]:
+        return self._get_cached_permissions(user_obj, obj, "group", super().get_group_permissions)
+
+    def _get_cached_permissions(self, user_obj: AbstractUser, obj, from_name: str, get_permissions) -> set[str]:
+        """
+        Cached version of the `ModelBackend` methods to get the user or group permissions of a user.
+        Like in the `ModelBackend` the permissions are additionally kept in the user object. The cache
+        is invalidated by signals in `openbook.auth.signals` when the user's groups or permissions
+        or the permissions of any group change.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = f"_{from_name}_perm_cache"
+
+        if not hasattr(user_obj, perm_cache_name):
+            user_version_name = f"openbook_auth:user_permissions:{user_obj.pk}"
+            versions  = get_cache_versions([user_version_name, "openbook_auth:group_permissions"])
+            cache_key = f"openbook_auth:{from_name}_permissions:{user_obj.pk}:{versions[user_version_name]}:{versions['openbook_auth:group_permissions']}"
+            perms     = cache.get(cache_key)
+
+            if perms is None:
+                perms = get_permissions(user_obj)
+                cache.set(cache_key, perms)
+
+            setattr(user_obj, perm_cache_name, perms)
+
+        return getattr(user_obj, perm_cache_name)
+
+    def has_obj_perms(self, user_obj: AbstractUser, perm: str, objs) -> set:
+        """
+        Batch counterpart of `has_perm()`: Return the primary keys of all given objects on which the
+        user has the given permission. Unlike calling `has_perm()` for each object, this delegates to
+        the models' `has_obj_perms()` method (in place of `has_obj_perm()`), which fetches everything
+        needed for all objects with a fixed number of queries.
+        """
+        objs = list(objs)
+
+        if self.has_perm(user_obj, perm):
+            return {obj.pk for obj in objs}
+
+        perms = [perm]
+
+        if ".view_" in perm:
+            perms.append(perm.replace(".view_", ".change_"))
+
+        result = set()
+
+        for p in perms:
+            by_model = {}
+
+            for obj in objs:
+                if obj.pk in result:
+                    continue
+
+                if user_obj.is_authenticated:
+                    if obj == user_obj:
+                        result.add(obj.pk)
+                        continue
+                    if hasattr(obj, "owner_id") and obj.owner_id == user_obj.pk:
+                        result.add(obj.pk)
+                        continue
+
+                by_model.setdefault(type(obj), []).append(obj)
+
+            for model, model_objs in by_model.items():
+                if hasattr(model, "has_obj_perms"):
+                    result |= model.has_obj_perms(user_obj, p, model_objs)
+                elif hasattr(model, "has_obj_perm"):
+                    result |= {obj.pk for obj in model_objs if obj.has_obj_perm(user_obj, p)}
+
+        return result
+
+    def filter_queryset(self, user_obj: AbstractUser, perm: str, queryset: QuerySet) -> QuerySet:
+        """
+        Queryset counterpart of `has_perm()`: Reduce the queryset to the objects on which the user
+        has the given object permission. If the user has the permission independent of any object
+        (superuser, anonymous permission or regular permission), the queryset is returned unchanged.
+        Otherwise the rules of `has_perm()` are translated into a database query, using the model's
+        `get_obj_perm_filter()` method in place of `has_obj_perm()`.
+
+        Models that implement `has_obj_perm()` but not `get_obj_perm_filter()` (or that return `None`)
+        cannot be filtered in the database. In this case, all objects are checked with `has_obj_perms()`.
+        """
+        if self.has_perm(user_obj, perm):
+            return queryset
+
+        perms = [perm]
+
+        if ".view_" in perm:
+            perms.append(perm.replace(".view_", ".change_"))
+
+        obj_filter = Q(pk__in=[])
+
+        for p in perms:
+            perm_filter = self._get_obj_perm_filter(user_obj, p, queryset.model)
+
+            if perm_filter is None:
+                return queryset.filter(pk__in=self.has_obj_perms(user_obj, perm, queryset))
+
+            obj_filter |= perm_filter
+
+        return queryset.filter(obj_filter)
+
+    def _get_obj_perm_filter(self, user_obj: AbstractUser, perm: str, model: type) -> Q|None:
+        """
+        Translate the object-related checks of `has_perm()` into a `Q` object for the given model.
+        Returns `None`, if the model's permission rules cannot be expressed as a query.
+        """
+        result = Q(pk__in=[])
+
+        if user_obj.is_authenticated:
+            if issubclass(model, get_user_model()):
+                result |= Q(pk=user_obj.pk)
+            if hasattr(model, "owner"):
+                result |= Q(owner=user_obj)
+
+        if hasattr(model, "has_obj_perm"):
+            if not hasattr(model, "get_obj_perm_filter"):
+                return None
+
+            model_filter = model.get_obj_perm_filter(user_obj, perm)
+
+            if model_filter is None:
+                return None
+
+            result |= model_filter
+
+        return result
@@ -0,0 +1,28 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from django.core.management.base import BaseCommand
+
+from openbook.core.utils.cache   import is_cache_shared
+from ...models.auth_token        import AuthToken
+from ...models.role_assignment   import RoleAssignment
+
+class Command(BaseCommand):
+    help = "Deactivate role assignments and authentication tokens whose end date has passed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Number of rows updated at once")
+
+    def handle(self, *args, **options):
+        if not is_cache_shared():
+            self.stderr.write("The default cache is not shared with the web server. Configure a shared cache like Redis in CACHES.")
+
+        role_assignments = RoleAssignment.deactivate_expired(batch_size=options["batch_size"])
+        auth_tokens      = AuthToken.deactivate_expired(batch_size=options["batch_size"])
+
+        self.stdout.write(f"Deactivated {role_assignments} role assignments and {auth_tokens} authentication tokens")
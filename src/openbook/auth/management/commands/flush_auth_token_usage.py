@@ -0,0 +1,25 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from django.core.management.base import BaseCommand
+
+from openbook.core.utils.cache   import is_cache_shared
+from ...models.auth_token        import AuthToken
+
+class Command(BaseCommand):
+    help = "Write the cached usage data of authentication tokens to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Number of tokens updated at once")
+
+    def handle(self, *args, **options):
+        if not is_cache_shared():
+            self.stderr.write("The default cache is not shared with the web server. Configure a shared cache like Redis in CACHES.")
+
+        updated = AuthToken.flush_usage(batch_size=options["batch_size"])
+        self.stdout.write(f"Updated usage data of {updated} authentication tokens")
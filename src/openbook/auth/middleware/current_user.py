@@ -6,24 +6,55 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-import importlib, threading
+import contextvars, importlib
 
+from asgiref.sync                  import iscoroutinefunction
 from django.conf                   import settings
+from django.utils.decorators       import sync_and_async_middleware
 from drf_spectacular.extensions    import OpenApiAuthenticationExtension
 from rest_framework.authentication import BaseAuthentication
 
-thread_local = threading.local()
+class CurrentUser:
+    """
+    Holder for the current user. Needed because `request.user` is a lazy object that must
+    not be evaluated in async code. But `asgiref` inspects and compares the values of all
+    context variables when switching between sync and async code.
+    """
+    __slots__ = ("user",)
+
+    def __init__(self, user = None):
+        self.user = user
+
+current_user = contextvars.ContextVar("current_user", default=CurrentUser())
 
+@sync_and_async_middleware
 def CurrentUserMiddleware(get_response):
     """
-    Save the current user in a thread-local variable so that it can be accessed
-    within the model layer. This is done to auto-populate the `created_by` and
-    `modified_by` fields of models that use the `CreatedModifiedByMixin` without
-    needing to explicitly pass the user from the view layer to the model layer.
+    Save the current user in a context variable so that it can be accessed within
+    the model layer. This is done to auto-populate the `created_by` and `modified_by`
+    fields of models that use the `CreatedModifiedByMixin` without needing to explicitly
+    pass the user from the view layer to the model layer.
+
+    Other than thread-local variables, context variables also work for async views and
+    are never shared between concurrently handled requests. The previous value is restored
+    once the request has been handled.
     """
-    def middleware(request):
-        thread_local.current_user = request.user
-        return get_response(request)
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = current_user.set(CurrentUser(request.user))
+
+            try:
+                return await get_response(request)
+            finally:
+                current_user.reset(token)
+    else:
+        def middleware(request):
+            token = current_user.set(CurrentUser(request.user))
+
+            try:
+                return get_response(request)
+            finally:
+                current_user.reset(token)
 
     return middleware
 
@@ -60,7 +91,7 @@ class CurrentUserTrackingAuthentication(BaseAuthentication):
             # Remember authenticated user
             if result is not None:
                 user, _ = result
-                thread_local.current_user = user
+                current_user.set(CurrentUser(user))
                 break
 
         return result
@@ -69,14 +100,14 @@ def get_current_user():
     """
     Get the current request user, if any. Returns `None` otherwise.
     """
-    return getattr(thread_local, "current_user", None)
+    return current_user.get().user
 
 def reset_current_user():
     """
-    Needed for unit tests which all run in a single thread. Forget previous tests's
+    Needed for unit tests which all run in the same context. Forget previous tests's
     user as it is probably not even existing anymore.
     """
-    thread_local.current_user = None
+    current_user.set(CurrentUser())
 
 class CurrentUserTrackingAuthExtension(OpenApiAuthenticationExtension):
     """
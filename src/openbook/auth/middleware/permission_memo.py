@@ -0,0 +1,130 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+import contextvars, logging
+
+from asgiref.sync            import iscoroutinefunction
+from django.db               import transaction
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+class PermissionMemo:
+    """
+    Permission decisions of the `RoleBasedObjectPermissionsBackend` within a single request.
+    One request usually checks the same permission on the same object several times, e.g. when
+    DRF checks the object permissions and the model checks them again before saving. Keys are
+    tuples of user, permission and object identity. Unsaved objects are never memorized, since
+    their permissions depend on the field values that are still being set.
+
+    The counters `hits` and `misses` are logged at the end of each request (log level `DEBUG`).
+    """
+    def __init__(self):
+        self.decisions = {}
+        self.enabled   = True
+        self.hits      = 0
+        self.misses    = 0
+
+    @staticmethod
+    def get_key(user_obj, perm: str, obj) -> tuple|None:
+        """
+        Get the memo key for a permission check or `None` if the decision must not be memorized.
+        """
+        if obj is None:
+            obj_key = None
+        elif getattr(obj, "pk", None) is not None and not obj._state.adding:
+            obj_key = (obj._meta.label, obj.pk)
+        else:
+            return None
+
+        return (user_obj.pk if user_obj.is_authenticated else None, perm, obj_key)
+
+    def get(self, key: tuple) -> bool|None:
+        """
+        Get a memorized decision or `None`.
+        """
+        if not self.enabled:
+            return None
+
+        result = self.decisions.get(key)
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return result
+
+    def set(self, key: tuple, result: bool):
+        """
+        Memorize a decision.
+        """
+        if self.enabled:
+            self.decisions[key] = result
+
+    def suspend(self):
+        """
+        Forget all decisions and stop memorizing new ones until the current transaction is
+        committed. Called by the signal handlers in `openbook.auth.signals` when role data changes.
+        """
+        self.decisions.clear()
+        self.enabled = False
+        transaction.on_commit(self.resume)
+
+    def resume(self):
+        """
+        Start memorizing decisions again.
+        """
+        self.decisions.clear()
+        self.enabled = True
+
+permission_memo: contextvars.ContextVar[PermissionMemo|None] = contextvars.ContextVar("permission_memo", default=None)
+
+@sync_and_async_middleware
+def PermissionMemoMiddleware(get_response):
+    """
+    Provide a fresh `PermissionMemo` for each request and throw it away afterwards, so that
+    no decisions leak into other requests.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            memo  = PermissionMemo()
+            token = permission_memo.set(memo)
+
+            try:
+                return await get_response(request)
+            finally:
+                permission_memo.reset(token)
+                logger.debug("Permission memo for %s: %d hits, %d misses", request.path, memo.hits, memo.misses)
+    else:
+        def middleware(request):
+            memo  = PermissionMemo()
+            token = permission_memo.set(memo)
+
+            try:
+                return get_response(request)
+            finally:
+                permission_memo.reset(token)
+                logger.debug("Permission memo for %s: %d hits, %d misses", request.path, memo.hits, memo.misses)
+
+    return middleware
+
+def get_permission_memo() -> PermissionMemo|None:
+    """
+    Get the permission memo of the current request, if any. Returns `None` outside of requests.
+    """
+    return permission_memo.get()
+
+def suspend_permission_memo():
+    """
+    Suspend the permission memo of the current request, if any, because role data has changed.
+    """
+    memo = permission_memo.get()
+
+    if memo is not None:
+        memo.suspend()
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.3 on 2026-10-18 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authtoken',
+            name='last_used_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Last Used'),
+        ),
+        migrations.AddField(
+            model_name='authtoken',
+            name='request_count',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Request Count'),
+        ),
+    ]
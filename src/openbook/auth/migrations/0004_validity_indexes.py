@@ -0,0 +1,22 @@
+# Generated by Django 6.0.3 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('openbook_auth', '0003_auth_token_usage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='authtoken',
+            index=models.Index(fields=['is_active', 'end_date'], name='openbook_au_is_acti_4ec0e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roleassignment',
+            index=models.Index(fields=['is_active', 'end_date'], name='openbook_au_is_acti_af3725_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.3 on 2026-10-18 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('openbook_auth', '0004_validity_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollmentmethod',
+            name='enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Enrollments'),
+        ),
+        migrations.AddField(
+            model_name='enrollmentmethod',
+            name='max_enrollments',
+            field=models.PositiveIntegerField(blank=True, help_text='Leave empty for an unlimited number of users.', null=True, verbose_name='Maximum Enrollments'),
+        ),
+    ]
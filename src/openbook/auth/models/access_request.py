@@ -6,9 +6,12 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+
 from django.conf                          import settings
 from django.contrib.auth.models           import AbstractUser
+from django.core.exceptions               import PermissionDenied
 from django.db                            import models
+from django.db                            import transaction
 from django.utils.timezone                import now
 from django.utils.translation             import gettext_lazy as _
 
@@ -16,6 +19,7 @@ from openbook.core.models.mixins.datetime import DurationMixin
 from openbook.core.models.mixins.uuid     import UUIDMixin
 from .mixins.audit                        import CreatedModifiedByMixin
 from .mixins.scope                        import ScopeMixin
+from ..middleware.current_user            import get_current_user
 
 class AccessRequest(UUIDMixin, ScopeMixin, DurationMixin, CreatedModifiedByMixin):
     """
@@ -62,12 +66,62 @@ class AccessRequest(UUIDMixin, ScopeMixin, DurationMixin, CreatedModifiedByMixin
 
         return super().has_obj_perm(user_obj, perm)
 
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Queryset counterpart of `has_obj_perm()` above.
+        """
+        result = super().get_obj_perm_filter(user_obj, perm)
+
+        if user_obj.is_authenticated:
+            if ".delete_" in perm or ".view_" in perm:
+                result |= models.Q(user=user_obj)
+            elif ".add_" in perm:
+                result |= models.Q(user=user_obj, decision=cls.Decision.PENDING)
+
+        return result
+
+    @classmethod
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
+        """
+        Batch counterpart of `has_obj_perm()` above.
+        """
+        result    = set()
+        remaining = []
+
+        for obj in objs:
+            if user_obj.is_authenticated and obj.user_id == user_obj.pk:
+                if ".delete_" in perm or ".view_" in perm:
+                    result.add(obj.pk)
+                    continue
+                if ".add_" in perm and obj.decision == cls.Decision.PENDING:
+                    result.add(obj.pk)
+                    continue
+
+            remaining.append(obj)
+
+        return result | super().has_obj_perms(user_obj, perm, remaining)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the decision loaded from the database, so that `save()` can detect changes
+        without loading the object again.
+        """
+        instance = super().from_db(db, field_names, values)
+
+        if "decision" in instance.__dict__:
+            instance._loaded_decision = instance.decision
+
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Force pending decision when a new access request is saved. Also update the role assignments
         accordingly when a decision is made.
         """
         from .role_assignment import RoleAssignment
+        from ..backends       import RoleBasedObjectPermissionsBackend
         
         if not self.decision:
             self.decision = self.Decision.PENDING
@@ -75,9 +129,12 @@ class AccessRequest(UUIDMixin, ScopeMixin, DurationMixin, CreatedModifiedByMixin
         if self.decision == self.Decision.PENDING:
             self.decision_date = None
         elif self.pk is not None:
-            old = type(self).objects.get(pk=self.pk)
+            if hasattr(self, "_loaded_decision"):
+                old_decision = self._loaded_decision
+            else:
+                old_decision = type(self).objects.filter(pk=self.pk).values_list("decision", flat=True).first()
 
-            if old.decision != self.decision:
+            if old_decision != self.decision:
                 self.decision_date = now()
 
         permission_user = kwargs.pop("permission_user", None)
@@ -90,6 +147,7 @@ class AccessRequest(UUIDMixin, ScopeMixin, DurationMixin, CreatedModifiedByMixin
                 RoleAssignment.withdraw(enrollment=self, permission_user=permission_user, check_permission=check_permission)
 
         super().save(*args, **kwargs)
+        self._loaded_decision = self.decision
 
     def accept(self,
         permission_user: AbstractUser = None,
@@ -112,4 +170,121 @@ class AccessRequest(UUIDMixin, ScopeMixin, DurationMixin, CreatedModifiedByMixin
         """
         self.decision      = self.Decision.DENIED
         self.decision_date = now()
-        self.save(permission_user=permission_user, check_permission=check_permission)
\ No newline at end of file
+        self.save(permission_user=permission_user, check_permission=check_permission)
+
+    @classmethod
+    def bulk_decide(cls,
+        ids: list,
+        decision: "AccessRequest.Decision",
+        permission_user: AbstractUser = None,
+        check_permission: bool = True,
+        batch_size: int = 500,
+    ) -> dict:
+        """
+        Accept or deny many access requests at once, e.g. all pending requests of a course at the
+        start of a term. Unlike calling `accept()` or `deny()` for each request, the permission is
+        checked only once per scope and role, the decisions are written with a single `UPDATE`
+        and the role assignments are created or deleted with bulk operations. All of this happens
+        in one transaction.
+
+        Returns a dictionary with the number of `decided` requests whose decision changed,
+        the number of `unchanged` requests and the ids `not_found`.
+
+        Raises `PermissionDenied` when the `permission_user` or the current request users lacks
+        the `openbook_auth.change_accessrequest` permission for any of the requests or
+        the `openbook_auth.add_roleassignment` (when accepting) or `openbook_auth.delete_roleassignment`
+        (when denying) permission for any of the requested roles. Nothing is changed, then.
+        """
+        from .role_assignment import RoleAssignment
+        from ..backends       import RoleBasedObjectPermissionsBackend
+
+        if decision not in (cls.Decision.ACCEPTED, cls.Decision.DENIED):
+            raise ValueError(_("Invalid decision"))
+
+        if not permission_user:
+            permission_user = get_current_user()
+
+        modified_by = permission_user if permission_user and permission_user.is_authenticated else None
+        timestamp   = now()
+
+        with transaction.atomic():
+            access_requests = list(cls.objects.filter(pk__in=ids).select_related("role").select_for_update(of=("self",)))
+
+            # Check permissions
+            if check_permission and permission_user:
+                backend = RoleBasedObjectPermissionsBackend()
+                allowed = backend.has_obj_perms(permission_user, "openbook_auth.change_accessrequest", access_requests)
+
+                if len(allowed) < len(access_requests):
+                    raise PermissionDenied()
+
+                if decision == cls.Decision.ACCEPTED:
+                    perm = "openbook_auth.add_roleassignment"
+                else:
+                    perm = "openbook_auth.delete_roleassignment"
+
+                roles = {access_request.role_id: access_request.role for access_request in access_requests}
+
+                for role in roles.values():
+                    scope_obj = RoleAssignment(scope_type_id=role.scope_type_id, scope_uuid=role.scope_uuid, role=role)
+
+                    if not permission_user.has_perm(perm, scope_obj):
+                        raise PermissionDenied()
+
+            # Update decisions
+            changed = [access_request.pk for access_request in access_requests if access_request.decision != decision]
+
+            cls.objects.filter(pk__in=changed).update(
+                decision      = decision,
+                decision_date = timestamp,
+                modified_by   = modified_by,
+                modified_at   = timestamp,
+            )
+
+            # Update role assignments
+            if decision == cls.Decision.ACCEPTED:
+                role_assignments = []
+
+                for access_request in access_requests:
+                    if access_request.end_date is not None:
+                        end_date = access_request.end_date
+                    elif access_request.duration_period and access_request.duration_value:
+                        end_date = access_request.add_duration_to(timestamp)
+                    else:
+                        end_date = None
+
+                    role_assignments.append(RoleAssignment(
+                        scope_type_id     = access_request.scope_type_id,
+                        scope_uuid        = access_request.scope_uuid,
+                        role_id           = access_request.role_id,
+                        user_id           = access_request.user_id,
+                        assignment_method = RoleAssignment.AssignmentMethod.ACCESS_REQUEST,
+                        end_date          = end_date,
+                        created_by        = modified_by,
+                        modified_by       = modified_by,
+                    ))
+
+                RoleAssignment.bulk_assign(role_assignments, batch_size=batch_size)
+            elif access_requests:
+                # Find the assignments with one query, like `RoleAssignment.bulk_assign()`,
+                # and delete them in batches instead of one huge condition
+                keys = {(access_request.role_id, access_request.user_id) for access_request in access_requests}
+
+                role_assignment_ids = [
+                    pk for pk, role_id, user_id in RoleAssignment.objects.filter(
+                        role__in = {role_id for role_id, _user_id in keys},
+                        user__in = {user_id for _role_id, user_id in keys},
+                    ).values_list("pk", "role_id", "user_id")
+                    if (role_id, user_id) in keys
+                ]
+
+                for i in range(0, len(role_assignment_ids), batch_size):
+                    RoleAssignment.objects.filter(pk__in=role_assignment_ids[i:i + batch_size]).delete()
+
+        found = {str(access_request.pk) for access_request in access_requests}
+
+        return {
+            "decided":   len(changed),
+            "unchanged": len(access_requests) - len(changed),
+            "not_found": [str(pk) for pk in ids if str(pk) not in found],
+        }
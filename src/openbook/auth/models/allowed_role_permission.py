@@ -13,9 +13,13 @@ from django.contrib.contenttypes.models   import ContentType
 from django.utils.translation             import gettext_lazy as _
 
 from openbook.core.models.mixins.uuid     import UUIDMixin
+from openbook.core.utils.cache            import VersionedMemo
 from ..utils                              import perm_name_for_permission
 from ..utils                              import perm_string_for_permission
 
+# Process-local copy of all allowed permission ids: {scope type id: permission ids}
+_permission_ids: VersionedMemo[dict[int, frozenset[int]]] = VersionedMemo()
+
 class AllowedRolePermission(UUIDMixin):
     """
     Allowed permission to be used in scoped roles. This is used to restrict the list of available
@@ -36,6 +40,8 @@ class AllowedRolePermission(UUIDMixin):
             models.UniqueConstraint(fields=("scope_type", "permission",), name="unique_allowed_role_permission"),
         ]
 
+    CACHE_VERSION_NAME = "openbook_auth:allowed_role_permissions"
+
     def __str__(self):
         scope_name = f"{self.scope_type.name} |" if self.scope_type else ""
         perm_name  = f"{self.permission}" if self.permission else ""
@@ -47,6 +53,32 @@ class AllowedRolePermission(UUIDMixin):
         Get a list of allowed permissions for the given scope type.
         """
         return cls.objects.filter(scope_type=scope_type)
+
+    @classmethod
+    def get_permission_ids_by_scope_type(cls) -> dict[int, frozenset[int]]:
+        """
+        Get the ids of the allowed permissions of all scope types, keyed by the scope type id.
+        They are loaded with a single query once per process and reloaded only when the cache
+        version (bumped by signals when allowed permissions are saved or deleted) has changed.
+        The result must be treated as read-only.
+        """
+        def load():
+            by_scope_type = {}
+
+            for scope_type_id, permission_id in cls.objects.values_list("scope_type_id", "permission_id"):
+                by_scope_type.setdefault(scope_type_id, set()).add(permission_id)
+
+            return {key: frozenset(value) for key, value in by_scope_type.items()}
+
+        return _permission_ids.get(cls.CACHE_VERSION_NAME, load)
+
+    @classmethod
+    def get_permission_ids(cls, scope_type: ContentType|int) -> frozenset[int]:
+        """
+        Get the ids of the allowed permissions of the given scope type (content type or its id).
+        """
+        scope_type_id = scope_type.pk if isinstance(scope_type, ContentType) else scope_type
+        return cls.get_permission_ids_by_scope_type().get(scope_type_id, frozenset())
     
     @admin.display(description=_("Permission"))
     def perm_name(self, obj=None):
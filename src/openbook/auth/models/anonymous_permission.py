@@ -12,9 +12,13 @@ from django.db                            import models
 from django.utils.translation             import gettext_lazy as _
 
 from openbook.core.models.mixins.uuid     import UUIDMixin
+from openbook.core.utils.cache            import VersionedMemo
 from ..utils                              import perm_name_for_permission
 from ..utils                              import perm_string_for_permission
 
+# Process-local copy of all anonymous permissions
+_perm_strings: VersionedMemo[frozenset[str]] = VersionedMemo()
+
 class AnonymousPermission(UUIDMixin):
     """
     Permissions for anonymous (not logged-in) users. Required for our implementation of
@@ -38,8 +42,24 @@ class AnonymousPermission(UUIDMixin):
             models.UniqueConstraint(fields=("permission",), name="unique_anonymous_permission"),
         ]
 
+    CACHE_VERSION_NAME = "openbook_auth:anonymous_permissions"
+
     def __str__(self):
         return self.perm_name()
+
+    @classmethod
+    def get_perm_strings(cls) -> frozenset[str]:
+        """
+        Get the permission strings of all anonymous permissions. They are loaded once per process
+        and reloaded only when the cache version (bumped by signals when anonymous permissions are
+        saved or deleted) has changed, e.g. due to changes in another worker process.
+        """
+        return _perm_strings.get(cls.CACHE_VERSION_NAME, lambda: frozenset(
+            f"{app_label}.{codename}" for app_label, codename in cls.objects.values_list(
+                "permission__content_type__app_label",
+                "permission__codename",
+            )
+        ))
     
     @admin.display(description=_("Permission"))
     def perm_name(self, obj=None):
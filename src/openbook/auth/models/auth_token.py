@@ -6,10 +6,13 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-import random, string
+import hashlib, random, string, time
 
 from django.contrib.auth.models           import AbstractUser
+from django.core.cache                    import cache
 from django.db                            import models
+from django.db                            import transaction
+from django.utils.timezone                import now
 from django.utils.translation             import gettext_lazy as _
 
 from openbook.core.models.mixins.active   import ActiveInactiveMixin
@@ -38,8 +41,13 @@ class AuthToken(UUIDMixin, NameDescriptionMixin, ActiveInactiveMixin, ValidityTi
 
     Token life-time can be manually managed by the users.
     """
-    user  = models.ForeignKey(User, on_delete=models.CASCADE, related_name="auth_tokens")
-    token = models.CharField(_("Token"), max_length=64, unique=True, default=generate_token)
+    user          = models.ForeignKey(User, on_delete=models.CASCADE, related_name="auth_tokens")
+    token         = models.CharField(_("Token"), max_length=64, unique=True, default=generate_token)
+    last_used_at  = models.DateTimeField(_("Last Used"), null=True, blank=True, editable=False)
+    request_count = models.PositiveBigIntegerField(_("Request Count"), default=0, editable=False)
+
+    USAGE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+    USAGE_INTERVAL      = 60
 
     class Meta:
         verbose_name        = _("Authentication Token")
@@ -49,6 +57,7 @@ class AuthToken(UUIDMixin, NameDescriptionMixin, ActiveInactiveMixin, ValidityTi
         indexes = [
             models.Index(fields=("user",)),
             models.Index(fields=("token",)),
+            models.Index(fields=("is_active", "end_date")),
         ]
     
     def __str__(self):
@@ -69,4 +78,216 @@ class AuthToken(UUIDMixin, NameDescriptionMixin, ActiveInactiveMixin, ValidityTi
         if not self.user:
             return False
         
-        return self.user.username == user_obj.username and user_obj.has_perm("openbook_auth.manage_own_authtoken")
\ No newline at end of file
+        return self.user.username == user_obj.username and user_obj.has_perm("openbook_auth.manage_own_authtoken")
+
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Queryset counterpart of `has_obj_perm()` above.
+        """
+        if not user_obj.is_authenticated or not user_obj.has_perm("openbook_auth.manage_own_authtoken"):
+            return models.Q(pk__in=[])
+
+        return models.Q(user=user_obj)
+
+    @classmethod
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
+        """
+        Batch counterpart of `has_obj_perm()` above.
+        """
+        if not user_obj.is_authenticated or not user_obj.has_perm("openbook_auth.manage_own_authtoken"):
+            return set()
+
+        return {obj.pk for obj in objs if obj.user_id == user_obj.pk}
+
+    def is_valid(self) -> bool:
+        """
+        Check whether the token can currently be used for authentication: The token and its user
+        must be active and the current time must be within the validity time span, if any.
+        """
+        current_time = now()
+
+        if not self.is_active or not self.user.is_active:
+            return False
+        if self.start_date is not None and self.start_date > current_time:
+            return False
+        if self.end_date is not None and self.end_date <= current_time:
+            return False
+
+        return True
+
+    @classmethod
+    def deactivate_expired(cls, batch_size: int = 1000) -> int:
+        """
+        Deactivate all active tokens whose end date has passed and return their number. Works
+        like `RoleAssignment.deactivate_expired()` in batches of short `UPDATE` statements.
+        """
+        timestamp = now()
+        count     = 0
+
+        while True:
+            batch = list(cls.objects.filter(is_active=True, end_date__lte=timestamp).values_list("pk", "token")[:batch_size])
+
+            if not batch:
+                break
+
+            cls.objects.filter(pk__in=[pk for pk, _ in batch]).update(is_active=False)
+            cls.invalidate_cache([token for _, token in batch])
+            count += len(batch)
+
+        return count
+
+    @staticmethod
+    def get_cache_key(token: str) -> str:
+        """
+        Cache key for the token verification in `openbook.drf.authentication.TokenAuthentication`.
+        Only a hash of the token is used, so that tokens don't appear in the cache in clear text.
+        """
+        return f"openbook_auth:auth_token:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    @staticmethod
+    def get_user_cache_version_name(user_id: int) -> str:
+        """
+        Name of the cache version that is bumped when a user changes, to invalidate the cached
+        tokens of the user, which contain a copy of the user.
+        """
+        return f"openbook_auth:auth_token_user:{user_id}"
+
+    @classmethod
+    def invalidate_cache(cls, tokens: list[str]):
+        """
+        Remove the given tokens from the token verification cache. Called by signal handlers in
+        `openbook.auth.signals` when tokens or their users are changed or deleted.
+        """
+        cache.delete_many([cls.get_cache_key(token) for token in tokens])
+
+    @staticmethod
+    def get_usage_cache_keys(pk) -> tuple[str, str]:
+        """
+        Cache keys for the last usage time and the number of requests since the last flush.
+        """
+        return (f"openbook_auth:auth_token_used_at:{pk}", f"openbook_auth:auth_token_requests:{pk}")
+
+    @classmethod
+    def get_usage_interval(cls) -> int:
+        """
+        Number of the current time interval. The tokens used in each interval are remembered
+        in the cache, so that `flush_usage()` doesn't need to look at all tokens.
+        """
+        return int(time.time()) // cls.USAGE_INTERVAL
+
+    @staticmethod
+    def _cache_incr(key: str, timeout: int) -> int:
+        """
+        Increment a counter in the cache, creating it when missing. Returns the new value.
+        """
+        try:
+            return cache.incr(key)
+        except ValueError:
+            if cache.add(key, 1, timeout):
+                return 1
+            return cache.incr(key)
+
+    def record_usage(self):
+        """
+        Remember that the token has just been used for authentication. Only the cache is written,
+        since a database write on each request would be much too expensive. The usage data is
+        written to the database later with `flush_usage()`, which requires a cache shared by all
+        processes (see `CACHES` in `local_settings.py.template`).
+
+        On the first use in each interval, the token is also appended to the numbered list of
+        used tokens of that interval. The list is made of one cache key per entry plus a counter,
+        since the cache API has no atomic set operations.
+        """
+        used_at_key, requests_key = self.get_usage_cache_keys(self.pk)
+        cache.set(used_at_key, now(), self.USAGE_CACHE_TIMEOUT)
+        self._cache_incr(requests_key, self.USAGE_CACHE_TIMEOUT)
+
+        interval_key = f"openbook_auth:auth_token_usage:{self.get_usage_interval()}"
+
+        if cache.add(f"{interval_key}:token:{self.pk}", True, self.USAGE_CACHE_TIMEOUT):
+            entry = self._cache_incr(interval_key, self.USAGE_CACHE_TIMEOUT)
+            cache.set(f"{interval_key}:{entry}", self.pk, self.USAGE_CACHE_TIMEOUT)
+
+    @classmethod
+    def get_used_pks(cls, first: int, last: int, batch_size: int = 500) -> set:
+        """
+        Primary keys of the tokens used in the given range of intervals, as recorded by
+        `record_usage()`. Costs two cache round trips per batch of intervals or tokens.
+        """
+        pks       = set()
+        intervals = [f"openbook_auth:auth_token_usage:{interval}" for interval in range(first, last + 1)]
+
+        for start in range(0, len(intervals), batch_size):
+            counts = cache.get_many(intervals[start:start + batch_size])
+            keys   = [f"{interval_key}:{entry}" for interval_key, count in counts.items() for entry in range(1, count + 1)]
+
+            for key_start in range(0, len(keys), batch_size):
+                pks.update(cache.get_many(keys[key_start:key_start + batch_size]).values())
+
+        return pks
+
+    @classmethod
+    def flush_usage(cls, batch_size: int = 500) -> int:
+        """
+        Write the usage data recorded by `record_usage()` to the database. Only the tokens used
+        since the last flush are considered. They are processed in batches, each costing one cache
+        round trip, one query and one bulk update. Returns the number of updated tokens. Usually
+        called by the management command `flush_auth_token_usage`.
+
+        The current and the previous interval are left for the next flush, as requests might
+        still be adding to them. The last flushed interval is remembered in the cache.
+        """
+        flushed_key = "openbook_auth:auth_token_usage:flushed"
+        last        = cls.get_usage_interval() - 2
+        first       = last - cls.USAGE_CACHE_TIMEOUT // cls.USAGE_INTERVAL
+        flushed     = cache.get(flushed_key)
+
+        if flushed is not None:
+            first = max(first, flushed + 1)
+
+        updated = 0
+        pks     = sorted(cls.get_used_pks(first, last, batch_size), key=str)
+
+        for start in range(0, len(pks), batch_size):
+            keys   = {pk: cls.get_usage_cache_keys(pk) for pk in pks[start:start + batch_size]}
+            cached = cache.get_many([key for pair in keys.values() for key in pair])
+            tokens = []
+            counts = {}
+
+            for auth_token in cls.objects.filter(pk__in=keys.keys()).only("pk", "last_used_at", "request_count"):
+                used_at_key, requests_key = keys[auth_token.pk]
+                used_at  = cached.get(used_at_key)
+                requests = cached.get(requests_key, 0)
+
+                if not requests and (used_at is None or auth_token.last_used_at == used_at):
+                    continue
+
+                if used_at is not None and (auth_token.last_used_at is None or auth_token.last_used_at < used_at):
+                    auth_token.last_used_at = used_at
+
+                auth_token.request_count += requests
+                tokens.append(auth_token)
+
+                if requests:
+                    counts[requests_key] = requests
+
+            with transaction.atomic():
+                cls.objects.bulk_update(tokens, ["last_used_at", "request_count"])
+
+            # Only subtract the written counts after the commit, so that nothing is lost when the
+            # update fails. Don't simply delete the keys, as other requests might have been counted
+            # since. Keys that expired in the meantime have nothing left to subtract.
+            for requests_key, requests in counts.items():
+                try:
+                    cache.decr(requests_key, requests)
+                except ValueError:
+                    pass
+
+            updated += len(tokens)
+
+        if first <= last:
+            cache.set(flushed_key, last, None)
+
+        return updated
+
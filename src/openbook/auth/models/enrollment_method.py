@@ -10,12 +10,14 @@ from django.contrib.auth.models           import AbstractUser
 from django.core.exceptions               import PermissionDenied
 from django.db                            import models
 from django.utils.translation             import gettext_lazy as _
+from django.utils.timezone                import now
 from typing                               import TYPE_CHECKING
 
 from openbook.core.models.mixins.active   import ActiveInactiveMixin
 from openbook.core.models.mixins.datetime import DurationMixin
 from openbook.core.models.mixins.text     import NameDescriptionMixin
 from openbook.core.models.mixins.uuid     import UUIDMixin
+from openbook.core.utils.content_type     import content_type_registry
 
 from .mixins.audit                        import CreatedModifiedByMixin
 from .mixins.scope                        import ScopeMixin
@@ -35,6 +37,9 @@ class EnrollmentMethod(UUIDMixin, ScopeMixin, NameDescriptionMixin, ActiveInacti
     end_date   = models.DateTimeField(verbose_name=_("Enrollment Ends on"), blank=True, null=True)
     passphrase = models.CharField(verbose_name=_("Passphrase"), max_length=100, null=False, blank=True)
 
+    max_enrollments  = models.PositiveIntegerField(verbose_name=_("Maximum Enrollments"), help_text=_("Leave empty for an unlimited number of users."), null=True, blank=True)
+    enrollment_count = models.PositiveIntegerField(verbose_name=_("Enrollments"), default=0, editable=False)
+
     class Meta:
         verbose_name        = _("Enrollment Method")
         verbose_name_plural = _("Enrollment Methods")
@@ -62,13 +67,8 @@ class EnrollmentMethod(UUIDMixin, ScopeMixin, NameDescriptionMixin, ActiveInacti
         """
         from .role_assignment import RoleAssignment
 
-        if check_permission:
-            # This checks if the user has the self-enroll permission globally,
-            # within one of the already assigned roles (though unlikely to occur),
-            # or within the public permissions of the scope (which effectively allows
-            # to completely disable self-enrollment for a scope).
-            if not user.has_perm("openbook_auth.self_enroll", self):
-                raise PermissionDenied()
+        if check_permission and not self.has_self_enroll_perm(user):
+            raise PermissionDenied()
 
         return RoleAssignment.enroll(
             enrollment       = self,
@@ -76,4 +76,69 @@ class EnrollmentMethod(UUIDMixin, ScopeMixin, NameDescriptionMixin, ActiveInacti
             passphrase       = passphrase,
             check_passphrase = check_passphrase,
             check_permission = False,    # Cannot check role-assignment permission before user is enrolled
-        )
\ No newline at end of file
+        )
+
+    def has_self_enroll_perm(self, user: AbstractUser) -> bool:
+        """
+        Check if the user has the self-enroll permission globally, within one of the already
+        assigned roles (though unlikely to occur), or within the public permissions of the scope
+        (which effectively allows to completely disable self-enrollment for a scope).
+
+        Usually the permission is a public permission of the scope. This is checked first with the
+        cached effective permissions of the scope, which doesn't even need to load the scope object.
+        Only otherwise the full permission check is performed.
+        """
+        perm        = "openbook_auth.self_enroll"
+        scope_model = content_type_registry.get_for_id(self.scope_type_id).model_class()
+
+        if hasattr(scope_model, "get_effective_permissions_for_scopes"):
+            effective = scope_model.get_effective_permissions_for_scopes(user, [self.scope_uuid])
+
+            if perm in effective[self.scope_uuid].perms:
+                return True
+
+        return user.has_perm(perm, self)
+
+    def reserve_place(self):
+        """
+        Count a new enrollment and raise `PermissionDenied` when the maximum number of enrollments
+        has been reached. This is a single conditional `UPDATE`, so that concurrent enrollments
+        cannot exceed the limit. Must be called in the same transaction that creates the role
+        assignment, so that the place is released again when that fails.
+        """
+        queryset = type(self).objects.filter(
+            models.Q(max_enrollments__isnull=True) | models.Q(enrollment_count__lt=models.F("max_enrollments")),
+            pk = self.pk,
+        )
+
+        if not queryset.update(enrollment_count=models.F("enrollment_count") + 1):
+            raise PermissionDenied(_("No places left"))
+
+    def bulk_enroll(self,
+        usernames: list[str],
+        permission_user: AbstractUser|None = None,
+        check_permission: bool = True,
+    ) -> dict:
+        """
+        Enroll many users at once on behalf of a privileged user, e.g. a teacher enrolling all
+        students of a course. The passphrase and self-enrollment permission don't apply here,
+        but instead the `openbook_auth.add_roleassignment` permission is checked once for the
+        scope. See `RoleAssignment.bulk_enroll()` for details and the returned dictionary.
+        """
+        from .role_assignment import RoleAssignment
+
+        if self.end_date is not None:
+            end_date = self.end_date
+        elif self.duration_period and self.duration_value:
+            end_date = self.add_duration_to(now())
+        else:
+            end_date = None
+
+        return RoleAssignment.bulk_enroll(
+            role              = self.role,
+            usernames         = usernames,
+            end_date          = end_date,
+            enrollment_method = self,
+            permission_user   = permission_user,
+            check_permission  = check_permission,
+        )
@@ -6,6 +6,9 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from datetime                           import datetime
+from typing                             import NamedTuple
+
 from django.conf                        import settings
 from django.contrib.auth.models         import AbstractUser
 from django.contrib.auth.models         import Permission
@@ -15,9 +18,24 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.cache                  import cache
 from django.core.exceptions             import ValidationError
 from django.db                          import models
+from django.utils.timezone              import now
 from django.utils.translation           import gettext_lazy as _
 
+from openbook.core.utils.cache          import get_cache_versions
+from openbook.core.utils.content_type   import content_type_registry
 from ...middleware.current_user         import get_current_user
+from ...utils                           import scope_type_registry
+
+class EffectivePermissions(NamedTuple):
+    """
+    Compiled permissions of a user in a scope: The permission strings granted by public
+    permissions and assigned roles as well as the highest priority of the assigned roles
+    (`None` when no role is assigned). Owner permissions are not included. `valid_until`
+    is the next start or end date of a role assignment, after which the result is outdated.
+    """
+    perms:       frozenset[str]
+    priority:    int|None
+    valid_until: datetime|None = None
 
 class RoleBasedObjectPermissionsMixin(models.Model):
     """
@@ -45,20 +63,34 @@ class RoleBasedObjectPermissionsMixin(models.Model):
 
         if hasattr(scope, "owner") and user_obj == scope.owner:
             return True
-        
-        app_label, codename = perm.split(".")
 
-        if scope.public_permissions.filter(
-            content_type__app_label = app_label,
-            codename = codename
-        ).count() > 0:
-            return True
-        
-        return user_obj.is_authenticated and scope.role_assignments.filter(
-            user = user_obj,
-            role__permissions__content_type__app_label = app_label,
-            role__permissions__codename = codename
-        ).count() > 0
+        return perm in scope.get_effective_permissions(user_obj).perms
+
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Queryset counterpart of `has_obj_perm()`: Return a `Q` object that matches all objects on which
+        the given user has the given permission. This allows to filter querysets by permission in the
+        database instead of calling `has_obj_perm()` for each object.
+
+        Returns `None` when the permission rules cannot be expressed as a query. Callers must then
+        fall back to checking each object individually. This is the default for composite models,
+        where `get_scope()` returns a parent object. Such models should override this method to
+        match the scope via their parent relationship.
+
+        When `has_obj_perm()` is overridden, this method must be overridden, too, to keep both in sync.
+        """
+        return None
+
+    @classmethod
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
+        """
+        Batch counterpart of `has_obj_perm()`: Return the primary keys of all given objects on which
+        the user has the given permission. The default implementation simply checks each object.
+        Subclasses override this to fetch everything needed with a fixed number of queries, and must
+        return the same results as `has_obj_perm()`.
+        """
+        return {obj.pk for obj in objs if obj.has_obj_perm(user_obj, perm)}
         
     def get_scope(self) -> "ScopedRolesMixin":
         """
@@ -106,41 +138,170 @@ class ScopedRolesMixin(RoleBasedObjectPermissionsMixin):
         Check whether the given content type implements `ScopedRolesMixin` and therefor acts as
         a permission scope for user roles.
         """
-        model = content_type.model_class()
-        return not model is None and issubclass(model, ScopedRolesMixin)
+        return scope_type_registry.is_scope_type(content_type)
 
     @classmethod
     def get_scope_model_content_types(cls) -> list[ContentType]:
         """
         Get a filtered list of content types (models) that implement the scoped roles mixin and
-        therefor act as a permission scope for user roles. Since this is a somewhat expensive
-        operation, the result will be cached using the Django cache mechanism.
+        therefor act as a permission scope for user roles. See `ScopeTypeRegistry`.
         """
-        cache_key = "openbook_auth:scoped_roles_mixin:scope_models"
-        result: list[models.Model] = cache.get(cache_key, [])
+        return scope_type_registry.get_content_types()
+
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Match all scope objects that are owned by the user or where the user has the permission.
+        """
+        result = models.Q(pk__in=[])
+
+        if user_obj.is_authenticated:
+            result |= models.Q(owner=user_obj)
+
+        return result | cls.get_role_perm_filter(user_obj, perm)
 
-        if len(result) > 0:
+    @classmethod
+    def get_role_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q:
+        """
+        Match all scope objects where the permission is either a public permission or granted
+        via a role assignment to the user. Unlike `get_obj_perm_filter()` this ignores the owner.
+        """
+        from ..role_assignment import RoleAssignment
+
+        app_label, codename = perm.split(".")
+
+        result = models.Q(pk__in=cls._default_manager.filter(
+            public_permissions__content_type__app_label = app_label,
+            public_permissions__codename = codename,
+        ).values("pk"))
+
+        if user_obj.is_authenticated:
+            result |= models.Q(pk__in=RoleAssignment.objects.filter(
+                RoleAssignment.get_active_filter(),
+                scope_type = ContentType.objects.get_for_model(cls),
+                user = user_obj,
+                role__permissions__content_type__app_label = app_label,
+                role__permissions__codename = codename,
+            ).values("scope_uuid"))
+
+        return result
+
+    @staticmethod
+    def get_scope_cache_version_name(scope_type_id: int, scope_uuid) -> str:
+        """
+        Name of the cache version that is bumped whenever the permissions in the scope change.
+        See `openbook.auth.signals`.
+        """
+        return f"openbook_auth:scope:{scope_type_id}:{scope_uuid}"
+
+    def get_effective_permissions(self, user_obj: AbstractUser) -> EffectivePermissions:
+        """
+        Get the permissions of the user in this scope from the public permissions and the user's
+        active role assignments. The result is kept in the Django cache, so that permission checks
+        usually need no database queries. It is invalidated by signals when roles, role assignments
+        or the public permissions of the scope change, and when expired role assignments are
+        deactivated. Additionally cached results are ignored once the start or end date of one
+        of the user's role assignments has passed, so that this never depends on the management
+        command `deactivate_expired` reaching the cache of the web server.
+        """
+        return self.get_effective_permissions_for_scopes(user_obj, [self.pk])[self.pk]
+
+    @classmethod
+    def get_effective_permissions_for_scopes(cls, user_obj: AbstractUser, scope_pks: list) -> dict:
+        """
+        Batch version of `get_effective_permissions()` for many scopes of the same model. Returns a
+        dictionary with the primary keys as key. Cached results are fetched with a single cache access
+        and missing results are computed with two database queries.
+        """
+        from ..role_assignment import RoleAssignment
+
+        scope_pks     = set(scope_pks)
+        scope_type_id = ContentType.objects.get_for_model(cls).pk
+        user_id       = user_obj.pk if user_obj.is_authenticated else "anonymous"
+        version_names = {pk: cls.get_scope_cache_version_name(scope_type_id, pk) for pk in scope_pks}
+        versions      = get_cache_versions(version_names.values())
+        cache_keys    = {pk: f"openbook_auth:effective_permissions:{scope_type_id}:{pk}:{user_id}:{versions[version_names[pk]]}" for pk in scope_pks}
+        cached        = cache.get_many(cache_keys.values())
+        timestamp     = now()
+        result        = {
+            pk: cached[cache_key] for pk, cache_key in cache_keys.items()
+            if cache_key in cached and (cached[cache_key].valid_until is None or cached[cache_key].valid_until > timestamp)
+        }
+        missing       = scope_pks - result.keys()
+
+        if not missing:
             return result
 
-        for content_type in ContentType.objects.all():
-            if cls.content_type_is_scope(content_type):
-                result.append(content_type)
-        
-        cache.set(cache_key, result)
+        perms       = {pk: set() for pk in missing}
+        priorities  = {pk: None for pk in missing}
+        valid_until = {pk: None for pk in missing}
+        scope_field = cls.public_permissions.field.m2m_field_name()
+
+        for scope_pk, app_label, codename in cls.public_permissions.through.objects.filter(**{f"{scope_field}__in": missing}).values_list(
+            f"{scope_field}_id",
+            "permission__content_type__app_label",
+            "permission__codename",
+        ):
+            perms[scope_pk].add(f"{app_label}.{codename}")
+
+        if user_obj.is_authenticated:
+            # Also read assignments that start later, to know when the result becomes outdated
+            for scope_pk, start_date, end_date, role_priority, app_label, codename in RoleAssignment.objects.filter(
+                models.Q(end_date__isnull=True) | models.Q(end_date__gt=timestamp),
+                is_active = True,
+                scope_type_id = scope_type_id,
+                scope_uuid__in = missing,
+                user = user_obj,
+            ).values_list(
+                "scope_uuid",
+                "start_date",
+                "end_date",
+                "role__priority",
+                "role__permissions__content_type__app_label",
+                "role__permissions__codename",
+            ):
+                change_date = start_date if start_date is not None and start_date > timestamp else end_date
+
+                if change_date is not None and (valid_until[scope_pk] is None or change_date < valid_until[scope_pk]):
+                    valid_until[scope_pk] = change_date
+                if start_date is not None and start_date > timestamp:
+                    continue
+
+                if priorities[scope_pk] is None or role_priority > priorities[scope_pk]:
+                    priorities[scope_pk] = role_priority
+                if codename:
+                    perms[scope_pk].add(f"{app_label}.{codename}")
+
+        computed = {pk: EffectivePermissions(perms=frozenset(perms[pk]), priority=priorities[pk], valid_until=valid_until[pk]) for pk in missing}
+        cache.set_many({cache_keys[pk]: value for pk, value in computed.items()})
+
+        result.update(computed)
         return result
 
     @classmethod
-    def get_scope_model_content_type_ids(cls) -> list[int]:
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
         """
-        Get content type ids of models that are permission scopes for user roles.
+        Batch version of `has_obj_perm()` for scope objects, using the effective permissions
+        of all scopes.
         """
-        result: list[int] = []
+        effective = cls.get_effective_permissions_for_scopes(user_obj, [obj.pk for obj in objs])
+        result    = set()
+
+        for obj in objs:
+            if user_obj.is_authenticated and obj.owner_id == user_obj.pk:
+                result.add(obj.pk)
+            elif perm in effective[obj.pk].perms:
+                result.add(obj.pk)
 
-        for content_type in cls.get_scope_model_content_types():
-            result.append(content_type.pk)
-        
         return result
 
+    @classmethod
+    def get_scope_model_content_type_ids(cls) -> list[int]:
+        """
+        Get content type ids of models that are permission scopes for user roles.
+        """
+        return scope_type_registry.get_content_type_ids()
+
     def save(self, *args, **kwargs):
         """
         Automatically populate the `owner` field.
@@ -248,9 +409,117 @@ class ScopeMixin(RoleBasedObjectPermissionsMixin):
         else:
             return False
 
-        return self.get_scope().role_assignments.filter(
-            scope_type          = self.scope_type,
-            scope_uuid          = self.scope_uuid,
+        if not user_obj.is_authenticated:
+            return False
+
+        own_priority = scope.get_effective_permissions(user_obj).priority
+        return own_priority is not None and own_priority >= priority
+
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Queryset counterpart of `has_obj_perm()` above. The scope is matched by looking up the
+        scope owner and the scope permissions for each scope model, while the role priority is
+        compared with a subquery on the user's role assignments in the same scope.
+        """
+        from ..role_assignment import RoleAssignment
+
+        # The scope owner is always authorized
+        owned   = models.Q(pk__in=[])
+        allowed = models.Q(pk__in=[])
+
+        for content_type in ScopedRolesMixin.get_scope_model_content_types():
+            scope_model = content_type.model_class()
+            scope_pks   = scope_model._default_manager.filter(scope_model.get_role_perm_filter(user_obj, perm)).values("pk")
+            allowed    |= models.Q(scope_type=content_type, scope_uuid__in=scope_pks)
+
+            if user_obj.is_authenticated:
+                owner_pks = scope_model._default_manager.filter(owner=user_obj).values("pk")
+                owned    |= models.Q(scope_type=content_type, scope_uuid__in=owner_pks)
+
+        # Special case self-enrollment and viewing the information
+        if perm == "openbook_auth.self_enroll" or ".view_" in perm:
+            return owned | allowed
+
+        # Updates are only allowed when the role is of same or lower priority than any own role
+        if not user_obj.is_authenticated:
+            return owned
+        elif hasattr(cls, "priority"):
+            priority = models.OuterRef("priority")
+        elif hasattr(cls, "role"):
+            priority = models.OuterRef("role__priority")
+        else:
+            return owned
+
+        higher_roles = RoleAssignment.objects.filter(
+            RoleAssignment.get_active_filter(),
+            scope_type          = models.OuterRef("scope_type"),
+            scope_uuid          = models.OuterRef("scope_uuid"),
             user                = user_obj,
-            role__priority__gte = priority
-        ).count() > 0
+            role__priority__gte = priority,
+        )
+
+        return owned | (allowed & models.Q(models.Exists(higher_roles)))
+
+    @classmethod
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
+        """
+        Batch counterpart of `has_obj_perm()` above. The objects are grouped by scope, so that the
+        scope owners and effective permissions can be fetched for all scopes of the same type at once.
+        """
+        from ..role import Role
+
+        scope_pks = {}
+
+        for obj in objs:
+            if obj.scope_type_id is not None:
+                scope_pks.setdefault(obj.scope_type_id, set()).add(obj.scope_uuid)
+
+        owners    = {}
+        effective = {}
+
+        for scope_type_id, pks in scope_pks.items():
+            scope_model = content_type_registry.get_for_id(scope_type_id).model_class()
+
+            for pk, owner_id in scope_model._default_manager.filter(pk__in=pks).values_list("pk", "owner_id"):
+                owners[(scope_type_id, pk)] = owner_id
+
+            for pk, value in scope_model.get_effective_permissions_for_scopes(user_obj, pks).items():
+                effective[(scope_type_id, pk)] = value
+
+        # Priorities of the roles referenced by the objects
+        if hasattr(cls, "priority"):
+            priorities = {obj.pk: obj.priority for obj in objs}
+        elif hasattr(cls, "role"):
+            role_priorities = dict(Role.objects.filter(pk__in={obj.role_id for obj in objs}).values_list("pk", "priority"))
+            priorities = {obj.pk: role_priorities.get(obj.role_id) for obj in objs}
+        else:
+            priorities = {}
+
+        result = set()
+
+        for obj in objs:
+            scope_key = (obj.scope_type_id, obj.scope_uuid)
+
+            # The scope owner is always authorized
+            if user_obj.is_authenticated and owners.get(scope_key) == user_obj.pk:
+                result.add(obj.pk)
+                continue
+
+            # Next require the general permission granted in the scope
+            if scope_key not in effective or perm not in effective[scope_key].perms:
+                continue
+
+            # Special case self-enrollment and viewing the information
+            if perm == "openbook_auth.self_enroll" or ".view_" in perm:
+                result.add(obj.pk)
+                continue
+
+            # Updates are only allowed when the role is of same or lower priority than any own role
+            priority     = priorities.get(obj.pk)
+            own_priority = effective[scope_key].priority
+
+            if user_obj.is_authenticated and priority is not None and own_priority is not None and own_priority >= priority:
+                result.add(obj.pk)
+
+        return result
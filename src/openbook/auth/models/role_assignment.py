@@ -6,24 +6,33 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+import hmac, uuid
+
+from datetime                             import datetime
 from typing                               import TYPE_CHECKING
 from django.conf                          import settings
 from django.contrib.auth.models           import AbstractUser
 from django.core.exceptions               import PermissionDenied
+from django.db                            import IntegrityError
 from django.db                            import models
+from django.db                            import transaction
 from django.utils.translation             import gettext_lazy as _
 from django.utils.timezone                import now
 
 from openbook.core.models.mixins.active   import ActiveInactiveMixin
 from openbook.core.models.mixins.datetime import ValidityTimeSpanMixin
 from openbook.core.models.mixins.uuid     import UUIDMixin
+from openbook.core.utils.cache            import bump_cache_version
 from .mixins.audit                        import CreatedModifiedByMixin
 from .mixins.scope                        import ScopeMixin
+from .mixins.scope                        import ScopedRolesMixin
 from ..middleware.current_user            import get_current_user
+from ..middleware.permission_memo         import suspend_permission_memo
 
 if TYPE_CHECKING:
     from .access_request    import AccessRequest
     from .enrollment_method import EnrollmentMethod
+    from .role              import Role
 
 class RoleAssignment(UUIDMixin, ScopeMixin, ActiveInactiveMixin, ValidityTimeSpanMixin, CreatedModifiedByMixin):
     """
@@ -52,11 +61,46 @@ class RoleAssignment(UUIDMixin, ScopeMixin, ActiveInactiveMixin, ValidityTimeSpa
         indexes = [
             models.Index(fields=("scope_type", "scope_uuid", "role", "user")),
             models.Index(fields=("user",)),
+            models.Index(fields=("is_active", "end_date")),
         ]
 
     def __str__(self):
         return f"{self.user.username}: {self.role.name} {ActiveInactiveMixin.__str__(self)}".strip()
 
+    @classmethod
+    def get_active_filter(cls) -> models.Q:
+        """
+        Get a `Q` object matching all role assignments that currently grant their role, i.e. that
+        are active and within their validity time span. Used by all permission queries.
+        """
+        return models.Q(is_active=True) & cls.get_validity_filter()
+
+    @classmethod
+    def deactivate_expired(cls, batch_size: int = 1000) -> int:
+        """
+        Deactivate all active role assignments whose end date has passed and return their number.
+        This happens in batches, each with a separate short `UPDATE` statement, so that expiring
+        many assignments at once (e.g. at the end of a semester) doesn't lock the table for long.
+        Bulk updates don't send signals, so the permission caches of the affected scopes are
+        invalidated here. Usually called by the management command `deactivate_expired`.
+        """
+        timestamp = now()
+        count     = 0
+
+        while True:
+            batch = list(cls.objects.filter(is_active=True, end_date__lte=timestamp).values_list("pk", "scope_type_id", "scope_uuid")[:batch_size])
+
+            if not batch:
+                break
+
+            cls.objects.filter(pk__in=[pk for pk, _, _ in batch]).update(is_active=False)
+            count += len(batch)
+
+            for scope_type_id, scope_uuid in {(scope_type_id, scope_uuid) for _, scope_type_id, scope_uuid in batch}:
+                bump_cache_version(ScopedRolesMixin.get_scope_cache_version_name(scope_type_id, scope_uuid))
+
+        return count
+
     def clean(self):
         """
         Set assignment method to manual, when it is empty. Needed for the Django Admin, because
@@ -81,17 +125,25 @@ class RoleAssignment(UUIDMixin, ScopeMixin, ActiveInactiveMixin, ValidityTimeSpa
         assignment. For access requests the user should not be given, as it is already contained
         in the access request object. For enrollment methods it must be given, however.
 
+        This is idempotent and optimized for many concurrent self-enrollments: Repeating an
+        enrollment only reads the existing role assignment and doesn't write anything, unless it
+        must be renewed. New role assignments are inserted in a savepoint, so that concurrent
+        requests for the same user (e.g. double-clicks) don't fail on the unique constraint but
+        simply see the other request's role assignment. For enrollment methods with a maximum
+        number of enrollments a place is reserved with an atomic counter at the same time.
+
         Raises `PermissionDenied` when the `permission_user` or the current request users lacks
         the `openbook_auth.add_roleassignment` permission.
 
-        Also raises a `PermissionDenied` when the passphrase doesn't match or the user is missing.
+        Also raises a `PermissionDenied` when the passphrase doesn't match, the user is missing
+        or no places are left.
         """
         from .access_request    import AccessRequest
         from .enrollment_method import EnrollmentMethod
 
         # Check parameters
         if hasattr(enrollment, "passphrase") and check_passphrase:
-            if enrollment.passphrase and enrollment.passphrase != passphrase:
+            if enrollment.passphrase and not hmac.compare_digest(enrollment.passphrase.encode(), (passphrase or "").encode()):
                 raise PermissionDenied(_("Incorrect passphrase"))
         
         if not user and hasattr(enrollment, "user"):
@@ -108,37 +160,211 @@ class RoleAssignment(UUIDMixin, ScopeMixin, ActiveInactiveMixin, ValidityTimeSpa
             if not permission_user.has_perm("openbook_auth.add_roleassignment", enrollment):
                     raise PermissionDenied()
 
+        # Calculate new end date
+        timestamp = now()
+
+        if enrollment.end_date is not None:
+            end_date = enrollment.end_date
+        elif enrollment.duration_period and enrollment.duration_value:
+            end_date = enrollment.add_duration_to(timestamp)
+        else:
+            end_date = None
+
         # Add role assignment for user
         assignment_methods = {
             EnrollmentMethod: cls.AssignmentMethod.SELF_ENROLLMENT,
             AccessRequest:    cls.AssignmentMethod.ACCESS_REQUEST,
         }
-    
-        try:
-            role_assignment = cls.objects.get(
-                scope_type  = enrollment.scope_type,
-                scope_uuid  = enrollment.scope_uuid,
-                role        = enrollment.role,
-                user        = user,
-            )
-        except cls.DoesNotExist:
+
+        unique_fields = {
+            "scope_type_id": enrollment.scope_type_id,
+            "scope_uuid":    enrollment.scope_uuid,
+            "role_id":       enrollment.role_id,
+            "user_id":       user.pk,
+        }
+
+        role_assignment = cls.objects.filter(**unique_fields).first()
+
+        if not role_assignment:
             role_assignment = cls(
-                scope_type        = enrollment.scope_type,
-                scope_uuid        = enrollment.scope_uuid,
-                role              = enrollment.role,
-                user              = user,
+                **unique_fields,
                 assignment_method = assignment_methods.get(type(enrollment), cls.AssignmentMethod.MANUAL),
-                start_date        = now(),
+                enrollment_method = enrollment if isinstance(enrollment, EnrollmentMethod) else None,
+                start_date        = timestamp,
+                end_date          = end_date,
             )
 
-        if enrollment.end_date is not None:
-            role_assignment.end_date = enrollment.end_date
-        elif enrollment.duration_period and enrollment.duration_value:
-            role_assignment.end_date = enrollment.add_duration_to(now())
+            try:
+                with transaction.atomic():
+                    if isinstance(enrollment, EnrollmentMethod):
+                        enrollment.reserve_place()
+
+                    role_assignment.save(force_insert=True)
+            except IntegrityError:
+                # Inserted concurrently by another request
+                role_assignment = cls.objects.get(**unique_fields)
+            else:
+                role_assignment.role = enrollment.role
+                role_assignment.user = user
+                return role_assignment
+
+        # Renew existing role assignment, if needed
+        role_assignment.role = enrollment.role
+        role_assignment.user = user
+        update_fields = []
+
+        if role_assignment.end_date is not None and role_assignment.end_date <= timestamp:
+            # Renew expired assignment
+            role_assignment.is_active = True
+            role_assignment.end_date  = None
+            update_fields += ["is_active", "end_date"]
+
+        if end_date is not None and role_assignment.end_date != end_date:
+            role_assignment.end_date = end_date
+            update_fields.append("end_date")
+
+        if update_fields:
+            role_assignment.save(update_fields=list(dict.fromkeys([*update_fields, "modified_by", "modified_at"])))
 
-        role_assignment.save()
         return role_assignment
 
+    @classmethod
+    def bulk_enroll(cls,
+        role: "Role",
+        usernames: list[str],
+        end_date: datetime|None = None,
+        enrollment_method: "EnrollmentMethod|None" = None,
+        permission_user: AbstractUser|None = None,
+        check_permission: bool = True,
+        batch_size: int = 500,
+    ) -> dict:
+        """
+        Assign the given role to many users at once, e.g. to enroll a whole cohort of students.
+        Unlike calling `enroll()` for each user, the permission is checked only once for the scope
+        of the role, all users are resolved with a single query and the role assignments are written
+        with `bulk_create()`. Existing assignments are updated instead of duplicated, like `enroll()`
+        does: They are activated again, expired assignments are renewed and the end date is set,
+        if given.
+
+        Returns a dictionary with the number of `created`, `updated` and `skipped` assignments
+        as well as the `unknown_usernames`. Assignments are skipped when they are already active
+        with the same end date or when the user doesn't exist.
+
+        Raises `PermissionDenied` when the `permission_user` or the current request users lacks
+        the `openbook_auth.add_roleassignment` permission in the scope of the role.
+        """
+        # Check permissions
+        if not permission_user:
+            permission_user = get_current_user()
+
+        if check_permission and permission_user:
+            scope_obj = cls(scope_type=role.scope_type, scope_uuid=role.scope_uuid, role=role)
+
+            if not permission_user.has_perm("openbook_auth.add_roleassignment", scope_obj):
+                raise PermissionDenied()
+
+        # Resolve users
+        from .user import User
+
+        usernames   = list(dict.fromkeys(username.strip() for username in usernames if username and username.strip()))
+        users       = {user.username: user for user in User.objects.filter(username__in=usernames)}
+        modified_by = permission_user if permission_user and permission_user.is_authenticated else None
+
+        unknown_usernames = [username for username in usernames if username not in users]
+
+        # Insert or update role assignments
+        result = cls.bulk_assign([
+            cls(
+                scope_type_id     = role.scope_type_id,
+                scope_uuid        = role.scope_uuid,
+                role              = role,
+                user              = user,
+                assignment_method = cls.AssignmentMethod.MANUAL,
+                enrollment_method = enrollment_method,
+                end_date          = end_date,
+                created_by        = modified_by,
+                modified_by       = modified_by,
+            )
+            for user in users.values()
+        ], batch_size=batch_size)
+
+        result["skipped"]          += len(unknown_usernames)
+        result["unknown_usernames"] = unknown_usernames
+        return result
+
+    @classmethod
+    def bulk_assign(cls, role_assignments: list["RoleAssignment"], batch_size: int = 500) -> dict:
+        """
+        Set-based counterpart of the last part of `enroll()`: Save the given new role assignment
+        objects with a single query to find the existing assignments and a single `bulk_create()`.
+        Existing assignments for the same scope, role and user are updated instead of duplicated:
+        They are activated again, expired assignments are renewed and the end date is set, if given.
+        Permissions must have been checked by the caller.
+
+        Returns a dictionary with the number of `created`, `updated` and `skipped` assignments.
+        Assignments are skipped when they are already active with the same end date.
+        """
+        result = {"created": 0, "updated": 0, "skipped": 0}
+
+        if not role_assignments:
+            return result
+
+        existing = {
+            (role_assignment.role_id, role_assignment.user_id): role_assignment
+            for role_assignment in cls.objects.filter(
+                role__in = {role_assignment.role_id for role_assignment in role_assignments},
+                user__in = {role_assignment.user_id for role_assignment in role_assignments},
+            )
+        }
+
+        timestamp = now()
+        changed   = {}
+
+        for role_assignment in role_assignments:
+            key                 = (role_assignment.role_id, role_assignment.user_id)
+            old_role_assignment = existing.get(key, None)
+
+            if old_role_assignment:
+                expired = old_role_assignment.end_date is not None and old_role_assignment.end_date <= timestamp
+
+                if role_assignment.end_date is None and not expired:
+                    role_assignment.end_date = old_role_assignment.end_date
+
+            if key in changed:
+                # Later entries for the same role and user win, like with repeated calls to enroll()
+                pass
+            elif not old_role_assignment:
+                result["created"] += 1
+            elif old_role_assignment.is_active and old_role_assignment.end_date == role_assignment.end_date:
+                result["skipped"] += 1
+                continue
+            else:
+                result["updated"] += 1
+
+            role_assignment.id         = uuid.uuid4()    # Not set automatically without save()
+            role_assignment.is_active  = True
+            role_assignment.start_date = timestamp
+            changed[key]               = role_assignment
+
+        # Insert or update all at once. Conflicts with concurrently added assignments are
+        # resolved by the database. Bulk operations don't send signals, so that the permission
+        # cache of the scopes must be invalidated here.
+        if changed:
+            cls.objects.bulk_create(
+                changed.values(),
+                batch_size       = batch_size,
+                update_conflicts = True,
+                unique_fields    = ["scope_type", "scope_uuid", "role", "user"],
+                update_fields    = ["is_active", "end_date", "modified_by", "modified_at"],
+            )
+
+            suspend_permission_memo()
+
+            for scope_type_id, scope_uuid in {(ra.scope_type_id, ra.scope_uuid) for ra in changed.values()}:
+                bump_cache_version(ScopedRolesMixin.get_scope_cache_version_name(scope_type_id, scope_uuid))
+
+        return result
+
     @classmethod
     def withdraw(cls,
         enrollment:"EnrollmentMethod|AccessRequest",
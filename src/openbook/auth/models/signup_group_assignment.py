@@ -9,6 +9,7 @@
 import re
 
 from allauth.socialaccount.models       import SocialApp
+from typing                             import Callable
 from django.db                          import models
 from django.utils.translation           import gettext_lazy as _
 
@@ -16,6 +17,37 @@ from openbook.core.models.mixins.active import ActiveInactiveMixin
 from openbook.core.models.mixins.uuid   import UUIDMixin
 from openbook.core.models.mixins.text   import NameDescriptionMixin
 from openbook.core.models.site          import Site
+from openbook.core.utils.cache          import VersionedMemo
+
+# Process-local copy of the compiled matchers, keyed by (site id, provider)
+_matchers: VersionedMemo["SignupGroupMatcher|None"] = VersionedMemo()
+
+class SignupGroupMatcher:
+    """
+    Compiled version of all active group assignments of a site and social app (or local accounts).
+    The assertions are reduced to precompiled tests, and the group ids are resolved in advance, so
+    that the groups of a new user can be determined without any database queries. Instances are
+    created and cached by `SignupGroupAssignment.get_matcher()`.
+    """
+    def __init__(self, rules: list[tuple[list[tuple[str, Callable[[str], bool]]], frozenset[int]]]):
+        """
+        Each rule consists of the assertions (name and value test) that must all match,
+        and the ids of the groups to assign then.
+        """
+        self.rules = rules
+
+    def get_group_ids(self, extra_data: dict|list[dict]|None = None) -> set[int]:
+        """
+        Get the ids of all groups to assign to a new user. The assertions are only checked
+        when `extra_data` from the social account entry is given.
+        """
+        result = set()
+
+        for assertions, group_ids in self.rules:
+            if extra_data is None or all(SecurityAssertion.match_test(name, test, extra_data) for name, test in assertions):
+                result |= group_ids
+
+        return result
 
 class SignupGroupAssignment(UUIDMixin, ActiveInactiveMixin, NameDescriptionMixin):
     """
@@ -50,9 +82,52 @@ class SignupGroupAssignment(UUIDMixin, ActiveInactiveMixin, NameDescriptionMixin
         verbose_name        = _("Group Assignment on Signup")
         verbose_name_plural = _("Group Assignments on Signup")
 
+    CACHE_VERSION_NAME = "openbook_auth:signup_group_assignments"
+
     def __str__(self):
         return self.name if self.name else "---"
 
+    @classmethod
+    def get_matcher(cls, site_id: int|None, provider: str|None = None) -> SignupGroupMatcher|None:
+        """
+        Get the compiled group assignments for the given site and social account provider (or
+        local accounts, if `None`). Returns `None` when no social app exists for the provider.
+        The matchers are compiled once per process and compiled again only when the cache version
+        (bumped by signals when group assignments, assertions or social apps are changed) has
+        changed, e.g. due to changes in another worker process.
+        """
+        return _matchers.get(cls.CACHE_VERSION_NAME, lambda: cls._compile_matcher(site_id, provider), key=(site_id, provider))
+
+    @classmethod
+    def _compile_matcher(cls, site_id: int|None, provider: str|None) -> SignupGroupMatcher|None:
+        """
+        Read the group assignments for `get_matcher()` from the database and compile them.
+        """
+        social_app_id = None
+
+        if provider:
+            social_app_id = (
+                SocialApp.objects.filter(provider_id=provider).values_list("pk", flat=True).first()
+                or SocialApp.objects.filter(provider=provider).values_list("pk", flat=True).first()
+            )
+
+        if provider and not social_app_id:
+            return None
+
+        group_assignments = cls.objects.filter(
+            models.Q(is_active = True),
+            models.Q(social_app_id = social_app_id),
+            models.Q(site = None) | models.Q(site_id = site_id),
+        ).prefetch_related("assertions", "groups")
+
+        return SignupGroupMatcher([
+            (
+                [(assertion.name, assertion.get_test()) for assertion in group_assignment.assertions.all()],
+                frozenset(group.pk for group in group_assignment.groups.all()),
+            )
+            for group_assignment in group_assignments
+        ])
+
     def match(self, extra_data: dict|list[dict]) -> bool:
         """
         Check if the given extra data from the social account entry matches all scopes/assertions.
@@ -113,43 +188,54 @@ class SecurityAssertion(UUIDMixin):
     def __str__(self):
         return f"{self.name or ""} {self.match_strategy or ""} {self.value or ""}".strip()
 
+    def get_test(self) -> Callable[[str], bool]:
+        """
+        Get a function that checks a single value according to the match strategy. Regular
+        expressions are compiled only once here, instead of for each checked value.
+        """
+        expected = self.value or ""
+
+        if self.match_strategy == self.MatchStrategy.EXACT:
+            return lambda value: value == self.value
+        elif self.match_strategy == self.MatchStrategy.CONTAINS:
+            return lambda value: expected in value
+        elif self.match_strategy == self.MatchStrategy.STARTS_WITH:
+            return lambda value: value.startswith(expected)
+        elif self.match_strategy == self.MatchStrategy.ENDS_WITH:
+            return lambda value: value.endswith(expected)
+        elif self.match_strategy == self.MatchStrategy.REGEX:
+            return re.compile(expected).match
+        elif self.match_strategy == self.MatchStrategy.ANY:
+            return lambda value: True
+        else:
+            return lambda value: False
+
     def match(self, extra_data: dict|list[dict]) -> bool:
         """
         Check if the given extra data from the social account entry matches the scope or assertion.
         """
-        def _match_value(value) -> bool:
-            value = str(value)
-
-            if self.match_strategy == self.MatchStrategy.EXACT:
-                return value == self.value
-            elif self.match_strategy == self.MatchStrategy.CONTAINS:
-                return self.value in value
-            elif self.match_strategy == self.MatchStrategy.STARTS_WITH:
-                return value.startswith(self.value)
-            elif self.match_strategy == self.MatchStrategy.ENDS_WITH:
-                return value.endswith(self.value)
-            elif self.match_strategy == self.MatchStrategy.REGEX:
-                pattern = re.compile(self.value)
-                return bool(pattern.match(value))
-            elif self.match_strategy == self.MatchStrategy.ANY:
-                return True
-            else:
-                return False
+        return self.match_test(self.name, self.get_test(), extra_data)
 
+    @staticmethod
+    def match_test(name: str, test: Callable[[str], bool], extra_data: dict|list[dict]) -> bool:
+        """
+        Check if the given extra data contains a value for the given name that passes the test
+        returned by `get_test()`.
+        """
         def _match_dict(data: dict) -> bool:
-            if self.name not in data:
+            if name not in data:
                 return False
             
-            value = data[self.name]
+            value = data[name]
 
             if isinstance(value, list):
                 for child_value in value:
-                    if _match_value(child_value):
+                    if test(str(child_value)):
                         return True    
                     
                 return False
             else:
-                return _match_value(value)
+                return bool(test(str(value)))
             
         if isinstance(extra_data, list):
             for child_data in extra_data:
@@ -158,4 +244,4 @@ class SecurityAssertion(UUIDMixin):
                 
             return False
         else:
-            return _match_dict(extra_data)
\ No newline at end of file
+            return _match_dict(extra_data)
@@ -70,3 +70,17 @@ class User(AbstractUser):
         Allow users to update and delete their account.
         """
         return self.username == user_obj.username
+
+    @classmethod
+    def get_obj_perm_filter(cls, user_obj: AbstractUser, perm: str) -> models.Q|None:
+        """
+        Queryset counterpart of `has_obj_perm()` above.
+        """
+        return models.Q(username=user_obj.username) if user_obj.is_authenticated else models.Q(pk__in=[])
+
+    @classmethod
+    def has_obj_perms(cls, user_obj: AbstractUser, perm: str, objs: list) -> set:
+        """
+        Batch counterpart of `has_obj_perm()` above.
+        """
+        return {obj.pk for obj in objs if obj.username == user_obj.username}
@@ -0,0 +1,270 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from allauth.socialaccount.models       import SocialApp
+from django.contrib.auth.models         import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db.models                   import F
+from django.db.models.signals           import m2m_changed
+from django.db.models.signals           import post_delete
+from django.db.models.signals           import post_migrate
+from django.db.models.signals           import post_save
+from django.db.models.signals           import pre_save
+from django.dispatch                    import receiver
+
+from openbook.core.utils.cache          import bump_cache_version
+from openbook.core.utils.site_config    import bump_site_config_version
+from .middleware.permission_memo        import suspend_permission_memo
+from .models.anonymous_permission       import AnonymousPermission
+from .models.allowed_role_permission    import AllowedRolePermission
+from .models.auth_config                import AuthConfig
+from .models.auth_config                import AuthConfigText
+from .models.auth_token                 import AuthToken
+from .models.enrollment_method          import EnrollmentMethod
+from .models.group                      import Group
+from .models.permission_text            import PermissionText
+from .models.mixins.scope               import ScopedRolesMixin
+from .models.role                       import Role
+from .models.role_assignment            import RoleAssignment
+from .models.signup_group_assignment    import SecurityAssertion
+from .models.signup_group_assignment    import SignupGroupAssignment
+from .models.user                       import User
+from .utils                             import PERMISSION_CATALOG_VERSION_NAME
+from .utils                             import permission_registry
+from .utils                             import scope_type_registry
+
+def bump_scope_version(scope_type_id: int, scope_uuid):
+    """
+    Invalidate the cached effective permissions of all users in the given scope. Also
+    suspend the permission memo of the current request until the transaction is committed.
+    """
+    suspend_permission_memo()
+    bump_cache_version(ScopedRolesMixin.get_scope_cache_version_name(scope_type_id, scope_uuid))
+
+def bump_user_permissions_version(user_id: int):
+    """
+    Invalidate the cached user and group permissions of the given user.
+    """
+    suspend_permission_memo()
+    bump_cache_version(f"openbook_auth:user_permissions:{user_id}")
+
+def bump_group_permissions_version():
+    """
+    Invalidate the cached user and group permissions of all users.
+    """
+    suspend_permission_memo()
+    bump_cache_version("openbook_auth:group_permissions")
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=RoleAssignment)
+@receiver(post_delete, sender=RoleAssignment)
+def scope_object_changed(sender, instance, **kwargs):
+    """
+    Roles or role assignments have been created, changed or deleted.
+    """
+    bump_scope_version(instance.scope_type_id, instance.scope_uuid)
+
+@receiver(post_delete, sender=RoleAssignment)
+def role_assignment_deleted(sender, instance, **kwargs):
+    """
+    Release the place of a self-enrollment, so that the maximum number of enrollments
+    of the enrollment method is not reached too early.
+    """
+    if instance.enrollment_method_id and instance.assignment_method == RoleAssignment.AssignmentMethod.SELF_ENROLLMENT:
+        EnrollmentMethod.objects.filter(pk=instance.enrollment_method_id, enrollment_count__gt=0).update(enrollment_count=F("enrollment_count") - 1)
+
+@receiver(post_migrate)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permissions_changed(sender, **kwargs):
+    """
+    Reload permissions after migrations or when they have been changed.
+    """
+    permission_registry.reset()
+    bump_group_permissions_version()
+    bump_cache_version(PERMISSION_CATALOG_VERSION_NAME)
+
+@receiver(post_migrate)
+@receiver(post_save, sender=ContentType)
+@receiver(post_delete, sender=ContentType)
+def content_types_changed(sender, **kwargs):
+    """
+    Resolve the content types of the scope models again after migrations or when content types
+    have been changed.
+    """
+    scope_type_registry.reset()
+    bump_cache_version(PERMISSION_CATALOG_VERSION_NAME)
+
+@receiver(post_save, sender=PermissionText)
+@receiver(post_delete, sender=PermissionText)
+def permission_catalog_changed(sender, **kwargs):
+    """
+    Rebuild the permission catalog when permission translations have been changed.
+    """
+    bump_cache_version(PERMISSION_CATALOG_VERSION_NAME)
+
+@receiver(post_save, sender=AllowedRolePermission)
+@receiver(post_delete, sender=AllowedRolePermission)
+def allowed_role_permissions_changed(sender, **kwargs):
+    """
+    Allowed role permissions have been created, changed or deleted. Reload them and rebuild
+    the permission catalog, which lists the scope types of each permission.
+    """
+    bump_cache_version(AllowedRolePermission.CACHE_VERSION_NAME)
+    bump_cache_version(PERMISSION_CATALOG_VERSION_NAME)
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    """
+    New users must never see cached permissions of a deleted user with the same id.
+    """
+    if created:
+        bump_user_permissions_version(instance.pk)
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Users have been deleted.
+    """
+    bump_user_permissions_version(instance.pk)
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Cached tokens contain a copy of the user, which might be outdated now. Except when only
+    the last login has been updated, which happens on each login and is never used from the copy.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+
+    bump_cache_version(AuthToken.get_user_cache_version_name(instance.pk))
+
+@receiver(pre_save, sender=AuthToken)
+def auth_token_saving(sender, instance, raw=False, **kwargs):
+    """
+    Forget the previous token value, if it is about to be changed.
+    """
+    if not raw and not instance._state.adding:
+        AuthToken.invalidate_cache(AuthToken.objects.filter(pk=instance.pk).values_list("token", flat=True))
+
+@receiver(post_save, sender=AuthToken)
+@receiver(post_delete, sender=AuthToken)
+def auth_token_changed(sender, instance, **kwargs):
+    """
+    Tokens have been created, changed or deleted.
+    """
+    AuthToken.invalidate_cache([instance.token])
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Groups or permissions have been added to or removed from users.
+    """
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        user_ids = [instance.pk]
+    elif reverse and action in ("post_add", "post_remove"):
+        user_ids = pk_set
+    elif reverse and action == "pre_clear":
+        user_ids = instance.user_set.values_list("pk", flat=True)
+    else:
+        return
+
+    for user_id in user_ids:
+        bump_user_permissions_version(user_id)
+
+@receiver(post_delete, sender=Group)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action=None, **kwargs):
+    """
+    Groups have been deleted or their permissions have been changed.
+    """
+    if action in (None, "post_add", "post_remove", "post_clear"):
+        bump_group_permissions_version()
+
+@receiver(post_save, sender=AnonymousPermission)
+@receiver(post_delete, sender=AnonymousPermission)
+def anonymous_permission_changed(sender, instance, **kwargs):
+    """
+    Anonymous permissions have been created, changed or deleted.
+    """
+    suspend_permission_memo()
+    bump_cache_version(AnonymousPermission.CACHE_VERSION_NAME)
+
+@receiver(post_save, sender=SignupGroupAssignment)
+@receiver(post_delete, sender=SignupGroupAssignment)
+@receiver(m2m_changed, sender=SignupGroupAssignment.groups.through)
+@receiver(post_save, sender=SecurityAssertion)
+@receiver(post_delete, sender=SecurityAssertion)
+@receiver(post_save, sender=SocialApp)
+@receiver(post_delete, sender=SocialApp)
+@receiver(post_delete, sender=Group)
+def signup_group_assignments_changed(sender, action=None, **kwargs):
+    """
+    Group assignments on sign-up, their assertions or groups, or social apps have been changed.
+    """
+    if action in (None, "post_add", "post_remove", "post_clear"):
+        bump_cache_version(SignupGroupAssignment.CACHE_VERSION_NAME)
+
+@receiver(post_save, sender=AuthConfig)
+@receiver(post_delete, sender=AuthConfig)
+def auth_config_changed(sender, instance, **kwargs):
+    """
+    Reload the site configuration when the authentication settings have been changed.
+    """
+    bump_site_config_version(instance.site_id)
+
+@receiver(post_save, sender=AuthConfigText)
+@receiver(post_delete, sender=AuthConfigText)
+def auth_config_text_changed(sender, instance, **kwargs):
+    """
+    Reload the site configuration when the authentication texts have been changed.
+    """
+    bump_site_config_version(instance.parent_id)
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def role_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Permissions have been added to or removed from roles.
+    """
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        roles = [instance]
+    elif reverse and action in ("post_add", "post_remove"):
+        roles = Role.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        roles = instance.roles.all()
+    else:
+        return
+
+    for role in roles:
+        bump_scope_version(role.scope_type_id, role.scope_uuid)
+
+def scope_changed(sender, instance, **kwargs):
+    """
+    A scope has been saved or deleted.
+    """
+    bump_scope_version(ContentType.objects.get_for_model(instance).pk, instance.pk)
+
+def public_permissions_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    The public permissions of a scope have been changed.
+    """
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        scope_type_id = ContentType.objects.get_for_model(instance).pk
+        bump_scope_version(scope_type_id, instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        scope_type_id = ContentType.objects.get_for_model(model).pk
+
+        for scope_uuid in pk_set:
+            bump_scope_version(scope_type_id, scope_uuid)
+
+for scope_model in scope_type_registry.get_models():
+    post_save.connect(scope_changed, sender=scope_model)
+    post_delete.connect(scope_changed, sender=scope_model)
+    m2m_changed.connect(public_permissions_changed, sender=scope_model.public_permissions.through)
@@ -24,6 +24,11 @@ class ScopeDependantFieldsHandler {
     scopeUuidChangeEventListenerRegistered = false;
     permissionsFromMutationObserver;
     retryCount = 0;
+    searchField;
+    searchTimeout;
+
+    // Scope objects are fetched page by page, since there may be thousands of them
+    pageSize = 100;
 
     // Scope type data from backend
     scopeTypeDetails = {
@@ -32,6 +37,16 @@ class ScopeDependantFieldsHandler {
         data:      {},
     }
 
+    // First page of the matching scope objects from backend
+    scopeObjects = {
+        scopeType: "",
+        search:    "",
+        inFlight:  false,
+        pending:   null,
+        newType:   false,
+        data:      {},
+    }
+
     /**
      * Kickstart handling. This calls all other methods as required.
      */
@@ -43,6 +58,7 @@ class ScopeDependantFieldsHandler {
     
             if (this.scopeTypeField && !permissionsOnly) {
                 await this.fetchScopeTypeDetails(this.scopeTypeField.value || "");
+                await this.fetchScopeObjects(this.scopeTypeField.value || "", this.searchField?.value || "");
                 this.updateScopeUuidField();
             }
 
@@ -124,22 +140,116 @@ class ScopeDependantFieldsHandler {
         this.scopeTypeDetails.inFlight = false;
     }
 
+    /**
+     * Fetch the first page of scope objects, whose name or slug starts with the search text,
+     * if the scope type or search text has been changed. If another request is currently in
+     * flight, only the latest scope type and search text are remembered and fetched, once
+     * the running request has finished. So no search typed in the meantime gets lost.
+     * 
+     * @param {String} scopeType Selected scope type value
+     * @param {String} search Search text
+     */
+    async fetchScopeObjects(scopeType, search) {
+        if (!scopeType || !this.scopeUuidField || this.scopeUuidField.disabled) return;
+
+        if (this.scopeObjects.inFlight) {
+            this.scopeObjects.pending = {scopeType, search};
+            return;
+        }
+
+        let newType = false;
+
+        while (this.scopeObjects.scopeType !== scopeType || this.scopeObjects.search !== search) {
+            newType = newType || this.scopeObjects.scopeType !== scopeType;
+
+            this.scopeObjects.newType   = newType;
+            this.scopeObjects.scopeType = scopeType;
+            this.scopeObjects.search    = search;
+            this.scopeObjects.inFlight  = true;
+            this.scopeObjects.pending   = null;
+
+            let queryParameters = new URLSearchParams();
+            queryParameters.append("_page_size", this.pageSize);
+            if (search) queryParameters.append("_search", search);
+
+            let url = `/api/auth/scope_types/${scopeType}/objects/?${queryParameters}`;
+            let response = await fetch(url);
+
+            if (!response.ok) {
+                this.scopeObjects.inFlight = false;
+                this.scopeObjects.pending  = null;
+                throw new Error(await response.text());
+            }
+
+            this.scopeObjects.data     = (await response.json()) || {};
+            this.scopeObjects.inFlight = false;
+
+            if (this.scopeObjects.pending) {
+                ({scopeType, search} = this.scopeObjects.pending);
+                this.scopeObjects.pending = null;
+            }
+        }
+    }
+
+    /**
+     * Add a search field above the scope UUID field, once the scope type has more objects
+     * than fit on one page. Typing into it fetches the matching objects again.
+     */
+    updateSearchField() {
+        if (this.searchField || !this.scopeObjects.data.next) return;
+
+        this.searchField = document.createElement("input");
+        this.searchField.type        = "search";
+        this.searchField.placeholder = "Search …";
+        this.searchField.className   = this.scopeUuidField.className;
+        this.searchField.classList.add("scope-uuid-search");
+        this.scopeUuidField.before(this.searchField);
+
+        this.searchField.addEventListener("input", () => {
+            window.clearTimeout(this.searchTimeout);
+
+            this.searchTimeout = window.setTimeout(async () => {
+                try {
+                    await this.fetchScopeObjects(this.scopeTypeField.value || "", this.searchField.value);
+                    this.updateScopeUuidField();
+                } catch (err) {
+                    console.error("Failed to search scope objects:", err);
+                }
+            }, 300);
+        });
+    }
+
     /**
      * Clear and repopulate scope UUID field, if it exists on the page.
      */
     updateScopeUuidField() {
-        if (!this.scopeUuidField) return;
-        if (this.scopeTypeDetails.inFlight) return;
+        if (!this.scopeUuidField || this.scopeUuidField.disabled) return;
+        if (this.scopeObjects.inFlight) return;
 
-        let selectedValue = this.scopeUuidField.querySelector("[selected]")?.value || "";
+        let selectedOption = this.scopeUuidField.selectedOptions[0] || this.scopeUuidField.querySelector("[selected]");
+        let selectedValue  = selectedOption?.value || "";
+        let found          = false;
         this.scopeUuidField.innerHTML = "";
 
-        for (let scope_object of this.scopeTypeDetails.data.objects || []) {
+        for (let scope_object of this.scopeObjects.data.results || []) {
             let option = new Option(scope_object.name, scope_object.uuid);
-            if (scope_object.uuid === selectedValue) option.selected = true;
+
+            if (scope_object.uuid === selectedValue) {
+                option.selected = true;
+                option.setAttribute("selected", "");
+                found = true;
+            }
+
             this.scopeUuidField.appendChild(option);
         }
 
+        if (selectedValue && !found && !this.scopeObjects.newType) {
+            // Keep the current selection while searching, even if it doesn't match
+            this.scopeUuidField.prepend(selectedOption);
+        }
+
+        this.updateSearchField();
+
         if (!selectedValue) {
             let option = new Option("", "");
             option.setAttribute("selected", "");
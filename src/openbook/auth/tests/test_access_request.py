@@ -295,6 +295,61 @@ class AccessRequest_Model_Tests(AccessRequest_Test_Mixin, TestCase):
 
         access_request4.save(permission_user=self.user_student)
 
+    def test_bulk_decide(self):
+        """
+        Bulk decisions update all access requests and their role assignments at once.
+        """
+        access_request1 = AccessRequest.from_obj(self.course, user=self.user_new, role=self.role_student)
+        access_request1.save(check_permission=False)
+
+        access_request2 = AccessRequest.from_obj(self.course, user=self.user_dummy, role=self.role_student)
+        access_request2.save(check_permission=False)
+
+        ids    = [access_request1.pk, access_request2.pk]
+        result = AccessRequest.bulk_decide(ids, AccessRequest.Decision.ACCEPTED, permission_user=self.user_assistant)
+
+        self.assertEqual(result, {"decided": 2, "unchanged": 0, "not_found": []})
+        self.assertEqual(AccessRequest.objects.filter(decision=AccessRequest.Decision.ACCEPTED).count(), 2)
+        self.assertEqual(AccessRequest.objects.filter(decision_date__isnull=False).count(), 2)
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role_student).count(), 3)
+
+        result = AccessRequest.bulk_decide(ids, AccessRequest.Decision.DENIED, permission_user=self.user_assistant)
+
+        self.assertEqual(result, {"decided": 2, "unchanged": 0, "not_found": []})
+        self.assertEqual(AccessRequest.objects.filter(decision=AccessRequest.Decision.DENIED).count(), 2)
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role_student).count(), 1)
+
+    def test_bulk_decide_permission_denied(self):
+        """
+        Nothing is changed when the permission is missing for any of the roles.
+        """
+        access_request1 = AccessRequest.from_obj(self.course, user=self.user_new, role=self.role_student)
+        access_request1.save(check_permission=False)
+
+        access_request2 = AccessRequest.from_obj(self.course, user=self.user_dummy, role=self.role_teacher)
+        access_request2.save(check_permission=False)
+
+        with self.assertRaises(PermissionDenied):
+            AccessRequest.bulk_decide([access_request1.pk, access_request2.pk], AccessRequest.Decision.ACCEPTED, permission_user=self.user_assistant)
+
+        self.assertEqual(AccessRequest.objects.filter(decision=AccessRequest.Decision.PENDING).count(), 2)
+        self.assertEqual(RoleAssignment.objects.filter(user__in=[self.user_new, self.user_dummy]).count(), 0)
+
+    def test_bulk_decide_change_permission(self):
+        """
+        Nothing is changed when the permission to change any of the requests is missing.
+        """
+        self.role_assistant.permissions.remove(permission_for_perm_string("openbook_auth.change_accessrequest"))
+
+        access_request = AccessRequest.from_obj(self.course, user=self.user_new, role=self.role_student)
+        access_request.save(check_permission=False)
+
+        with self.assertRaises(PermissionDenied):
+            AccessRequest.bulk_decide([access_request.pk], AccessRequest.Decision.ACCEPTED, permission_user=self.user_assistant)
+
+        access_request.refresh_from_db()
+        self.assertEqual(access_request.decision, AccessRequest.Decision.PENDING)
+
 class AccessRequest_ViewSet_Tests(ModelViewSetTestMixin, AccessRequest_Test_Mixin, TestCase):
     """
     Tests for the `AccessRequestViewSet` REST API.
@@ -402,3 +457,40 @@ class AccessRequest_ViewSet_Tests(ModelViewSetTestMixin, AccessRequest_Test_Mixi
         self.assertEqual(response.status_code, 200)
         self.access_request.refresh_from_db()
         self.assertEqual(self.access_request.decision, AccessRequest.Decision.DENIED)
+
+    def test_bulk_decide(self):
+        """
+        Bulk decisions should only consider visible access requests.
+        """
+        self.login(username="assistant", password="password")
+
+        unknown_id = "00000000-0000-0000-0000-000000000000"
+        url        = reverse("access_request-bulk-decide")
+        response   = self.client.post(url, {
+            "ids":      [str(self.access_request.pk), unknown_id],
+            "decision": AccessRequest.Decision.ACCEPTED,
+        }, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"decided": 1, "unchanged": 0, "not_found": [unknown_id]})
+
+        self.access_request.refresh_from_db()
+        self.assertEqual(self.access_request.decision, AccessRequest.Decision.ACCEPTED)
+
+    def test_bulk_decide_own_request(self):
+        """
+        Bulk decisions should skip visible access requests that the user cannot change.
+        """
+        self.login(username="new", password="password")
+
+        url      = reverse("access_request-bulk-decide")
+        response = self.client.post(url, {
+            "ids":      [str(self.access_request.pk)],
+            "decision": AccessRequest.Decision.ACCEPTED,
+        }, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"decided": 0, "unchanged": 0, "not_found": [str(self.access_request.pk)]})
+
+        self.access_request.refresh_from_db()
+        self.assertEqual(self.access_request.decision, AccessRequest.Decision.PENDING)
@@ -8,13 +8,16 @@
 
 from django.core.exceptions           import ValidationError
 from django.test                      import TestCase
+from tablib                           import Dataset
 
 from openbook.core.utils.content_type import content_type_for_model_string
 from openbook.test                    import ModelViewSetTestMixin
+from ..admin.role                     import RoleResource
 from ..middleware.current_user        import reset_current_user
 from ..models.allowed_role_permission import AllowedRolePermission
 from ..utils                          import permission_for_perm_string
 from ..validators                     import validate_permissions
+from ..validators                     import validate_permissions_bulk
 
 class AllowedRolePermissionTextest_Mixin:
     def setUp(self):
@@ -58,6 +61,60 @@ class AllowedRolePermission_Model_Tests(AllowedRolePermissionTextest_Mixin, Test
 
         with self.assertRaises(ValidationError):
             validate_permissions(self.scope_type, disallowed)
+
+    def test_permission_ids_cached(self):
+        """
+        The allowed permission ids should be loaded once and reloaded after changes.
+        """
+        add_logentry    = permission_for_perm_string("admin.add_logentry")
+        change_logentry = permission_for_perm_string("admin.change_logentry")
+        AllowedRolePermission.get_permission_ids(self.scope_type)
+
+        with self.assertNumQueries(0):
+            self.assertIn(add_logentry.pk, AllowedRolePermission.get_permission_ids(self.scope_type))
+            self.assertEqual(AllowedRolePermission.get_permission_ids(self.scope_type.pk), AllowedRolePermission.get_permission_ids(self.scope_type))
+            validate_permissions(self.scope_type, [add_logentry])
+
+        AllowedRolePermission.objects.create(scope_type=self.scope_type, permission=change_logentry)
+        validate_permissions(self.scope_type, [change_logentry])
+
+        self.allowed_permission.delete()
+
+        with self.assertRaises(ValidationError):
+            validate_permissions(self.scope_type, [add_logentry])
+
+    def test_validate_permissions_bulk(self):
+        """
+        All invalid items should be reported at once, keyed by their position.
+        """
+        allowed    = permission_for_perm_string("admin.view_logentry")
+        disallowed = permission_for_perm_string("admin.change_logentry")
+        other_type = content_type_for_model_string("openbook_auth.user")
+        validate_permissions_bulk([])
+
+        with self.assertNumQueries(0):
+            errors = validate_permissions_bulk([
+                (self.scope_type, [allowed]),
+                (self.scope_type, [allowed, disallowed]),
+                (None, [disallowed]),
+                (other_type, [allowed]),
+            ])
+
+        self.assertEqual(list(errors.keys()), [1, 3])
+        self.assertEqual(len(errors[1].messages), 1)
+
+    def test_import_roles(self):
+        """
+        Imported roles must only contain allowed permissions.
+        """
+        dataset = Dataset(headers=["scope_type", "scope_id", "name", "slug", "priority", "permissions"])
+        dataset.append(["openbook_content.course", "", "Student", "student", 1, "admin.view_logentry"])
+        dataset.append(["openbook_content.course", "", "Teacher", "teacher", 2, "admin.view_logentry,admin.change_logentry"])
+
+        result = RoleResource().import_data(dataset, dry_run=True)
+
+        self.assertTrue(result.has_errors())
+        self.assertIn("Row 2", str(result.base_errors[0].error))
     
 class AllowedRolePermission_ViewSet_Tests(ModelViewSetTestMixin, AllowedRolePermissionTextest_Mixin, TestCase):
     """
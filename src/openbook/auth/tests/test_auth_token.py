@@ -6,8 +6,14 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from io                        import StringIO
+from datetime                  import timedelta
+from unittest                  import mock
+from django.core.management    import call_command
+from django.db                 import DatabaseError
 from django.test               import TestCase
 from django.urls               import reverse
+from django.utils.timezone     import now
 
 from openbook.test             import ModelViewSetTestMixin
 from ..middleware.current_user import reset_current_user
@@ -154,4 +160,201 @@ class AuthToken_ViewSet_Tests(ModelViewSetTestMixin, TestCase):
         })
 
         self.assertStatusCode(response, 200)
-        self.assertEqual(response.data["username"], "user1")
\ No newline at end of file
+        self.assertEqual(response.data["username"], "user1")
+
+    def test_token_authentication_cached(self):
+        """
+        Repeated authentication with the same token should not query the token again.
+        """
+        headers = {"Authorization": f"Token {self.token1_1.token}"}
+        self.client.get(self.url_current_user, headers=headers)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url_current_user, headers=headers)
+
+        self.assertStatusCode(response, 200)
+
+    def test_token_authentication_cache_without_secrets(self):
+        """
+        Neither the token nor the password hash of its user must be written to the cache.
+        """
+        headers = {"Authorization": f"Token {self.token1_1.token}"}
+
+        with mock.patch("openbook.drf.authentication.cache.set") as cache_set:
+            response = self.client.get(self.url_current_user, headers=headers)
+
+        self.assertStatusCode(response, 200)
+        self.assertTrue(cache_set.called)
+
+        for call in cache_set.call_args_list:
+            self.assertNotIn(self.token1_1.token, repr(call.args))
+            self.assertNotIn(self.user1.password, repr(call.args))
+
+    def test_token_authentication_inactive_token(self):
+        """
+        Authentication with an inactive or expired token must fail, even if it was cached before.
+        """
+        headers  = {"Authorization": f"Token {self.token1_1.token}"}
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 200)
+
+        self.token1_1.is_active = False
+        self.token1_1.save()
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 403)
+
+        self.token1_1.is_active = True
+        self.token1_1.end_date  = now() - timedelta(days=1)
+        self.token1_1.save()
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 403)
+
+        self.token1_1.end_date   = None
+        self.token1_1.start_date = now() + timedelta(days=1)
+        self.token1_1.save()
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 403)
+
+    def test_token_authentication_inactive_user(self):
+        """
+        Authentication must fail when the user has been deactivated.
+        """
+        headers  = {"Authorization": f"Token {self.token1_1.token}"}
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 200)
+
+        self.user1.is_active = False
+        self.user1.save()
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 403)
+
+    def test_token_authentication_user_changed(self):
+        """
+        Changes to the user must invalidate the cached tokens without querying them, while
+        updating only the last login must not cost any query.
+        """
+        headers  = {"Authorization": f"Token {self.token1_1.token}"}
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertEqual(response.data["first_name"], self.user1.first_name)
+
+        self.user1.last_login = now()
+
+        with self.assertNumQueries(1):
+            self.user1.save(update_fields=["last_login"])
+
+        with self.assertNumQueries(1):
+            self.user1.first_name = "Changed"
+            self.user1.save(update_fields=["first_name"])
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertEqual(response.data["first_name"], "Changed")
+
+    def test_token_authentication_new_token(self):
+        """
+        Unknown tokens are cached, but must be accepted once the token is created.
+        """
+        headers  = {"Authorization": "Token NEW-TOKEN"}
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 403)
+
+        AuthToken.objects.create(user=self.user2, name="New Token", token="NEW-TOKEN")
+
+        response = self.client.get(self.url_current_user, headers=headers)
+        self.assertStatusCode(response, 200)
+
+
+    def test_token_usage(self):
+        """
+        Token usage must be recorded in the cache and written to the database in bulk.
+        Only the tokens used since the last flush must be considered.
+        """
+        headers = {"Authorization": f"Token {self.token1_1.token}"}
+
+        with mock.patch.object(AuthToken, "get_usage_interval", return_value=1000) as get_usage_interval:
+            with self.assertNumQueries(1):
+                # Only reading the token once, no writes
+                self.client.get(self.url_current_user, headers=headers)
+                self.client.get(self.url_current_user, headers=headers)
+
+            self.client.get(self.url_current_user, headers={"Authorization": f"Token {self.token2_1.token}"})
+
+            self.token1_1.refresh_from_db()
+            self.assertIsNone(self.token1_1.last_used_at)
+            self.assertEqual(self.token1_1.request_count, 0)
+
+            # Requests of the current and previous interval might still be recorded
+            get_usage_interval.return_value = 1001
+            self.assertEqual(AuthToken.flush_usage(), 0)
+
+            get_usage_interval.return_value = 1002
+            self.assertEqual(AuthToken.flush_usage(batch_size=1), 2)
+
+            self.token1_1.refresh_from_db()
+            self.assertIsNotNone(self.token1_1.last_used_at)
+            self.assertEqual(self.token1_1.request_count, 2)
+
+            self.token1_2.refresh_from_db()
+            self.assertIsNone(self.token1_2.last_used_at)
+            self.assertEqual(self.token1_2.request_count, 0)
+
+            self.token2_1.refresh_from_db()
+            self.assertEqual(self.token2_1.request_count, 1)
+
+            # Nothing has changed since the last flush
+            with self.assertNumQueries(0):
+                self.assertEqual(AuthToken.flush_usage(), 0)
+
+            self.client.get(self.url_current_user, headers=headers)
+
+            get_usage_interval.return_value = 1004
+            call_command("flush_auth_token_usage", stdout=StringIO(), stderr=StringIO())
+
+            self.token1_1.refresh_from_db()
+            self.assertEqual(self.token1_1.request_count, 3)
+
+    def test_token_usage_failed_flush(self):
+        """
+        Recorded requests must not be lost, when writing them to the database fails.
+        """
+        headers = {"Authorization": f"Token {self.token1_1.token}"}
+
+        with mock.patch.object(AuthToken, "get_usage_interval", return_value=1000) as get_usage_interval:
+            self.client.get(self.url_current_user, headers=headers)
+            self.client.get(self.url_current_user, headers=headers)
+
+            get_usage_interval.return_value = 1002
+
+            with mock.patch.object(AuthToken.objects, "bulk_update", side_effect=DatabaseError()):
+                with self.assertRaises(DatabaseError):
+                    AuthToken.flush_usage()
+
+            self.assertEqual(AuthToken.flush_usage(), 1)
+
+        self.token1_1.refresh_from_db()
+        self.assertEqual(self.token1_1.request_count, 2)
+
+    def test_token_usage_unshared_cache(self):
+        """
+        The management command should warn, when it cannot see the cache of the web server.
+        """
+        stderr = StringIO()
+        call_command("flush_auth_token_usage", stdout=StringIO(), stderr=stderr)
+        self.assertIn("CACHES", stderr.getvalue())
+
+    def test_deactivate_expired(self):
+        """
+        Expired tokens should be deactivated in bulk by the management command.
+        """
+        AuthToken.objects.filter(pk=self.token1_1.pk).update(end_date=now() - timedelta(minutes=1))
+        call_command("deactivate_expired", stdout=StringIO(), stderr=StringIO())
+
+        self.token1_1.refresh_from_db()
+        self.token1_2.refresh_from_db()
+
+        self.assertFalse(self.token1_1.is_active)
+        self.assertTrue(self.token1_2.is_active)
+
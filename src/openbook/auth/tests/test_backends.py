@@ -0,0 +1,518 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from datetime                       import timedelta
+from unittest                       import mock
+from django.contrib.auth.models     import AnonymousUser
+from django.core.cache              import cache
+from django.test                    import RequestFactory
+from django.test                    import TestCase
+from django.utils.timezone          import now
+
+from openbook.content.models.course import Course
+from ..backends                     import RoleBasedObjectPermissionsBackend
+from ..middleware.current_user      import reset_current_user
+from ..middleware.permission_memo   import PermissionMemoMiddleware
+from ..middleware.permission_memo   import get_permission_memo
+from ..models.access_request        import AccessRequest
+from ..models.anonymous_permission  import AnonymousPermission
+from ..models.auth_token            import AuthToken
+from ..models.enrollment_method     import EnrollmentMethod
+from ..models.group                 import Group
+from ..models.role                  import Role
+from ..models.role_assignment       import RoleAssignment
+from ..models.user                  import User
+from ..utils                        import permission_for_perm_string
+
+class RoleBasedObjectPermissionsBackend_Tests(TestCase):
+    """
+    Tests for the `RoleBasedObjectPermissionsBackend`, mainly that filtering querysets by permission
+    yields the same result as checking each object individually.
+    """
+    def setUp(self):
+        reset_current_user()
+        cache.clear()
+
+        self.backend = RoleBasedObjectPermissionsBackend()
+
+        self.user_owner     = User.objects.create_user(username="owner", email="owner@test.com", password="password")
+        self.user_teacher   = User.objects.create_user(username="teacher", email="teacher@test.com", password="password")
+        self.user_assistant = User.objects.create_user(username="assistant", email="assistant@test.com", password="password")
+        self.user_student   = User.objects.create_user(username="student", email="student@test.com", password="password")
+        self.user_other     = User.objects.create_user(username="other", email="other@test.com", password="password")
+        self.user_anonymous = AnonymousUser()
+
+        self.course1 = Course.objects.create(name="Course 1", slug="course-1", text_format=Course.TextFormatChoices.MARKDOWN, owner=self.user_owner)
+        self.course2 = Course.objects.create(name="Course 2", slug="course-2", text_format=Course.TextFormatChoices.MARKDOWN)
+        self.course3 = Course.objects.create(name="Course 3", slug="course-3", text_format=Course.TextFormatChoices.MARKDOWN)
+
+        self.course2.public_permissions.add(permission_for_perm_string("openbook_content.view_course"))
+
+        for course in (self.course1, self.course2, self.course3):
+            student   = Role.from_obj(course, name="Student", slug="student", priority=0)
+            assistant = Role.from_obj(course, name="Assistant", slug="assistant", priority=1)
+            teacher   = Role.from_obj(course, name="Teacher", slug="teacher", priority=2)
+
+            for role in (student, assistant, teacher):
+                role.save()
+
+            permissions = [
+                permission_for_perm_string("openbook_content.view_course"),
+                permission_for_perm_string("openbook_auth.view_role"),
+                permission_for_perm_string("openbook_auth.change_role"),
+                permission_for_perm_string("openbook_auth.view_roleassignment"),
+                permission_for_perm_string("openbook_auth.change_roleassignment"),
+                permission_for_perm_string("openbook_auth.view_accessrequest"),
+                permission_for_perm_string("openbook_auth.change_accessrequest"),
+            ]
+
+            student.permissions.set(permissions[:1])
+            assistant.permissions.set(permissions)
+            teacher.permissions.set(permissions)
+
+            if course is self.course3:
+                continue
+
+            RoleAssignment.from_obj(course, user=self.user_teacher, role=teacher).save()
+            RoleAssignment.from_obj(course, user=self.user_assistant, role=assistant).save()
+            RoleAssignment.from_obj(course, user=self.user_student, role=student).save()
+
+            AccessRequest.from_obj(course, user=self.user_other, role=assistant).save(check_permission=False)
+            AccessRequest.from_obj(course, user=self.user_student, role=teacher).save(check_permission=False)
+
+        self.user_student.user_permissions.add(permission_for_perm_string("openbook_auth.manage_own_authtoken"))
+        AuthToken.objects.create(user=self.user_student, name="Student Token")
+        AuthToken.objects.create(user=self.user_other, name="Other Token")
+
+        self.users = (
+            self.user_owner,
+            self.user_teacher,
+            self.user_assistant,
+            self.user_student,
+            self.user_other,
+            self.user_anonymous,
+        )
+
+    def assertFilterMatchesHasPerm(self, perm: str, queryset):
+        """
+        Check that filtering the queryset as well as the batch check yield exactly the objects
+        for which `has_perm()` is true.
+        """
+        for user in self.users:
+            expected = {obj.pk for obj in queryset if self.backend.has_perm(user, perm, obj)}
+            actual   = {obj.pk for obj in self.backend.filter_queryset(user, perm, queryset)}
+            self.assertEqual(actual, expected, f"{perm} for user {user}")
+
+            actual = self.backend.has_obj_perms(user, perm, queryset)
+            self.assertEqual(actual, expected, f"Batch {perm} for user {user}")
+
+    def test_filter_scope(self):
+        """
+        Scope objects should be filtered by owner, public permissions and role assignments.
+        """
+        for perm in ("view", "change", "delete"):
+            self.assertFilterMatchesHasPerm(f"openbook_content.{perm}_course", Course.objects.all())
+
+    def test_filter_scoped_objects(self):
+        """
+        Scoped objects should additionally be filtered by the priority of the user's roles.
+        """
+        for model in ("role", "roleassignment"):
+            for perm in ("view", "change", "delete"):
+                queryset = Role.objects.all() if model == "role" else RoleAssignment.objects.all()
+                self.assertFilterMatchesHasPerm(f"openbook_auth.{perm}_{model}", queryset)
+
+    def test_filter_access_requests(self):
+        """
+        Users should always see their own access requests.
+        """
+        for perm in ("add", "view", "change", "delete"):
+            self.assertFilterMatchesHasPerm(f"openbook_auth.{perm}_accessrequest", AccessRequest.objects.all())
+
+    def test_filter_auth_tokens(self):
+        """
+        Users with the special permission should only see their own auth tokens.
+        """
+        self.assertFilterMatchesHasPerm("openbook_auth.view_authtoken", AuthToken.objects.all())
+
+    def test_filter_users(self):
+        """
+        Users should be able to change their own account.
+        """
+        self.assertFilterMatchesHasPerm("openbook_auth.change_user", User.objects.all())
+
+    def test_filter_unchanged_with_model_permission(self):
+        """
+        The queryset should be returned unchanged, when the user has the non-object permission.
+        """
+        self.user_other.user_permissions.add(permission_for_perm_string("openbook_content.change_course"))
+        self.user_other = User.objects.get(pk=self.user_other.pk)
+
+        queryset = Course.objects.all()
+        self.assertIs(self.backend.filter_queryset(self.user_other, "openbook_content.view_course", queryset), queryset)
+
+    def test_filter_unchanged_with_anonymous_permission(self):
+        """
+        The queryset should be returned unchanged, when the permission is granted to everyone.
+        """
+        AnonymousPermission.objects.create(permission=permission_for_perm_string("openbook_content.view_course"))
+
+        queryset = Course.objects.all()
+        self.assertIs(self.backend.filter_queryset(self.user_anonymous, "openbook_content.view_course", queryset), queryset)
+
+    def test_filter_constant_queries(self):
+        """
+        Filtering should need a constant number of queries, independent of the number of objects.
+        """
+        self.backend.filter_queryset(self.user_assistant, "openbook_auth.change_role", Role.objects.all())
+
+        with self.assertNumQueries(1):
+            list(self.backend.filter_queryset(self.user_assistant, "openbook_auth.change_role", Role.objects.all()))
+
+    def test_batch_constant_queries(self):
+        """
+        Batch checks should need a constant number of queries, independent of the number of objects.
+        """
+        role_assignments = list(RoleAssignment.objects.all())
+        self.backend.has_perm(self.user_assistant, "openbook_auth.change_roleassignment")
+
+        # Scope owners, public permissions, role assignments, role priorities
+        with self.assertNumQueries(4):
+            self.backend.has_obj_perms(self.user_assistant, "openbook_auth.change_roleassignment", role_assignments)
+
+        # Effective permissions are cached now
+        with self.assertNumQueries(2):
+            self.backend.has_obj_perms(self.user_assistant, "openbook_auth.change_roleassignment", role_assignments)
+
+class EffectivePermissions_Tests(TestCase):
+    """
+    Tests for the cached effective permissions of a user in a scope.
+    """
+    def setUp(self):
+        reset_current_user()
+        cache.clear()
+
+        self.user    = User.objects.create_user(username="user", email="user@test.com", password="password")
+        self.course  = Course.objects.create(name="Course", slug="course", text_format=Course.TextFormatChoices.MARKDOWN)
+        self.role    = Role.from_obj(self.course, name="Teacher", slug="teacher", priority=2)
+        self.role.save()
+
+        self.permission = permission_for_perm_string("openbook_content.change_course")
+        self.role.permissions.add(self.permission)
+
+        self.role_assignment = RoleAssignment.from_obj(self.course, user=self.user, role=self.role)
+        self.role_assignment.save()
+
+    def test_effective_permissions(self):
+        """
+        Permissions and priority should be compiled from public permissions and assigned roles.
+        """
+        self.course.public_permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        effective = self.course.get_effective_permissions(self.user)
+
+        self.assertEqual(effective.perms, {"openbook_content.view_course", "openbook_content.change_course"})
+        self.assertEqual(effective.priority, 2)
+
+        effective = self.course.get_effective_permissions(AnonymousUser())
+        self.assertEqual(effective.perms, {"openbook_content.view_course"})
+        self.assertIsNone(effective.priority)
+
+    def test_cached(self):
+        """
+        Repeated permission checks should be answered from the cache.
+        """
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+        self.role_assignment.get_scope()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+            self.assertFalse(self.course.has_obj_perm(self.user, "openbook_content.delete_course"))
+            self.assertFalse(self.role_assignment.has_obj_perm(self.user, "openbook_auth.change_roleassignment"))
+
+    def test_invalidate_role_assignment(self):
+        """
+        Deleting the role assignment should revoke the permissions.
+        """
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+        self.role_assignment.delete()
+        self.assertFalse(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+
+    def test_invalidate_role_permissions(self):
+        """
+        Removing permissions from the role should revoke them, also when done from the permission side.
+        """
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+        self.role.permissions.remove(self.permission)
+        self.assertFalse(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+
+        self.role.permissions.add(self.permission)
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+        self.permission.roles.remove(self.role)
+        self.assertFalse(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+
+    def test_invalidate_role_priority(self):
+        """
+        Changing the role priority should be reflected in priority checks.
+        """
+        self.assertEqual(self.course.get_effective_permissions(self.user).priority, 2)
+        self.role.priority = 1
+        self.role.save()
+        self.assertEqual(self.course.get_effective_permissions(self.user).priority, 1)
+
+    def test_invalidate_public_permissions(self):
+        """
+        Adding public permissions should grant them to everyone.
+        """
+        self.assertFalse(self.course.has_obj_perm(AnonymousUser(), "openbook_content.view_course"))
+        self.course.public_permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        self.assertTrue(self.course.has_obj_perm(AnonymousUser(), "openbook_content.view_course"))
+
+    def test_inactive_role_assignments(self):
+        """
+        Inactive, expired and not yet started role assignments must not grant permissions.
+        """
+        backend = RoleBasedObjectPermissionsBackend()
+        perm    = "openbook_content.change_course"
+
+        for updates in (
+            {"is_active": False},
+            {"end_date": now() - timedelta(days=1)},
+            {"start_date": now() + timedelta(days=1)},
+        ):
+            RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(is_active=True, start_date=None, end_date=None)
+            RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(**updates)
+            cache.clear()
+
+            self.assertFalse(self.course.has_obj_perm(self.user, perm))
+            self.assertEqual(self.course.get_effective_permissions(self.user).priority, None)
+            self.assertFalse(backend.filter_queryset(self.user, perm, Course.objects.all()).exists())
+
+    def test_deactivate_expired(self):
+        """
+        Expired role assignments should be deactivated in bulk and the permission cache refreshed.
+        """
+        other_user = User.objects.create_user(username="other", email="other@test.com", password="password")
+        other      = RoleAssignment.from_obj(self.course, user=other_user, role=self.role, end_date=now() + timedelta(days=1))
+        other.save()
+
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+
+        RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(end_date=now() - timedelta(minutes=1))
+        self.assertEqual(RoleAssignment.deactivate_expired(batch_size=1), 1)
+
+        self.role_assignment.refresh_from_db()
+        other.refresh_from_db()
+
+        self.assertFalse(self.role_assignment.is_active)
+        self.assertTrue(other.is_active)
+        self.assertFalse(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+        self.assertEqual(RoleAssignment.deactivate_expired(), 0)
+
+    def test_expired_while_cached(self):
+        """
+        Cached permissions must not outlive the end date of a role assignment, nor hide a role
+        assignment whose start date has passed, even when the cache is not invalidated.
+        """
+        perm = "openbook_content.change_course"
+        RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(end_date=now() + timedelta(hours=1))
+        cache.clear()
+
+        self.assertTrue(self.course.has_obj_perm(self.user, perm))
+
+        with mock.patch("openbook.auth.models.mixins.scope.now", return_value=now() + timedelta(hours=2)):
+            self.assertFalse(self.course.has_obj_perm(self.user, perm))
+
+        RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(start_date=now() + timedelta(hours=1), end_date=None)
+        cache.clear()
+
+        self.assertFalse(self.course.has_obj_perm(self.user, perm))
+
+        with mock.patch("openbook.auth.models.mixins.scope.now", return_value=now() + timedelta(hours=2)):
+            self.assertTrue(self.course.has_obj_perm(self.user, perm))
+
+    def test_reenroll_expired(self):
+        """
+        Enrolling again should renew an expired role assignment.
+        """
+        enrollment_method = EnrollmentMethod.from_obj(self.course, name="Enrollment", role=self.role)
+        enrollment_method.save()
+
+        RoleAssignment.objects.filter(pk=self.role_assignment.pk).update(end_date=now() - timedelta(minutes=1))
+        RoleAssignment.deactivate_expired()
+
+        role_assignment = RoleAssignment.enroll(enrollment_method, user=self.user, check_permission=False)
+        self.assertTrue(role_assignment.is_active)
+        self.assertIsNone(role_assignment.end_date)
+        self.assertTrue(self.course.has_obj_perm(self.user, "openbook_content.change_course"))
+
+class PermissionMemo_Tests(TestCase):
+    """
+    Tests for the request-scoped permission memo of the authentication backend.
+    """
+    def setUp(self):
+        reset_current_user()
+        cache.clear()
+
+        self.backend = RoleBasedObjectPermissionsBackend()
+        self.user    = User.objects.create_user(username="user", email="user@test.com", password="password")
+        self.course  = Course.objects.create(name="Course", slug="course", text_format=Course.TextFormatChoices.MARKDOWN)
+        self.role    = Role.from_obj(self.course, name="Teacher", slug="teacher", priority=2)
+        self.role.save()
+
+    def run_in_request(self, callback):
+        """
+        Run the callback as if it was a view function and return its result and the memo.
+        """
+        result = {}
+
+        def get_response(request):
+            result["value"] = callback()
+            result["memo"]  = get_permission_memo()
+
+        PermissionMemoMiddleware(get_response)(RequestFactory().get("/"))
+        return result["value"], result["memo"]
+
+    def test_memo_hit(self):
+        """
+        Repeated checks in the same request should be answered from the memo.
+        """
+        def callback():
+            self.backend.has_perm(self.user, "openbook_content.view_course", self.course)
+
+            with self.assertNumQueries(0):
+                return self.backend.has_perm(self.user, "openbook_content.view_course", self.course)
+
+        result, memo = self.run_in_request(callback)
+
+        self.assertFalse(result)
+        self.assertGreater(memo.hits, 0)
+        self.assertGreater(memo.misses, 0)
+
+    def test_memo_request_scoped(self):
+        """
+        The memo should only exist during a request.
+        """
+        self.assertIsNone(get_permission_memo())
+        self.run_in_request(lambda: None)
+        self.assertIsNone(get_permission_memo())
+
+    def test_memo_unsaved_objects(self):
+        """
+        Checks on unsaved objects should not be memorized.
+        """
+        def callback():
+            role = Role.from_obj(self.course, name="New Role", slug="new-role", priority=0)
+            self.backend.has_perm(self.user, "openbook_auth.add_role", role)
+            return get_permission_memo().decisions
+
+        decisions, _ = self.run_in_request(callback)
+        self.assertFalse(any(key[2] is not None for key in decisions))
+
+    def test_memo_suspended_on_role_change(self):
+        """
+        Changes to role data should invalidate the memo.
+        """
+        def callback():
+            self.assertFalse(self.backend.has_perm(self.user, "openbook_content.view_course", self.course))
+
+            self.role.permissions.add(permission_for_perm_string("openbook_content.view_course"))
+            RoleAssignment.from_obj(self.course, user=self.user, role=self.role).save()
+
+            return self.backend.has_perm(self.user, "openbook_content.view_course", self.course)
+
+        result, memo = self.run_in_request(callback)
+        self.assertTrue(result)
+        self.assertFalse(memo.enabled)
+
+class AnonymousPermission_Tests(TestCase):
+    """
+    Tests for the preloaded anonymous permissions.
+    """
+    def setUp(self):
+        cache.clear()
+        self.backend = RoleBasedObjectPermissionsBackend()
+        self.user    = User.objects.create_user(username="user", email="user@test.com", password="password")
+
+    def test_no_queries(self):
+        """
+        Anonymous permissions should be checked without database queries once loaded.
+        """
+        AnonymousPermission.get_perm_strings()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.backend.has_perm(AnonymousUser(), "openbook_content.view_course"))
+
+    def test_refresh_on_change(self):
+        """
+        Saving and deleting anonymous permissions should be reflected immediately.
+        """
+        self.assertFalse(self.backend.has_perm(AnonymousUser(), "openbook_content.view_course"))
+
+        anonymous_permission = AnonymousPermission.objects.create(permission=permission_for_perm_string("openbook_content.view_course"))
+        self.assertTrue(self.backend.has_perm(AnonymousUser(), "openbook_content.view_course"))
+        self.assertTrue(self.backend.has_perm(self.user, "openbook_content.view_course"))
+
+        anonymous_permission.delete()
+        self.assertFalse(self.backend.has_perm(AnonymousUser(), "openbook_content.view_course"))
+
+class UserPermissions_Tests(TestCase):
+    """
+    Tests for the cached user and group permissions.
+    """
+    def setUp(self):
+        cache.clear()
+        self.backend = RoleBasedObjectPermissionsBackend()
+        self.user    = User.objects.create_user(username="user", email="user@test.com", password="password")
+        self.group   = Group.objects.create(name="Group", slug="group")
+
+    def has_perm(self, perm: str) -> bool:
+        """
+        Check permission with a fresh user object like in a new request.
+        """
+        return self.backend.has_perm(User.objects.get(pk=self.user.pk), perm)
+
+    def test_cached(self):
+        """
+        The permissions should be loaded from the cache in subsequent requests.
+        """
+        self.user.user_permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        self.assertTrue(self.has_perm("openbook_content.view_course"))
+
+        user = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.backend.has_perm(user, "openbook_content.view_course"))
+            self.assertFalse(self.backend.has_perm(user, "openbook_content.delete_course"))
+
+    def test_invalidate_user_permissions(self):
+        """
+        Changing the user permissions should be reflected immediately.
+        """
+        self.assertFalse(self.has_perm("openbook_content.view_course"))
+        self.user.user_permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        self.assertTrue(self.has_perm("openbook_content.view_course"))
+
+    def test_invalidate_groups(self):
+        """
+        Changing the group memberships and group permissions should be reflected immediately.
+        """
+        self.group.permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        self.assertFalse(self.has_perm("openbook_content.view_course"))
+
+        self.user.groups.add(self.group)
+        self.assertTrue(self.has_perm("openbook_content.view_course"))
+
+        self.group.permissions.clear()
+        self.assertFalse(self.has_perm("openbook_content.view_course"))
+
+        self.group.permissions.add(permission_for_perm_string("openbook_content.view_course"))
+        self.assertTrue(self.has_perm("openbook_content.view_course"))
+
+        self.group.user_set.remove(self.user)
+        self.assertFalse(self.has_perm("openbook_content.view_course"))
+
@@ -6,10 +6,14 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from datetime                         import timedelta
 from django.core.exceptions           import PermissionDenied
+from django.core.files.uploadedfile   import SimpleUploadedFile
+from django.db.models                 import QuerySet
 from django.core.exceptions           import ValidationError
 from django.urls                      import reverse
 from django.test                      import TestCase
+from django.utils.timezone            import now
 from unittest.mock                    import patch
 
 from openbook.core.utils.content_type import model_string_for_content_type
@@ -140,6 +144,122 @@ class EnrollmentMethod_Model_Tests(EnrollmentMethod_Test_Mixin, TestCase):
             role = self.role,
         ).count(), 1)
 
+
+    def test_repeated_enrollment(self):
+        """
+        Repeating an enrollment must only read the existing role assignment, once the
+        permissions of the user are cached again.
+        """
+        first = self.em_no_passphrase.enroll(user=self.user)
+        self.em_no_passphrase.enroll(user=self.user)
+
+        with self.assertNumQueries(1):
+            second = self.em_no_passphrase.enroll(user=self.user)
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(RoleAssignment.objects.filter(user=self.user, role=self.role).count(), 1)
+
+    def test_repeated_enrollment_stays_inactive(self):
+        """
+        Deactivated role assignments must not be activated again by self-enrollment.
+        """
+        role_assignment = self.em_no_passphrase.enroll(user=self.user)
+        role_assignment.is_active = False
+        role_assignment.save()
+
+        self.em_no_passphrase.enroll(user=self.user)
+
+        role_assignment.refresh_from_db()
+        self.assertFalse(role_assignment.is_active)
+
+    def test_concurrent_enrollment(self):
+        """
+        A role assignment inserted concurrently by another request must be returned
+        instead of failing on the unique constraint.
+        """
+        first = self.em_no_passphrase.enroll(user=self.user)
+
+        with patch.object(QuerySet, "first", return_value=None):
+            second = self.em_no_passphrase.enroll(user=self.user)
+
+        self.assertEqual(first.pk, second.pk)
+
+        self.em_no_passphrase.refresh_from_db()
+        self.assertEqual(self.em_no_passphrase.enrollment_count, 1)
+
+    def test_max_enrollments(self):
+        """
+        No more users can enroll when the maximum number of enrollments is reached,
+        until a role assignment is deleted.
+        """
+        other_user = User.objects.create_user(username="other", email="other@test.com", password="password")
+
+        self.em_no_passphrase.max_enrollments = 1
+        self.em_no_passphrase.save()
+
+        role_assignment = self.em_no_passphrase.enroll(user=self.user)
+        self.em_no_passphrase.enroll(user=self.user)
+
+        with self.assertRaises(PermissionDenied):
+            self.em_no_passphrase.enroll(user=other_user)
+
+        self.em_no_passphrase.refresh_from_db()
+        self.assertEqual(self.em_no_passphrase.enrollment_count, 1)
+
+        role_assignment.delete()
+        self.em_no_passphrase.enroll(user=other_user)
+
+        self.em_no_passphrase.refresh_from_db()
+        self.assertEqual(self.em_no_passphrase.enrollment_count, 1)
+
+    def test_bulk_enroll(self):
+        """
+        Bulk enrollment creates missing and renews expired role assignments, skipping unknown
+        users and unchanged assignments.
+        """
+        User.objects.create_user(username="student1", email="student1@test.com", password="password")
+        User.objects.create_user(username="student2", email="student2@test.com", password="password")
+        User.objects.create_user(username="student3", email="student3@test.com", password="password")
+
+        RoleAssignment.objects.create(scope_type=self.role.scope_type, scope_uuid=self.role.scope_uuid, role=self.role, user=self.user, end_date=now() - timedelta(days=1))
+        self.em_no_passphrase.enroll(user=User.objects.get(username="student3"), check_passphrase=False, check_permission=False)
+
+        result = self.em_no_passphrase.bulk_enroll(
+            usernames        = ["new", "student1", "student2", "student2", "student3", "unknown"],
+            check_permission = False,
+        )
+
+        self.assertEqual(result, {"created": 2, "updated": 1, "skipped": 2, "unknown_usernames": ["unknown"]})
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role).count(), 4)
+
+        role_assignment = RoleAssignment.objects.get(role=self.role, user=self.user)
+        self.assertTrue(role_assignment.is_active)
+        self.assertIsNone(role_assignment.end_date)
+
+    def test_bulk_enroll_queries(self):
+        """
+        The number of queries must not depend on the number of users.
+        """
+        for i in range(20):
+            User.objects.create_user(username=f"student{i}", email=f"student{i}@test.com", password="password")
+
+        with self.assertNumQueries(3):
+            result = self.em_no_passphrase.bulk_enroll(
+                usernames        = [f"student{i}" for i in range(20)],
+                check_permission = False,
+            )
+
+        self.assertEqual(result["created"], 20)
+
+    def test_bulk_enroll_permission_denied(self):
+        """
+        `PermissionDenied` should be raised when the user may not add role assignments.
+        """
+        with self.assertRaises(PermissionDenied):
+            self.em_no_passphrase.bulk_enroll(usernames=["new"], permission_user=self.user)
+
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role).count(), 0)
+
 class EnrollmentMethod_ViewSet_Tests(ModelViewSetTestMixin, EnrollmentMethod_Test_Mixin, TestCase):
     """
     Tests for the `EnrollmentMethodViewSet` REST API.
@@ -293,4 +413,32 @@ class EnrollmentMethod_ViewSet_Tests(ModelViewSetTestMixin, EnrollmentMethod_Tes
         self.assertEqual(RoleAssignment.objects.filter(
             user = self.user,
             role = self.role,
-        ).count(), 0)
\ No newline at end of file
+        ).count(), 0)
+
+    def test_bulk_enroll(self):
+        """
+        Bulk enrollment with a list of usernames and a CSV file.
+        """
+        self.create_user_and_login(["openbook_auth.add_roleassignment"])
+        User.objects.create_user(username="student1", email="student1@test.com", password="password")
+
+        url      = reverse("enrollment_method-bulk-enroll", args=[str(self.em_no_passphrase.pk)])
+        csv_file = SimpleUploadedFile("users.csv", b"email;username\nnew@test.com;new\nunknown@test.com;unknown\n", content_type="text/csv")
+
+        response = self.client.post(url, {"usernames": ["student1"], "file": csv_file}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"created": 2, "updated": 0, "skipped": 1, "unknown_usernames": ["unknown"]})
+
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role).count(), 2)
+
+    def test_bulk_enroll_permission_denied(self):
+        """
+        Bulk enrollment requires the permission to add role assignments.
+        """
+        self.login(username="new", password="password")
+
+        url      = reverse("enrollment_method-bulk-enroll", args=[str(self.em_no_passphrase.pk)])
+        response = self.client.post(url, {"usernames": ["new"]}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role).count(), 0)
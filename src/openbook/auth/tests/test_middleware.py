@@ -0,0 +1,95 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+import asyncio
+
+from asgiref.sync                              import async_to_sync
+from asgiref.sync                              import sync_to_async
+from django.http                               import HttpResponse
+from django.test                               import RequestFactory
+from django.test                               import TestCase
+from django.utils.functional                   import SimpleLazyObject
+
+from openbook.core.middleware.current_language import CurrentLanguageMiddleware
+from openbook.core.middleware.current_language import get_current_language
+from ..middleware.current_user                 import CurrentUserMiddleware
+from ..middleware.current_user                 import get_current_user
+from ..middleware.current_user                 import reset_current_user
+
+class CurrentUserMiddleware_Tests(TestCase):
+    """
+    Test cases for the request context middlewares.
+    """
+    def setUp(self):
+        reset_current_user()
+        self.factory = RequestFactory()
+
+    def make_request(self, user: str, language: str):
+        request = self.factory.get("/")
+        request.user          = user
+        request.LANGUAGE_CODE = language
+        return request
+
+    def test_sync(self):
+        """
+        The current user and language must be available during sync requests only.
+        """
+        seen = []
+
+        def view(request):
+            seen.append((get_current_user(), get_current_language()))
+            return HttpResponse()
+
+        middleware = CurrentUserMiddleware(CurrentLanguageMiddleware(view))
+        middleware(self.make_request("user1", "de"))
+
+        self.assertEqual(seen, [("user1", "de")])
+        self.assertIsNone(get_current_user())
+        self.assertIsNone(get_current_language())
+
+    def test_async_concurrent(self):
+        """
+        Concurrent async requests must each see their own user and language.
+        """
+        seen = {}
+
+        async def view(request):
+            user = get_current_user()
+            await asyncio.sleep(0.01)
+            seen[user] = (get_current_user(), get_current_language())
+            return HttpResponse()
+
+        middleware = CurrentUserMiddleware(CurrentLanguageMiddleware(view))
+
+        async def run():
+            await asyncio.gather(
+                middleware(self.make_request("user1", "de")),
+                middleware(self.make_request("user2", "en")),
+            )
+
+        async_to_sync(run)()
+
+        self.assertEqual(seen, {"user1": ("user1", "de"), "user2": ("user2", "en")})
+        self.assertIsNone(get_current_user())
+
+    def test_async_lazy_user(self):
+        """
+        The lazy request user must not be evaluated when switching between sync and async code.
+        """
+        def evaluate_user():
+            raise AssertionError("User must not be evaluated")
+
+        async def view(request):
+            await sync_to_async(lambda: None)()
+            return HttpResponse()
+
+        request      = self.make_request("", "en")
+        request.user = SimpleLazyObject(evaluate_user)
+
+        async_to_sync(CurrentUserMiddleware(view))(request)
+
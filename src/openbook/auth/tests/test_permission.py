@@ -6,10 +6,20 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from django.contrib.auth.models import Permission
-from django.test                import TestCase
+from django.contrib.auth.models     import Permission
+from django.test                    import TestCase
+from rest_framework.reverse         import reverse
 
-from openbook.test              import ModelViewSetTestMixin
+from openbook.content.models.course import Course
+from openbook.core.models.language  import Language
+from openbook.test                  import ModelViewSetTestMixin
+from ..models.anonymous_permission  import AnonymousPermission
+from ..models.permission_text       import PermissionText
+from ..models.role                  import Role
+from ..models.role_assignment       import RoleAssignment
+from ..models.user                  import User
+from ..utils                        import permission_for_perm_string
+from ..viewsets.permission          import PermissionViewSet
 
 class Permission_ViewSet_Tests(ModelViewSetTestMixin, TestCase):
     """
@@ -36,3 +46,119 @@ class Permission_ViewSet_Tests(ModelViewSetTestMixin, TestCase):
         
     def pk_found(self):
         return self.permission.id
+
+    def test_check(self):
+        """
+        Several permissions should be checked at once, with and without objects.
+        """
+        user   = User.objects.create_user(username="teacher", email="teacher@test.com", password="password")
+        course = Course.objects.create(name="Course", slug="course", text_format=Course.TextFormatChoices.MARKDOWN)
+        other  = Course.objects.create(name="Other Course", slug="other-course", text_format=Course.TextFormatChoices.MARKDOWN)
+        role   = Role.from_obj(course, name="Teacher", slug="teacher", priority=1)
+        role.save()
+        role.permissions.add(permission_for_perm_string("openbook_auth.add_roleassignment"))
+
+        role_assignment = RoleAssignment.from_obj(course, user=user, role=role)
+        role_assignment.save()
+
+        self.login(username="teacher", password="password")
+
+        checks = [
+            {"perm": "openbook_auth.add_roleassignment",    "scope_type": "openbook_content.course",      "scope_uuid": str(course.pk)},
+            {"perm": "openbook_auth.add_roleassignment",    "scope_type": "openbook_content.course",      "scope_uuid": str(other.pk)},
+            {"perm": "openbook_auth.view_roleassignment",   "scope_type": "openbook_auth.roleassignment", "scope_uuid": str(role_assignment.pk)},
+            {"perm": "openbook_auth.add_roleassignment",    "scope_type": "openbook_content.course",      "scope_uuid": "00000000-0000-0000-0000-000000000000"},
+            {"perm": "openbook_content.add_course"},
+        ]
+
+        response = self.client.post(reverse("permission-check"), checks, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([check["allowed"] for check in response.data], [True, False, False, False, False])
+
+    def test_check_invalid(self):
+        """
+        Unknown permissions, models and malformed IDs should be rejected.
+        """
+        url = reverse("permission-check")
+
+        for check in [
+            {"perm": "invalid"},
+            {"perm": "openbook_content.view_course", "scope_type": "invalid.model", "scope_uuid": "1"},
+            {"perm": "openbook_content.view_course", "scope_type": "openbook_content.course", "scope_uuid": "invalid"},
+            {"perm": "openbook_content.view_course", "scope_type": "contenttypes.contenttype", "scope_uuid": "1"},
+        ]:
+            response = self.client.post(url, [check], format="json")
+            self.assertEqual(response.status_code, 400, check)
+
+    def test_check_too_many(self):
+        """
+        The number of permissions checked with one request should be limited.
+        """
+        checks   = [{"perm": "openbook_content.add_course"}] * (PermissionViewSet.max_checks + 1)
+        response = self.client.post(reverse("permission-check"), checks, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_catalog(self):
+        """
+        The catalog should contain all permissions translated into the request language and
+        be revalidated with its ETag.
+        """
+        permission = permission_for_perm_string("openbook_content.add_course")
+        language   = Language.objects.create(language="de", name="Deutsch")
+        PermissionText.objects.create(parent=permission, language=language, name="Kurs anlegen")
+
+        url      = reverse("permission-catalog")
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="de")
+        entries  = {entry["perm_string"]: entry for entry in response.data}
+        etag     = response["ETag"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), Permission.objects.count())
+        self.assertEqual(entries["openbook_content.add_course"]["perm_display_name"], "Kurs anlegen")
+        self.assertEqual(entries["openbook_content.add_course"]["model"], "course")
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="de", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="en", HTTP_IF_NONE_MATCH=etag)
+        entries  = {entry["perm_string"]: entry for entry in response.data}
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(entries["openbook_content.add_course"]["perm_display_name"], permission.name)
+
+        PermissionText.objects.filter(parent=permission).update(name="Kurs erstellen")
+        PermissionText.objects.get(parent=permission).save()
+
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="de", HTTP_IF_NONE_MATCH=etag)
+        entries  = {entry["perm_string"]: entry for entry in response.data}
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(entries["openbook_content.add_course"]["perm_display_name"], "Kurs erstellen")
+
+    def test_list_translated(self):
+        """
+        Translated permission names should be prefetched for the whole page at once.
+        """
+        language = Language.objects.create(language="de", name="Deutsch")
+        AnonymousPermission.objects.create(permission=permission_for_perm_string("auth.view_permission"))
+
+        for permission in Permission.objects.filter(content_type__app_label="openbook_auth"):
+            PermissionText.objects.create(parent=permission, language=language, name=f"Übersetzt: {permission.codename}")
+
+        url = reverse("permission-list")
+        self.client.get(url, {"_page_size": 10}, HTTP_ACCEPT_LANGUAGE="de")
+
+        with self.assertNumQueries(3):
+            # Count, permissions and translations
+            response = self.client.get(url, {"app": "openbook_auth", "_page_size": 10}, HTTP_ACCEPT_LANGUAGE="de")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+
+        for entry in response.data["results"]:
+            self.assertEqual(entry["perm_display_name"], f"Übersetzt: {entry['codename']}")
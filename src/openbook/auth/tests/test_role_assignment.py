@@ -6,9 +6,17 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+import uuid
+
+from datetime                         import timedelta
 from django.core.exceptions           import ValidationError
+from django.db                        import connection
 from django.db.utils                  import IntegrityError
 from django.test                      import TestCase
+from django.test.utils                import CaptureQueriesContext
+from django.urls                      import reverse
+from django.utils.timezone            import now
+from rest_framework.exceptions        import ValidationError as DRFValidationError
 
 from openbook.core.utils.content_type import model_string_for_content_type
 from openbook.content.models.course   import Course
@@ -17,6 +25,8 @@ from ..middleware.current_user        import reset_current_user
 from ..models.role                    import Role
 from ..models.role_assignment         import RoleAssignment
 from ..models.user                    import User
+from ..utils                          import permission_for_perm_string
+from ..viewsets.role_assignment       import RoleAssignmentBulkEnrollmentSerializer
 
 class RoleAssignment_Test_Mixin:
     def setUp(self):
@@ -122,4 +132,174 @@ class RoleAssignment_ViewSet_Tests(ModelViewSetTestMixin, RoleAssignment_Test_Mi
             "request_data": {"is_active": False},
             "updates":      {"is_active": False},
         },
-    }
\ No newline at end of file
+    }
+
+    def test_bulk_enroll(self):
+        """
+        Bulk enrollment updates existing role assignments instead of duplicating them.
+        """
+        self.create_user_and_login(["openbook_auth.add_roleassignment"])
+        User.objects.create_user(username="test-other", email="test-other@example.com", password="password")
+
+        response = self.client.post(reverse("role_assignment-bulk-enroll"), {
+            "scope_type": model_string_for_content_type(self.ra_student.scope_type),
+            "scope_uuid": str(self.ra_student.scope_uuid),
+            "role":       "student",
+            "usernames":  ["test-new", "test-other"],
+            "end_date":   "2100-01-01T00:00:00Z",
+        }, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"created": 1, "updated": 1, "skipped": 0, "unknown_usernames": []})
+
+        self.assertEqual(RoleAssignment.objects.filter(role=self.role_student).count(), 2)
+        self.ra_student.refresh_from_db()
+        self.assertEqual(self.ra_student.end_date.year, 2100)
+
+    def test_bulk_enroll_requires_usernames(self):
+        """
+        Either usernames or a CSV file must be given.
+        """
+        self.create_user_and_login(["openbook_auth.add_roleassignment"])
+
+        response = self.client.post(reverse("role_assignment-bulk-enroll"), {
+            "scope_type": model_string_for_content_type(self.ra_student.scope_type),
+            "scope_uuid": str(self.ra_student.scope_uuid),
+            "role":       "student",
+        }, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_enroll_scope_mismatch(self):
+        """
+        Roles can only be bulk-assigned in their own scope, which must exist.
+        """
+        other_course = Course.objects.create(name="Other Course", slug="other-course")
+        serializer   = RoleAssignmentBulkEnrollmentSerializer()
+
+        attributes = {
+            "scope_type": self.role_student.scope_type,
+            "scope_uuid": other_course.pk,
+            "role":       self.role_student,
+            "usernames":  ["test-new"],
+        }
+
+        with self.assertRaises(DRFValidationError):
+            serializer.validate(attributes)
+
+        self.role_student.scope_uuid = uuid.uuid4()
+        attributes["scope_uuid"]     = self.role_student.scope_uuid
+
+        with self.assertRaises(DRFValidationError):
+            serializer.validate(attributes)
+
+        self.role_student.refresh_from_db()
+        attributes["scope_uuid"] = self.course.pk
+        self.assertEqual(serializer.validate(attributes)["role"], self.role_student)
+
+    def count_list_queries(self, query_params: dict) -> tuple[int, list]:
+        """
+        Get the number of queries and the results of listing the role assignments.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("role_assignment-list"), query_params)
+
+        self.assertEqual(response.status_code, 200)
+        return (len(context.captured_queries), response.json()["results"])
+
+    def enroll_users(self, count: int):
+        """
+        Assign the student role to the given number of additional users.
+        """
+        for index in range(count):
+            user = User.objects.create_user(username=f"test-{self.role_student.pk}-{RoleAssignment.objects.count()}-{index}", password="password")
+            RoleAssignment.from_obj(self.course, role=self.role_student, user=user).save()
+
+    def test_list_query_count(self):
+        """
+        The number of queries for listing role assignments must not depend on the number of
+        objects, also when related objects are expanded.
+        """
+        self.create_user_and_login(["openbook_auth.view_roleassignment"])
+        self.count_list_queries({})
+
+        for query_params in ({}, {"_expand": "user,role"}, {"_expand": "role.permissions,created_by", "_omit": "modified_by"}):
+            self.enroll_users(2)
+            few_queries, few_results = self.count_list_queries(query_params)
+
+            self.enroll_users(10)
+            many_queries, many_results = self.count_list_queries(query_params)
+
+            self.assertEqual(len(many_results), len(few_results) + 10)
+            self.assertEqual(many_queries, few_queries, query_params)
+
+    def test_list_expanded_fields(self):
+        """
+        Optimizing the queryset must not change the rendered fields.
+        """
+        self.create_user_and_login(["openbook_auth.view_roleassignment"])
+        self.role_student.permissions.add(permission_for_perm_string("openbook_content.view_course"))
+
+        queries, results = self.count_list_queries({"_expand": "user,role.permissions", "role": "student"})
+        self.assertEqual(results[0]["user"]["username"], "test-new")
+        self.assertEqual(results[0]["user"]["full_name"], self.user.get_full_name())
+        self.assertEqual(results[0]["role"]["slug"], "student")
+        self.assertEqual(results[0]["role"]["permissions"][0]["perm_string"], "openbook_content.view_course")
+
+        queries, results = self.count_list_queries({"_fields": "id,user", "role": "student"})
+        self.assertEqual(results[0], {"id": str(self.ra_student.id), "user": "test-new"})
+
+    def test_cursor_pagination_nullable_ordering(self):
+        """
+        Cursor pagination must not skip objects with `NULL` values in the ordering fields.
+        """
+        self.create_user_and_login(["openbook_auth.view_roleassignment"])
+        self.enroll_users(5)
+
+        for index, role_assignment in enumerate(RoleAssignment.objects.order_by("user__username")):
+            role_assignment.end_date = now() + timedelta(days=index % 3 + 1) if index % 2 else None
+            role_assignment.save()
+
+        expected = set(str(pk) for pk in RoleAssignment.objects.values_list("pk", flat=True))
+
+        for sort in ("end_date", "-end_date", "end_date,-start_date"):
+            url  = reverse("role_assignment-list") + f"?_pagination=cursor&_page_size=2&_sort={sort}"
+            seen = []
+
+            while url:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                seen.extend(result["id"] for result in response.json()["results"])
+                url = response.json()["next"]
+
+            # Same objects in the same order when going back from the last page
+            backwards = [result["id"] for result in response.json()["results"]]
+            url       = response.json()["previous"]
+
+            while url:
+                response  = self.client.get(url)
+                backwards = [result["id"] for result in response.json()["results"]] + backwards
+                url       = response.json()["previous"]
+
+            self.assertEqual(backwards, seen, sort)
+            self.assertEqual(len(seen), len(expected), sort)
+            self.assertEqual(set(seen), expected, sort)
+
+            end_dates = [RoleAssignment.objects.get(pk=pk).end_date for pk in seen]
+            nulls     = [end_date is None for end_date in end_dates]
+            self.assertEqual(nulls, sorted(nulls, reverse=sort.startswith("-")), sort)
+
+    def test_cursor_pagination_other_ordering(self):
+        """
+        A cursor must be rejected when used with another ordering than it was created for.
+        """
+        self.create_user_and_login(["openbook_auth.view_roleassignment"])
+        self.enroll_users(5)
+
+        response = self.client.get(reverse("role_assignment-list") + "?_pagination=cursor&_page_size=2&_sort=end_date")
+        self.assertEqual(response.status_code, 200)
+
+        next_url = response.json()["next"]
+        response = self.client.get(next_url.replace("_sort=end_date", "_sort=-end_date"))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Invalid cursor")
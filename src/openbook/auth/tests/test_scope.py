@@ -7,9 +7,13 @@
 # License, or (at your option) any later version.
 
 from django.contrib.contenttypes.models import ContentType
+from django.urls                        import reverse
 
 from django.test                        import TestCase
+from openbook.content.models.course     import Course
 from openbook.test                      import ModelViewSetTestMixin
+from ..models.allowed_role_permission   import AllowedRolePermission
+from ..utils                            import permission_for_perm_string
 
 class ScopeType_ViewSet_Tests(ModelViewSetTestMixin, TestCase):
     """
@@ -27,4 +31,64 @@ class ScopeType_ViewSet_Tests(ModelViewSetTestMixin, TestCase):
         "update":         {"supported": False},
         "partial_update": {"supported": False},
         "destroy":        {"supported": False},
-    }
\ No newline at end of file
+    }
+
+    def test_retrieve_no_scope_type(self):
+        """
+        Only models that act as permission scopes can be retrieved, by model string or id.
+        """
+        self.create_user_and_login(())
+
+        for scope_type in ("openbook_auth.user", "invalid.model", "invalid", "999999"):
+            response = self.client.get(reverse("scope_type-detail", args=(scope_type,)))
+            self.assertEqual(response.status_code, 404)
+
+        scope_type = ContentType.objects.get_for_model(Course)
+        response   = self.client.get(reverse("scope_type-detail", args=(scope_type.pk,)))
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_allowed_permissions(self):
+        """
+        The allowed permissions of a scope type should be served from the permission catalog.
+        """
+        scope_type = ContentType.objects.get_for_model(Course)
+        permission = permission_for_perm_string("openbook_content.change_course")
+        AllowedRolePermission.objects.create(scope_type=scope_type, permission=permission)
+
+        self.create_user_and_login(())
+        url = reverse("scope_type-detail", args=("openbook_content.course",))
+        self.client.get(url)
+
+        with self.assertNumQueries(2):
+            # Session and user only
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("objects", response.data)
+        self.assertEqual([p["perm"] for p in response.data["allowed_permissions"]], ["openbook_content.change_course"])
+
+    def test_objects(self):
+        """
+        The scope objects should be paginated and searchable by name or slug prefix.
+        """
+        for name, slug in [("Alpha", "a-course"), ("Beta", "b-course"), ("Gamma", "alpine")]:
+            Course.objects.create(name=name, slug=slug, text_format=Course.TextFormatChoices.MARKDOWN)
+
+        self.create_user_and_login(())
+        url = reverse("scope_type-objects", args=("openbook_content.course",))
+
+        response = self.client.get(url, {"_page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([obj["name"] for obj in response.data["results"]], ["Alpha", "Beta"])
+        self.assertIsNotNone(response.data["next"])
+
+        response = self.client.get(url, {"_search": "al"})
+        self.assertEqual([obj["name"] for obj in response.data["results"]], ["Alpha", "Gamma"])
+
+        response = self.client.get(url, {"_search": "b-c"})
+        self.assertEqual([obj["name"] for obj in response.data["results"]], ["Beta"])
+
+        for scope_type in ("openbook_auth.user", "invalid.model"):
+            response = self.client.get(reverse("scope_type-objects", args=(scope_type,)))
+            self.assertEqual(response.status_code, 404)
@@ -0,0 +1,114 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from allauth.socialaccount.models     import SocialApp
+from django.core.cache                import cache
+from django.test                      import TestCase
+
+from ..models.group                   import Group
+from ..models.signup_group_assignment import SecurityAssertion
+from ..models.signup_group_assignment import SignupGroupAssignment
+
+class SignupGroupAssignment_Tests(TestCase):
+    """
+    Tests for the `SignupGroupAssignment` and `SecurityAssertion` models.
+    """
+    def setUp(self):
+        cache.clear()
+
+        self.social_app = SocialApp.objects.create(provider="saml", provider_id="university", name="University")
+        self.students   = Group.objects.create(name="Students", slug="students")
+        self.teachers   = Group.objects.create(name="Teachers", slug="teachers")
+        self.everybody  = Group.objects.create(name="Everybody", slug="everybody")
+
+        local = SignupGroupAssignment.objects.create(name="Local")
+        local.groups.set([self.everybody])
+
+        social = SignupGroupAssignment.objects.create(name="Social", social_app=self.social_app)
+        social.groups.set([self.everybody])
+
+        self.student_assignment = SignupGroupAssignment.objects.create(name="Students", social_app=self.social_app)
+        self.student_assignment.groups.set([self.students])
+        self.student_assignment.assertions.create(name="role", value="^student", match_strategy=SecurityAssertion.MatchStrategy.REGEX)
+
+        self.teacher_assignment = SignupGroupAssignment.objects.create(name="Teachers", social_app=self.social_app)
+        self.teacher_assignment.groups.set([self.teachers])
+        self.teacher_assignment.assertions.create(name="role", value="teacher", match_strategy=SecurityAssertion.MatchStrategy.EXACT)
+
+    def test_match_strategies(self):
+        """
+        Assertions must match single values and lists according to their strategy.
+        """
+        strategies = [
+            (SecurityAssertion.MatchStrategy.EXACT,       "abc",    "abc",  "abcd"),
+            (SecurityAssertion.MatchStrategy.CONTAINS,    "b",      "abc",  "xyz"),
+            (SecurityAssertion.MatchStrategy.STARTS_WITH, "a",      "abc",  "cba"),
+            (SecurityAssertion.MatchStrategy.ENDS_WITH,   "c",      "abc",  "cba"),
+            (SecurityAssertion.MatchStrategy.REGEX,       "a.c$",   "abc",  "abcd"),
+            (SecurityAssertion.MatchStrategy.ANY,         "",       "abc",  None),
+        ]
+
+        for match_strategy, value, matching, not_matching in strategies:
+            assertion = SecurityAssertion(name="key", value=value, match_strategy=match_strategy)
+
+            self.assertTrue(assertion.match({"key": matching}), match_strategy)
+            self.assertTrue(assertion.match([{"other": "x"}, {"key": ["x", matching]}]), match_strategy)
+            self.assertFalse(assertion.match({"other": matching}), match_strategy)
+
+            if not_matching is not None:
+                self.assertFalse(assertion.match({"key": not_matching}), match_strategy)
+
+    def test_local_accounts(self):
+        """
+        Local accounts get the groups of the assignments without social app.
+        """
+        matcher = SignupGroupAssignment.get_matcher(site_id=None)
+        self.assertEqual(matcher.get_group_ids(), {self.everybody.pk})
+
+    def test_social_accounts(self):
+        """
+        Social accounts get the groups of all matching assignments of their social app.
+        """
+        matcher = SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+
+        self.assertEqual(matcher.get_group_ids({"role": ["student"]}), {self.everybody.pk, self.students.pk})
+        self.assertEqual(matcher.get_group_ids({"role": "teacher"}), {self.everybody.pk, self.teachers.pk})
+        self.assertEqual(matcher.get_group_ids({}), {self.everybody.pk})
+
+    def test_unknown_provider(self):
+        """
+        No matcher exists for unknown providers.
+        """
+        self.assertIsNone(SignupGroupAssignment.get_matcher(site_id=None, provider="unknown"))
+
+    def test_matcher_cached(self):
+        """
+        Matchers are compiled only once and compiled again after changes.
+        """
+        SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+
+        with self.assertNumQueries(0):
+            matcher = SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+
+        self.assertEqual(matcher.get_group_ids({"role": "assistant"}), {self.everybody.pk})
+
+        assertion = self.teacher_assignment.assertions.get()
+        assertion.value = "assistant"
+        assertion.save()
+
+        matcher = SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+        self.assertEqual(matcher.get_group_ids({"role": "assistant"}), {self.everybody.pk, self.teachers.pk})
+
+        self.teacher_assignment.groups.add(self.students)
+        matcher = SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+        self.assertEqual(matcher.get_group_ids({"role": "assistant"}), {self.everybody.pk, self.teachers.pk, self.students.pk})
+
+        self.teacher_assignment.is_active = False
+        self.teacher_assignment.save()
+        matcher = SignupGroupAssignment.get_matcher(site_id=None, provider="university")
+        self.assertEqual(matcher.get_group_ids({"role": "assistant"}), {self.everybody.pk})
@@ -55,5 +55,45 @@ class Utils_Test(TestCase):
         with self.assertRaises(Permission.DoesNotExist):
             utils.permission_for_perm_string("admin.invalid_permission")
 
+    def test_registry_no_queries(self):
+        """
+        Once loaded, lookups should be answered from the registry without queries.
+        """
+        utils.permission_for_perm_string(self.perm_string)
+        utils.app_name_for_permission(self.permission)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(utils.permission_for_perm_string(self.perm_string), self.permission)
+            self.assertEqual(utils.perm_string_for_permission(self.permission), self.perm_string)
+            self.assertEqual(utils.app_name_for_permission(self.permission), "Administration")
+            self.assertEqual(utils.model_name_for_permission(self.permission), "log entry")
+
+    def test_registry_reset_on_change(self):
+        """
+        New permissions should be found after they have been created.
+        """
+        utils.permission_for_perm_string(self.perm_string)
+        self.addCleanup(utils.permission_registry.reset)
 
+        content_type = ContentType.objects.get(app_label="admin", model="logentry")
+        permission   = Permission.objects.create(codename="archive_logentry", name="Can archive log entry", content_type=content_type)
+
+        self.assertEqual(utils.permission_for_perm_string("admin.archive_logentry"), permission)
+
+
+    def test_scope_type_registry(self):
+        """
+        Scope types should be known from the app registry and answered without queries.
+        """
+        course_type = ContentType.objects.get(app_label="openbook_content", model="course")
+        user_type   = ContentType.objects.get(app_label="openbook_auth", model="user")
+        utils.scope_type_registry.get_content_types()
 
+        with self.assertNumQueries(0):
+            self.assertIn(course_type, utils.scope_type_registry.get_content_types())
+            self.assertIn(course_type.pk, utils.scope_type_registry.get_content_type_ids())
+            self.assertTrue(utils.scope_type_registry.is_scope_type(course_type))
+            self.assertFalse(utils.scope_type_registry.is_scope_type(user_type))
+            self.assertFalse(utils.scope_type_registry.is_scope_type(None))
+            self.assertTrue(utils.scope_type_registry.is_scope_model_string("openbook_content.course"))
+            self.assertFalse(utils.scope_type_registry.is_scope_model_string("openbook_auth.user"))
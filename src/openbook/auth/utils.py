@@ -6,27 +6,184 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+import csv, hashlib, io, json, threading
+
 from django.contrib.auth.models                import Permission
+from django.contrib.contenttypes.models        import ContentType
+from django.db.models                          import Model
+from django.utils                              import translation
 from openbook.core.middleware.current_language import get_current_language
+from openbook.core.models.mixins.i18n          import get_translations
+from openbook.core.models.mixins.i18n          import prefetch_translations
+from openbook.core.utils.cache                 import VersionedMemo
+from openbook.core.utils.content_type          import content_type_registry
+from openbook.core.utils.content_type          import model_string_for_content_type
+
+class PermissionRegistry:
+    """
+    Thread-safe in-process registry of all permissions, indexed by permission string
+    (`{app_label}.{codename}`). Works like the `ContentTypeRegistry`: All permissions are loaded
+    with a single query on first use, unknown permissions are looked up in the database. The
+    registry is cleared by signal handlers after migrations and when permissions are changed.
+    """
+    def __init__(self):
+        self._lock           = threading.RLock()
+        self._by_perm_string = {}
+        self._loaded         = False
+
+    def _load(self):
+        """
+        Load all permissions, if not done already.
+        """
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            for permission in Permission.objects.all():
+                self._add(permission)
+
+            self._loaded = True
+
+    def _add(self, permission: Permission):
+        """
+        Add a single permission to the registry.
+        """
+        with self._lock:
+            self._by_perm_string[perm_string_for_permission(permission)] = permission
+
+    def reset(self):
+        """
+        Forget all permissions. They will be reloaded on next access.
+        """
+        with self._lock:
+            self._by_perm_string = {}
+            self._loaded         = False
+
+    def get_for_perm_string(self, perm: str) -> Permission:
+        """
+        Get permission by permission string or raise `Permission.DoesNotExist`.
+        """
+        self._load()
+        permission = self._by_perm_string.get(perm)
+
+        if permission is None:
+            app_label, codename = perm.split(".", 1)
+            permission = Permission.objects.get(codename=codename, content_type__app_label=app_label)
+            self._add(permission)
+
+        return permission
+
+permission_registry = PermissionRegistry()
+
+class ScopeTypeRegistry:
+    """
+    Thread-safe in-process registry of the models that implement `ScopedRolesMixin` and therefor
+    act as permission scopes for user roles. The models are registered once in `AuthApp.ready()`,
+    so that the content type table never needs to be scanned. Their content types are resolved
+    on first use via the `ContentTypeRegistry` and kept in dictionaries for constant-time lookups
+    by id and by model string. The resolved content types are cleared by signal handlers after
+    migrations and when content types are changed.
+    """
+    def __init__(self):
+        self._lock            = threading.RLock()
+        self._models          = ()
+        self._by_id           = {}
+        self._by_model_string = {}
+        self._loaded          = False
+
+    def _load(self):
+        """
+        Resolve the content types of all registered models, if not done already.
+        """
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            for model in self._models:
+                try:
+                    content_type = content_type_registry.get_for_model_string(model._meta.label_lower)
+                except ContentType.DoesNotExist:
+                    content_type = ContentType.objects.get_for_model(model)
+
+                self._by_id[content_type.pk] = content_type
+                self._by_model_string[model._meta.label_lower] = content_type
+
+            self._loaded = True
+
+    def register(self, models: list[type[Model]]):
+        """
+        Set the scope models. Called once during app initialization.
+        """
+        with self._lock:
+            self._models = tuple(models)
+            self.reset()
+
+    def reset(self):
+        """
+        Forget the resolved content types. They will be resolved again on next access.
+        """
+        with self._lock:
+            self._by_id           = {}
+            self._by_model_string = {}
+            self._loaded          = False
+
+    def get_models(self) -> tuple[type[Model], ...]:
+        """
+        Get all scope models.
+        """
+        return self._models
+
+    def get_content_types(self) -> list[ContentType]:
+        """
+        Get the content types of all scope models.
+        """
+        self._load()
+        return list(self._by_id.values())
+
+    def get_content_type_ids(self) -> list[int]:
+        """
+        Get the content type ids of all scope models.
+        """
+        self._load()
+        return list(self._by_id.keys())
+
+    def is_scope_type(self, content_type: ContentType|None) -> bool:
+        """
+        Check whether the given content type belongs to a scope model.
+        """
+        self._load()
+        return content_type is not None and content_type.pk in self._by_id
+
+    def is_scope_model_string(self, model_string: str) -> bool:
+        """
+        Check whether the given model string (`{app_label}.{model}`) belongs to a scope model.
+        """
+        self._load()
+        return model_string.lower() in self._by_model_string
+
+scope_type_registry = ScopeTypeRegistry()
 
 def perm_name_for_permission(permission: "Permission") -> str:
     """
-    Get clear-text, translated permission name from permission object.
+    Get clear-text, translated permission name from permission object. Use `prefetch_translations()`
+    to avoid a query per permission, when many permissions are displayed.
     """
-    from .models.permission_text import PermissionText
     language = get_current_language()
 
     if not permission:
         return ""
 
     if language:
-        try:
-            translation = PermissionText.objects.get(parent = permission, language = language)
+        translation = get_translations(permission, language)
 
-            if translation.name:
-                return translation.name
-        except PermissionText.DoesNotExist:
-            pass
+        if translation and translation.name:
+            return translation.name
     
     return permission.name
     
@@ -35,13 +192,17 @@ def perm_string_for_permission(permission: "Permission") -> str:
     Serialize permission object into permission string as used by Django:
     `{app_label}.{codename}`
     """
-    return f"{permission.content_type.app_label}.{permission.codename}" if permission else ""
+    if not permission:
+        return ""
+
+    content_type = content_type_registry.get_for_id(permission.content_type_id)
+    return f"{content_type.app_label}.{permission.codename}"
 
 def app_label_for_permission(permission: "Permission") -> str:
     """
     Get app label from permission object.
     """
-    return permission.content_type.app_label if permission else ""
+    return content_type_registry.get_for_id(permission.content_type_id).app_label if permission else ""
 
 def app_name_for_permission(permission: "Permission") -> str:
     """
@@ -50,8 +211,8 @@ def app_name_for_permission(permission: "Permission") -> str:
     if not permission:
         return ""
     
-    model = permission.content_type.model_class()
-    return model._meta.app_config.verbose_name or permission.content_type.app_label
+    content_type = content_type_registry.get_for_id(permission.content_type_id)
+    return content_type_registry.get_verbose_names(content_type)[0]
 
 def model_for_permission(permission: "Permission") -> str:
     """
@@ -60,7 +221,7 @@ def model_for_permission(permission: "Permission") -> str:
     if not permission:
         return ""
     
-    return permission.content_type.model
+    return content_type_registry.get_for_id(permission.content_type_id).model
 
 def model_name_for_permission(permission: "Permission") -> str:
     """
@@ -69,12 +230,8 @@ def model_name_for_permission(permission: "Permission") -> str:
     if not permission:
         return ""
     
-    model = permission.content_type.model_class()
-
-    if not model:
-        return ""
-
-    return model._meta.verbose_name
+    content_type = content_type_registry.get_for_id(permission.content_type_id)
+    return content_type_registry.get_verbose_names(content_type)[1]
 
 def permission_for_perm_string(perm: str) -> "Permission":
     """
@@ -84,6 +241,108 @@ def permission_for_perm_string(perm: str) -> "Permission":
     if not perm:
         return None
     
-    app_label, codename = perm.split(".", 1)
-    return Permission.objects.get(codename=codename, content_type__app_label=app_label)
+    return permission_registry.get_for_perm_string(perm)
+
+PERMISSION_CATALOG_VERSION_NAME = "openbook_auth:permission_catalog"
+
+# Process-local copies of the permission catalog, keyed by language
+_permission_catalogs: VersionedMemo[tuple[str, list[dict]]] = VersionedMemo(shared=True)
+
+# Process-local index of the catalog entries by scope type: {language: (etag, {model string: entries})}
+_permission_catalogs_by_scope_type: dict[str, tuple[str, dict[str, list[dict]]]] = {}
+
+def get_permission_catalog(language: str) -> tuple[str, list[dict]]:
+    """
+    Get the catalog of all permissions with their permission strings and translated names
+    for the given language, as used by the frontend to display permissions. Returns a tuple with
+    a hash of the content, usable as `ETag`, and the catalog entries.
+
+    The catalog is built once per language and shared with other worker processes via the cache.
+    It is rebuilt when the cache version is bumped by the signal handlers, i.e. when permissions,
+    their translations or the allowed role permissions have been changed.
+    """
+    return _permission_catalogs.get(PERMISSION_CATALOG_VERSION_NAME, lambda: _build_permission_catalog(language), key=language)
+
+def get_permission_catalog_by_scope_type(language: str) -> dict[str, list[dict]]:
+    """
+    Get the entries of the permission catalog for the given language, indexed by the model
+    strings of the scope types whose roles may use the permissions. The index is rebuilt along
+    with the catalog and must be treated as read-only.
+    """
+    etag, entries = get_permission_catalog(language)
+    cached = _permission_catalogs_by_scope_type.get(language)
+
+    if cached is None or cached[0] != etag:
+        by_scope_type = {}
+
+        for entry in entries:
+            for scope_type in entry["scope_types"]:
+                by_scope_type.setdefault(scope_type, []).append(entry)
+
+        cached = (etag, by_scope_type)
+        _permission_catalogs_by_scope_type[language] = cached
+
+    return cached[1]
+
+def _build_permission_catalog(language: str) -> tuple[str, list[dict]]:
+    """
+    Build the permission catalog for the given language with three queries in total.
+    """
+    from .models.allowed_role_permission import AllowedRolePermission
+    from .models.permission_text         import PermissionText
+
+    scope_types = {}
+    entries     = []
+
+    for permission_id, scope_type_id in AllowedRolePermission.objects.values_list("permission_id", "scope_type_id"):
+        scope_type = content_type_registry.get_for_id(scope_type_id)
+        scope_types.setdefault(permission_id, []).append(model_string_for_content_type(scope_type))
+
+    with translation.override(language):
+        for permission in Permission.objects.prefetch_related(prefetch_translations(PermissionText, language=language)):
+            content_type         = content_type_registry.get_for_id(permission.content_type_id)
+            app_name, model_name = content_type_registry.get_verbose_names(content_type)
+
+            entries.append({
+                "id":                 permission.pk,
+                "perm_string":        f"{content_type.app_label}.{permission.codename}",
+                "perm_display_name":  getattr(get_translations(permission, language), "name", "") or permission.name,
+                "app":                content_type.app_label,
+                "app_display_name":   str(app_name),
+                "model":              content_type.model,
+                "model_display_name": str(model_name),
+                "scope_types":        sorted(scope_types.get(permission.pk, [])),
+            })
+
+    entries.sort(key=lambda entry: entry["perm_string"])
+    content = json.dumps([language, entries], sort_keys=True, separators=(",", ":")).encode()
+
+    return (hashlib.sha256(content).hexdigest()[:32], entries)
+
+def usernames_from_csv(file) -> list[str]:
+    """
+    Read usernames from an uploaded CSV file for bulk enrollments. The file may either contain
+    a header row with a `username` column or just the usernames in the first column. Comma,
+    semicolon and tab are recognized as delimiters.
+    """
+    content = file.read()
+
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+
+    try:
+        dialect = csv.Sniffer().sniff(content[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    rows   = [row for row in csv.reader(io.StringIO(content), dialect) if row]
+    column = 0
+
+    if rows:
+        header = [value.strip().lower() for value in rows[0]]
+
+        if "username" in header:
+            column = header.index("username")
+            rows   = rows[1:]
 
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
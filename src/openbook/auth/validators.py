@@ -14,16 +14,17 @@ from django.core.exceptions             import ValidationError
 from django.utils.translation           import gettext_lazy as _
 
 from .models.allowed_role_permission    import AllowedRolePermission
-from .models.mixins.scope               import ScopedRolesMixin
+from .utils                             import perm_string_for_permission
+from .utils                             import scope_type_registry
 
 def validate_scope_type(scope_type: ContentType):
     """
     Check that only valid scope types are assigned where the model class implements
     the `ScopedRolesMixin`.
     """
-    if not issubclass(scope_type.model_class(), ScopedRolesMixin):
+    if not scope_type_registry.is_scope_type(scope_type):
         raise ValidationError(_("Scope type %(scope_type)s is not valid."), params={
-            "scope_type": scope_type.model_class()._meta.verbose_name
+            "scope_type": scope_type.name
         })
 
 def validate_permissions(scope_type: ContentType, permissions: Iterable[Permission]):
@@ -35,10 +36,38 @@ def validate_permissions(scope_type: ContentType, permissions: Iterable[Permissi
     if not scope_type or not permissions:
         return
     
-    allowed_permissions = [*AllowedRolePermission.get_for_scope_type(scope_type).values_list("permission", flat=True)]
+    allowed_permissions = AllowedRolePermission.get_permission_ids(scope_type)
 
     for permission in permissions:
         if not permission.pk in allowed_permissions:
             raise ValidationError(_("Permission %(perm)s cannot be assigned in this scope"), params={
                 "perm": f"{permission}",
-            })
\ No newline at end of file
+            })
+
+def validate_permissions_bulk(items: Iterable[tuple[ContentType, Iterable[Permission]]]) -> dict[int, ValidationError]:
+    """
+    Bulk version of `validate_permissions()`, e.g. to check many roles during imports: Check
+    the permissions of many scope types at once. Other than the single version, this doesn't
+    raise an exception. Instead a `ValidationError` with all disallowed permissions (as permission
+    strings, like in import files) is returned for each invalid item, keyed by the position of the
+    item. The result is empty if all items are valid.
+    """
+    allowed_permissions = AllowedRolePermission.get_permission_ids_by_scope_type()
+    errors = {}
+
+    for index, (scope_type, permissions) in enumerate(items):
+        if not scope_type or not permissions:
+            continue
+
+        allowed    = allowed_permissions.get(scope_type.pk, frozenset())
+        disallowed = [permission for permission in permissions if not permission.pk in allowed]
+
+        if disallowed:
+            errors[index] = ValidationError([
+                ValidationError(_("Permission %(perm)s cannot be assigned in this scope"), params={
+                    "perm": perm_string_for_permission(permission),
+                })
+                for permission in disallowed
+            ])
+
+    return errors
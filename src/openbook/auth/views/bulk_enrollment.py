@@ -0,0 +1,145 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from django                     import forms
+from django.core.exceptions     import PermissionDenied
+from django.shortcuts           import get_object_or_404
+from django.utils.translation   import gettext_lazy as _
+from django.views.generic       import FormView
+from unfold.views               import UnfoldModelAdminViewMixin
+from unfold.widgets             import UnfoldAdminFileFieldWidget
+from unfold.widgets             import UnfoldAdminSplitDateTimeWidget
+from unfold.widgets             import UnfoldAdminTextareaWidget
+
+from ..models.enrollment_method import EnrollmentMethod
+from ..models.role              import Role
+from ..models.role_assignment   import RoleAssignment
+from ..utils                    import usernames_from_csv
+
+class BulkEnrollmentForm(forms.Form):
+    """
+    Custom form to render the input fields with proper styling.
+    """
+    usernames = forms.CharField(
+        label     = _("Usernames"),
+        help_text = _("One username per line"),
+        required  = False,
+        widget    = UnfoldAdminTextareaWidget,
+    )
+
+    file = forms.FileField(
+        label     = _("CSV File"),
+        help_text = _("With a `username` column or the usernames in the first column"),
+        required  = False,
+        widget    = UnfoldAdminFileFieldWidget,
+    )
+
+    def clean(self):
+        """
+        Merge the usernames from the text field and the uploaded CSV file.
+        """
+        cleaned_data = super().clean()
+        usernames    = cleaned_data.get("usernames", "").splitlines()
+
+        if cleaned_data.get("file", None):
+            try:
+                usernames.extend(usernames_from_csv(cleaned_data["file"]))
+            except UnicodeDecodeError:
+                self.add_error("file", _("The file must be a UTF-8 encoded CSV file."))
+
+        cleaned_data["usernames"] = [username.strip() for username in usernames if username.strip()]
+
+        if not cleaned_data["usernames"] and not self.errors:
+            raise forms.ValidationError(_("Either usernames or a CSV file must be given."))
+
+        return cleaned_data
+
+class RoleBulkEnrollmentForm(BulkEnrollmentForm):
+    """
+    Bulk enrollment form with an additional end date, since roles have no duration.
+    """
+    end_date = forms.SplitDateTimeField(
+        label    = _("End Date"),
+        required = False,
+        widget   = UnfoldAdminSplitDateTimeWidget,
+    )
+
+class BulkEnrollmentView(UnfoldModelAdminViewMixin, FormView):
+    """
+    Base class for the custom views that allow to enroll many users at once in the Django Admin,
+    either via an enrollment method or by directly assigning a role. The result is shown below
+    the form, which is rendered again instead of redirecting.
+    """
+    title               = _("Bulk Enrollment")
+    permission_required = ["openbook_auth.add_roleassignment"]
+    template_name       = "openbook_auth/admin/bulk_enroll.html"
+    form_class          = BulkEnrollmentForm
+    model               = None
+
+    def setup(self, request, *args, object_id, **kwargs):
+        """
+        Setup view instance. Read enrollment method or role from database.
+        """
+        super().setup(request, *args, **kwargs)
+        self.object = get_object_or_404(self.model, pk = object_id)
+        self.result = None
+
+    def get_context_data(self, **kwargs):
+        """
+        Populate template context for rendering the output page.
+        """
+        return {
+            **super().get_context_data(**kwargs),
+            "object": self.object,
+            "opts":   self.model._meta,
+            "result": self.result,
+        }
+
+    def bulk_enroll(self, form) -> dict:
+        """
+        Perform the actual bulk enrollment. Must be implemented by sub-classes.
+        """
+        raise NotImplementedError()
+
+    def form_valid(self, form):
+        """
+        Enroll the users and render the form again to show the result.
+        """
+        try:
+            self.result = self.bulk_enroll(form)
+        except PermissionDenied:
+            form.add_error(None, _("You are not allowed to assign this role."))
+
+        return super().form_invalid(form)
+
+class EnrollmentMethodBulkEnrollmentView(BulkEnrollmentView):
+    """
+    Bulk enrollment via an enrollment method.
+    """
+    model = EnrollmentMethod
+
+    def bulk_enroll(self, form) -> dict:
+        return self.object.bulk_enroll(
+            usernames       = form.cleaned_data["usernames"],
+            permission_user = self.request.user,
+        )
+
+class RoleBulkEnrollmentView(BulkEnrollmentView):
+    """
+    Bulk enrollment by directly assigning a role.
+    """
+    model      = Role
+    form_class = RoleBulkEnrollmentForm
+
+    def bulk_enroll(self, form) -> dict:
+        return RoleAssignment.bulk_enroll(
+            role            = self.object,
+            usernames       = form.cleaned_data["usernames"],
+            end_date        = form.cleaned_data["end_date"],
+            permission_user = self.request.user,
+        )
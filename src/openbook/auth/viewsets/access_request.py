@@ -6,16 +6,24 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from django.utils.translation      import gettext_lazy as _
 from django_filters.filters        import CharFilter
 from django_filters.filterset      import FilterSet
 from drf_spectacular.utils         import extend_schema
 from rest_framework.decorators     import action
 from rest_framework.response       import Response
+from rest_framework.serializers    import CharField
+from rest_framework.serializers    import ChoiceField
+from rest_framework.serializers    import IntegerField
+from rest_framework.serializers    import ListField
+from rest_framework.serializers    import Serializer
+from rest_framework.serializers    import UUIDField
 from rest_framework.viewsets       import ModelViewSet
 
 from openbook.drf.flex_serializers import FlexFieldsModelSerializer
 from openbook.drf.viewsets         import ModelViewSetMixin
 from openbook.drf.viewsets         import with_flex_fields_parameters
+from ..backends                    import RoleBasedObjectPermissionsBackend
 from ..filters.mixins.audit        import CreatedModifiedByFilterMixin
 from ..filters.mixins.scope        import ScopeFilterMixin
 from ..models.access_request       import AccessRequest
@@ -52,6 +60,19 @@ class AccessRequestSerializer(FlexFieldsModelSerializer):
             "modified_by": "openbook.auth.viewsets.user.UserSerializer",
         }
 
+class AccessRequestBulkDecisionSerializer(Serializer):
+    __doc__ = "Bulk Decision"
+
+    ids      = ListField(child=UUIDField(), allow_empty=False, help_text=_("IDs of the access requests"))
+    decision = ChoiceField(choices=[AccessRequest.Decision.ACCEPTED, AccessRequest.Decision.DENIED])
+
+class AccessRequestBulkDecisionResultSerializer(Serializer):
+    __doc__ = "Bulk Decision Result"
+
+    decided   = IntegerField(help_text=_("Number of access requests whose decision changed"))
+    unchanged = IntegerField(help_text=_("Number of access requests that already had the decision"))
+    not_found = ListField(child=CharField(), help_text=_("IDs of access requests that were not found"))
+
 class AccessRequestFilter(ScopeFilterMixin, CreatedModifiedByFilterMixin, FilterSet):
     role = CharFilter(method="role_filter")
     user = CharFilter(method="user_filter")
@@ -122,3 +143,32 @@ class AccessRequestViewSet(ModelViewSetMixin, ModelViewSet):
         access_request = self.get_object()
         access_request.deny(permission_user=request.user)
         return Response(AccessRequestSerializer(instance=access_request).data)
+
+    @extend_schema(
+        operation_id = "auth_access_requests_bulk_decide",
+        request      = AccessRequestBulkDecisionSerializer,
+        responses    = AccessRequestBulkDecisionResultSerializer,
+        summary      = "Bulk Decision",
+    )
+    @action(methods=["post"], detail=False, url_path="bulk_decide")
+    def bulk_decide(self, request):
+        """
+        Accept or deny many requests at once. Either all or none are changed. Requests that
+        the user is not allowed to change are reported as not found.
+        """
+        serializer = AccessRequestBulkDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        ids     = [str(pk) for pk in serializer.validated_data["ids"]]
+        objs    = self.filter_queryset(self.get_queryset()).filter(pk__in=ids)
+        backend = RoleBasedObjectPermissionsBackend()
+        visible = {str(pk) for pk in backend.has_obj_perms(request.user, "openbook_auth.change_accessrequest", objs)}
+
+        result = AccessRequest.bulk_decide(
+            ids             = [pk for pk in ids if pk in visible],
+            decision        = serializer.validated_data["decision"],
+            permission_user = request.user,
+        )
+
+        result["not_found"] = [pk for pk in ids if pk not in visible]
+        return Response(AccessRequestBulkDecisionResultSerializer(result).data)
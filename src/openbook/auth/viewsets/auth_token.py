@@ -33,10 +33,11 @@ class AuthTokenSerializer(FlexFieldsModelSerializer):
             "id", "user", "token",
             "name", "description", "text_format",
             "is_active", "start_date", "end_date",
+            "last_used_at", "request_count",
             "created_by", "created_at", "modified_by", "modified_at",
         ]
 
-        read_only_fields = ["id", "token", "created_at", "modified_at"]
+        read_only_fields = ["id", "token", "last_used_at", "request_count", "created_at", "modified_at"]
 
         expandable_fields = {
             "user":        "openbook.auth.viewsets.user.UserSerializer",
@@ -67,10 +68,11 @@ class AuthTokenFilter(CreatedModifiedByFilterMixin, FilterSet):
     class Meta:
         model  = AuthToken
         fields = {
-            "user":       (),
-            "is_active":  ("exact",),
-            "start_date": ("exact", "lte", "gte"),
-            "end_date":   ("exact", "lte", "gte"),
+            "user":         (),
+            "is_active":    ("exact",),
+            "start_date":   ("exact", "lte", "gte"),
+            "end_date":     ("exact", "lte", "gte"),
+            "last_used_at": ("exact", "lte", "gte", "isnull"),
             **CreatedModifiedByFilterMixin.Meta.fields,
         }
 
@@ -13,6 +13,7 @@ from drf_spectacular.utils         import inline_serializer
 from rest_framework.decorators     import action
 from rest_framework.response       import Response
 from rest_framework.permissions    import AllowAny
+from rest_framework.permissions    import IsAuthenticated
 from rest_framework.serializers    import CharField
 from rest_framework.viewsets       import ModelViewSet
 
@@ -22,6 +23,8 @@ from openbook.drf.viewsets         import with_flex_fields_parameters
 from ..filters.mixins.audit        import CreatedModifiedByFilterMixin
 from ..filters.mixins.scope        import ScopeFilterMixin
 from ..models.enrollment_method    import EnrollmentMethod
+from .role_assignment              import BulkEnrollmentResultSerializer
+from .role_assignment              import BulkEnrollmentSerializer
 from .role_assignment              import RoleAssignmentSerializer
 from ..serializers.mixins.scope    import ScopeTypeField
 from ..serializers.role            import RoleField
@@ -42,11 +45,11 @@ class EnrollmentMethodSerializer(FlexFieldsModelSerializer):
             "id", "scope_type", "scope_uuid",
             "name", "description", "text_format",
             "role", "end_date", "duration_period", "duration_value",
-            "passphrase", "is_active",
+            "passphrase", "is_active", "max_enrollments", "enrollment_count",
             "created_by", "created_at", "modified_by", "modified_at",
         ]
 
-        read_only_fields = ["id", "created_at", "modified_at"]
+        read_only_fields = ["id", "enrollment_count", "created_at", "modified_at"]
 
         expandable_fields = {
             "role":        "openbook.auth.viewsets.role.RoleSerializer",
@@ -113,4 +116,28 @@ class EnrollmentMethodViewSet(ModelViewSetMixin, ModelViewSet):
         role_assignment = enrollment_method.enroll(**kwargs)
         serializer      = RoleAssignmentSerializer(role_assignment)
 
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+    @extend_schema(
+        operation_id = "auth_enrollment_method_bulk_enroll",
+        summary      = "Bulk Enroll Users",
+        request      = BulkEnrollmentSerializer,
+        responses    = BulkEnrollmentResultSerializer,
+    )
+    @action(detail=True, methods=["post"], url_path="bulk_enroll", permission_classes=[IsAuthenticated])
+    def bulk_enroll(self, request, pk=None):
+        """
+        Enroll many users at once via given enrollment method, e.g. all students of a course.
+        Requires the permission to add role assignments instead of the passphrase.
+        """
+        enrollment_method = self.get_object()
+
+        serializer = BulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = enrollment_method.bulk_enroll(
+            usernames       = serializer.validated_data["usernames"],
+            permission_user = request.user,
+        )
+
+        return Response(BulkEnrollmentResultSerializer(result).data)
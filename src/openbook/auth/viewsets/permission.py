@@ -6,24 +6,46 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from drf_spectacular.utils         import extend_schema
-from drf_spectacular.utils         import extend_schema_field
-from django.contrib.auth.models    import Permission
-from django_filters.filterset      import FilterSet
-from django_filters.filters        import CharFilter
-from rest_framework.viewsets       import ReadOnlyModelViewSet
-from rest_framework.serializers    import SerializerMethodField
-
-from openbook.drf.flex_serializers import FlexFieldsModelSerializer
-from openbook.drf.viewsets         import AllowAnonymousListRetrieveViewSetMixin
-from openbook.drf.viewsets         import with_flex_fields_parameters
-from ..utils                       import app_label_for_permission
-from ..utils                       import app_name_for_permission
-from ..utils                       import model_for_permission
-from ..utils                       import model_name_for_permission
-from ..utils                       import perm_name_for_permission
-from ..utils                       import perm_string_for_permission
-from ..utils                       import permission_for_perm_string
+from drf_spectacular.utils              import OpenApiParameter
+from drf_spectacular.utils              import OpenApiResponse
+from drf_spectacular.utils              import extend_schema
+from drf_spectacular.utils              import extend_schema_field
+from django.conf                        import settings
+from django.contrib.auth.models         import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions             import ValidationError as DjangoValidationError
+from django.utils.http                  import parse_etags
+from django.utils.translation           import gettext_lazy as _
+from django_filters.filterset           import FilterSet
+from django_filters.filters             import CharFilter
+from rest_framework.decorators          import action
+from rest_framework.exceptions          import ValidationError
+from rest_framework.permissions         import AllowAny
+from rest_framework.response            import Response
+from rest_framework.status              import HTTP_304_NOT_MODIFIED
+from rest_framework.viewsets            import ReadOnlyModelViewSet
+from rest_framework.serializers         import BooleanField
+from rest_framework.serializers         import CharField
+from rest_framework.serializers         import IntegerField
+from rest_framework.serializers         import ListField
+from rest_framework.serializers         import Serializer
+from rest_framework.serializers         import SerializerMethodField
+
+from openbook.core.models.mixins.i18n   import prefetch_translations
+from openbook.core.utils.content_type   import content_type_for_model_string
+from openbook.drf.flex_serializers      import FlexFieldsModelSerializer
+from openbook.drf.viewsets              import AllowAnonymousListRetrieveViewSetMixin
+from openbook.drf.viewsets              import with_flex_fields_parameters
+from ..backends                         import RoleBasedObjectPermissionsBackend
+from ..models.permission_text           import PermissionText
+from ..utils                            import app_label_for_permission
+from ..utils                            import app_name_for_permission
+from ..utils                            import get_permission_catalog
+from ..utils                            import model_for_permission
+from ..utils                            import model_name_for_permission
+from ..utils                            import perm_name_for_permission
+from ..utils                            import perm_string_for_permission
+from ..utils                            import permission_for_perm_string
 
 class PermissionSerializer(FlexFieldsModelSerializer):
     __doc__ = "Permission"
@@ -73,6 +95,59 @@ class PermissionSerializer(FlexFieldsModelSerializer):
     def get_model_display_name(self, obj: Permission) -> str:
         return model_name_for_permission(obj)
 
+class PermissionCatalogSerializer(Serializer):
+    __doc__ = "Permission Catalog Entry"
+
+    id                 = IntegerField()
+    perm_string        = CharField()
+    perm_display_name  = CharField()
+    app                = CharField()
+    app_display_name   = CharField()
+    model              = CharField()
+    model_display_name = CharField()
+    scope_types        = ListField(child=CharField(), help_text=_("Scope types whose roles may contain the permission"))
+
+class PermissionCheckSerializer(Serializer):
+    __doc__ = "Permission Check"
+
+    perm       = CharField(help_text=_("Permission string"))
+    scope_type = CharField(required=False, allow_blank=True, default="", help_text=_("Model of the scope or object, empty for non-object permissions"))
+    scope_uuid = CharField(required=False, allow_blank=True, default="", help_text=_("ID of the scope or object"))
+    allowed    = BooleanField(read_only=True)
+
+    def validate(self, attributes):
+        """
+        Check that the permission exists and resolve the model of the scope or object.
+        """
+        try:
+            permission_for_perm_string(attributes["perm"])
+        except (Permission.DoesNotExist, ValueError):
+            raise ValidationError({"perm": _("Permission not found.")})
+
+        attributes["model"] = None
+
+        if not attributes["scope_type"]:
+            return attributes
+
+        try:
+            model = content_type_for_model_string(attributes["scope_type"]).model_class()
+        except (ContentType.DoesNotExist, ValueError):
+            model = None
+
+        if model is None:
+            raise ValidationError({"scope_type": _("Model not found.")})
+
+        if not hasattr(model, "has_obj_perm") and not hasattr(model, "has_obj_perms"):
+            raise ValidationError({"scope_type": _("Model has no object permissions.")})
+
+        try:
+            attributes["pk"] = model._meta.pk.to_python(attributes["scope_uuid"])
+        except DjangoValidationError:
+            raise ValidationError({"scope_uuid": _("Invalid ID.")})
+
+        attributes["model"] = model
+        return attributes
+
 class PermissionFilter(FilterSet):
     perm_string = CharFilter(label="Permission String", method="filter_perm_string")
     app         = CharFilter(label="App",   field_name="content_type__app_label", lookup_expr="icontains")
@@ -106,3 +181,88 @@ class PermissionViewSet(AllowAnonymousListRetrieveViewSetMixin, ReadOnlyModelVie
     serializer_class = PermissionSerializer
     ordering         = ["content_type__app_label", "codename"]
     search_fields    = ["content_type__app_label", "codename"]
+    max_checks       = 100
+
+    def get_queryset(self):
+        """
+        Prefetch the translated permission names in the language of the request.
+        """
+        return super().get_queryset().prefetch_related(prefetch_translations(PermissionText))
+
+    @extend_schema(
+        operation_id = "auth_permissions_catalog",
+        summary      = "Permission Catalog",
+        parameters   = [OpenApiParameter("If-None-Match", str, OpenApiParameter.HEADER, description="ETag of a previously received catalog")],
+        responses    = {
+            200: PermissionCatalogSerializer(many=True),
+            304: OpenApiResponse(description="Catalog not modified"),
+        },
+    )
+    @action(detail=False, methods=["get"], url_path="catalog", permission_classes=[AllowAny], filter_backends=[], pagination_class=None)
+    def catalog(self, request):
+        """
+        All permissions with their translated names in the language of the request, for clients
+        that need to display many permissions at once. The catalog is precomputed and delivered
+        with an `ETag` header. Clients should send it in the `If-None-Match` header of subsequent
+        requests, to receive a `304 Not Modified` response until the permissions change.
+        """
+        language = getattr(request, "LANGUAGE_CODE", "") or settings.LANGUAGE_CODE
+        etag, entries = get_permission_catalog(language)
+
+        etag    = f'"{etag}"'
+        headers = {"ETag": etag, "Cache-Control": "public, no-cache"}
+
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(entries, headers=headers)
+
+    @extend_schema(
+        operation_id = "auth_permissions_check",
+        summary      = "Check Permissions",
+        request      = PermissionCheckSerializer(many=True),
+        responses    = PermissionCheckSerializer(many=True),
+    )
+    @action(detail=False, methods=["post"], url_path="check", permission_classes=[AllowAny], filter_backends=[], pagination_class=None)
+    def check(self, request):
+        """
+        Check several permissions of the current user at once, e.g. to decide which actions
+        to offer in the user interface. Each check contains a permission string and optionally
+        the model and ID of a scope or object for object permissions. All objects of the same
+        model are loaded with a single query and checked in batches. At most `max_checks`
+        permissions can be checked with one request.
+        """
+        serializer = PermissionCheckSerializer(data=request.data, many=True, max_length=self.max_checks)
+        serializer.is_valid(raise_exception=True)
+
+        backend = RoleBasedObjectPermissionsBackend()
+        checks  = serializer.validated_data
+        objects = {}
+        batches = {}
+        allowed = {}
+
+        for check in checks:
+            if check["model"]:
+                objects.setdefault(check["model"], set()).add(check["pk"])
+
+        for model, pks in objects.items():
+            objects[model] = model._default_manager.in_bulk(pks)
+
+        for check in checks:
+            obj = objects[check["model"]].get(check["pk"]) if check["model"] else None
+
+            if obj is not None:
+                batches.setdefault((check["perm"], check["model"]), []).append(obj)
+
+        for (perm, model), objs in batches.items():
+            allowed[(perm, model)] = backend.has_obj_perms(request.user, perm, objs)
+
+        for check in checks:
+            if check["model"]:
+                check["allowed"] = check["pk"] in allowed.get((check["perm"], check["model"]), ())
+            else:
+                check["allowed"] = backend.has_perm(request.user, check["perm"])
+
+        return Response(PermissionCheckSerializer(checks, many=True).data)
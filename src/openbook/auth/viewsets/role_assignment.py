@@ -7,8 +7,19 @@
 # License, or (at your option) any later version.
 
 from drf_spectacular.utils         import extend_schema
+from django.utils.translation      import gettext_lazy as _
 from django_filters.filters        import CharFilter
 from django_filters.filterset      import FilterSet
+from rest_framework.decorators     import action
+from rest_framework.exceptions     import ValidationError
+from rest_framework.response       import Response
+from rest_framework.serializers    import CharField
+from rest_framework.serializers    import DateTimeField
+from rest_framework.serializers    import FileField
+from rest_framework.serializers    import IntegerField
+from rest_framework.serializers    import ListField
+from rest_framework.serializers    import Serializer
+from rest_framework.serializers    import UUIDField
 from rest_framework.viewsets       import ModelViewSet
 
 from openbook.drf.flex_serializers import FlexFieldsModelSerializer
@@ -20,6 +31,7 @@ from ..models.role_assignment      import RoleAssignment
 from ..serializers.mixins.scope    import ScopeTypeField
 from ..serializers.role            import RoleField
 from ..serializers.user            import UserField
+from ..utils                       import usernames_from_csv
 
 class RoleAssignmentSerializer(FlexFieldsModelSerializer):
     __doc__ = "Role Assignment"
@@ -52,6 +64,64 @@ class RoleAssignmentSerializer(FlexFieldsModelSerializer):
             "modified_by":       "openbook.auth.viewsets.user.UserSerializer",
         }
 
+class BulkEnrollmentSerializer(Serializer):
+    __doc__ = "Bulk Enrollment"
+
+    usernames = ListField(child=CharField(), required=False, default=list, help_text=_("Usernames of the users to enroll"))
+    file      = FileField(required=False, write_only=True, help_text=_("CSV file with a `username` column or the usernames in the first column"))
+
+    def validate(self, attributes):
+        """
+        Merge the usernames from the list and the uploaded CSV file.
+        """
+        usernames = list(attributes.get("usernames", []))
+
+        if attributes.get("file", None):
+            try:
+                usernames.extend(usernames_from_csv(attributes["file"]))
+            except UnicodeDecodeError:
+                raise ValidationError({"file": _("The file must be a UTF-8 encoded CSV file.")})
+
+        if not usernames:
+            raise ValidationError({"usernames": _("Either usernames or a CSV file must be given.")})
+
+        attributes["usernames"] = usernames
+        return attributes
+
+class RoleAssignmentBulkEnrollmentSerializer(BulkEnrollmentSerializer):
+    __doc__ = "Bulk Enrollment"
+
+    scope_type = ScopeTypeField()
+    scope_uuid = UUIDField()
+    role       = RoleField()
+    end_date   = DateTimeField(required=False, allow_null=True, default=None)
+
+    def validate(self, attributes):
+        """
+        Check that the role belongs to the given scope and that the scope exists, like the
+        validation of single role assignments does.
+        """
+        attributes = super().validate(attributes)
+        scope_type = attributes["scope_type"]
+        scope_uuid = attributes["scope_uuid"]
+        role       = attributes["role"]
+
+        if role.scope_type != scope_type or role.scope_uuid != scope_uuid:
+            raise ValidationError({"role": _("The scopes of the role and this object don't match.")})
+
+        if not scope_type.model_class()._default_manager.filter(pk=scope_uuid).exists():
+            raise ValidationError({"scope_uuid": _("Scope object not found.")})
+
+        return attributes
+
+class BulkEnrollmentResultSerializer(Serializer):
+    __doc__ = "Bulk Enrollment Result"
+
+    created           = IntegerField(help_text=_("Number of new role assignments"))
+    updated           = IntegerField(help_text=_("Number of renewed or changed role assignments"))
+    skipped           = IntegerField(help_text=_("Number of unchanged role assignments and unknown users"))
+    unknown_usernames = ListField(child=CharField(), help_text=_("Usernames that were not found"))
+
 class RoleAssignmentFilter(ScopeFilterMixin, CreatedModifiedByFilterMixin, FilterSet):
     role = CharFilter(method="role_filter")
     user = CharFilter(method="user_filter")
@@ -93,3 +163,27 @@ class RoleAssignmentViewSet(ModelViewSetMixin, ModelViewSet):
         "user__username", "user__first_name", "user__last_name", "user__email",
         "role__slug", "role__name", "role__description",
     ]
+
+    @extend_schema(
+        operation_id = "auth_role_assignment_bulk_enroll",
+        summary      = "Bulk Enroll Users",
+        request      = RoleAssignmentBulkEnrollmentSerializer,
+        responses    = BulkEnrollmentResultSerializer,
+    )
+    @action(detail=False, methods=["post"], url_path="bulk_enroll")
+    def bulk_enroll(self, request):
+        """
+        Assign a role to many users at once, given as a list of usernames or a CSV file.
+        Existing role assignments are updated instead of duplicated.
+        """
+        serializer = RoleAssignmentBulkEnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = RoleAssignment.bulk_enroll(
+            role            = serializer.validated_data["role"],
+            usernames       = serializer.validated_data["usernames"],
+            end_date        = serializer.validated_data["end_date"],
+            permission_user = request.user,
+        )
+
+        return Response(BulkEnrollmentResultSerializer(result).data)
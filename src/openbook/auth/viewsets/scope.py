@@ -6,25 +6,30 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from django.conf                        import settings
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions             import FieldError
+from django.core.exceptions             import FieldDoesNotExist
+from django.db.models                   import Q
 from drf_spectacular.utils              import extend_schema
 from drf_spectacular.utils              import OpenApiParameter
 from rest_framework                     import status
+from rest_framework.decorators          import action
 from rest_framework.permissions         import IsAuthenticated
 from rest_framework.response            import Response
 from rest_framework.serializers         import CharField
 from rest_framework.serializers         import IntegerField
 from rest_framework.serializers         import Serializer
 from rest_framework.serializers         import UUIDField
-from rest_framework.viewsets            import ViewSet
+from rest_framework.settings            import api_settings
+from rest_framework.viewsets            import GenericViewSet
 
 from openbook.core.utils.content_type   import content_type_for_model_string
+from openbook.core.utils.content_type   import content_type_registry
 from openbook.core.utils.content_type   import model_string_for_content_type
-from ..models.allowed_role_permission   import AllowedRolePermission
-from ..models.permission_text           import PermissionText
+from openbook.drf.pagination            import PageNumberPagination
 from ..models.mixins.scope              import ScopedRolesMixin
-from ..utils                            import perm_string_for_permission
+from ..utils                            import get_permission_catalog_by_scope_type
+from ..utils                            import scope_type_registry
 
 class AllowedPermissionSerializer(Serializer):
     id    = IntegerField()
@@ -41,7 +46,6 @@ class ScopeTypeRetrieveSerializer(Serializer):
     pk                  = IntegerField()
     id                  = CharField()
     label               = CharField()
-    objects             = ScopeObjectSerializer(many=True, required=False)
     allowed_permissions = AllowedPermissionSerializer(many=True, required=False)
 
 class ScopeTypeListSerializer(Serializer):
@@ -49,17 +53,25 @@ class ScopeTypeListSerializer(Serializer):
     id    = CharField()
     label = CharField()
 
+scope_type_parameter = OpenApiParameter(
+    name        = "id",
+    type        = str,
+    location    = OpenApiParameter.PATH,
+    description = "Unique identifier for the scope (id or pk)",
+)
+
 @extend_schema(
     extensions={
         "x-app-name":   "User Management",
         "x-model-name": "Scope Types",
     }
 )
-class ScopeTypeViewSet(ViewSet):
+class ScopeTypeViewSet(GenericViewSet):
     """
     Permission scopes. When a list is requested, a flat list of scope types will be returned.
-    If a single object is requested, full details including all scopes and allowed permissions
-    will be returned.
+    If a single object is requested, full details including the allowed permissions will be
+    returned. The scope objects themselves can be searched page by page with the `objects`
+    sub-resource.
     """
     __doc__ = "Permission Scopes"
     
@@ -71,6 +83,28 @@ class ScopeTypeViewSet(ViewSet):
     lookup_value_regex = '[^/]+'
     ordering           = ["id"]
 
+    # Model fields that are searched by prefix in the scope objects, if they exist
+    search_fields = ["name", "slug"]
+
+    def get_scope_content_type(self) -> ContentType|None:
+        """
+        Get the content type of the requested scope type, given either by its primary key or
+        its model string. Returns `None`, if the content type is not a scope type.
+        """
+        scope_type   = self.kwargs.get("id")
+        content_type = None
+
+        try:
+            if scope_type.isdigit():
+                content_type = content_type_registry.get_for_id(int(scope_type))
+            else:
+                content_type = content_type_for_model_string(scope_type)
+        except (ContentType.DoesNotExist, ValueError):
+            # Unknown id or model string, or model string without app label
+            pass
+
+        return content_type if scope_type_registry.is_scope_type(content_type) else None
+
     @extend_schema(responses=ScopeTypeListSerializer)
     def list(self, request, *args, **kwargs):
         """
@@ -89,81 +123,90 @@ class ScopeTypeViewSet(ViewSet):
         serializer.is_valid()
         return Response(serializer.data)
 
-    @extend_schema(
-            parameters=[
-                OpenApiParameter(
-                    name        = "id",
-                    type        = str,
-                    location    = OpenApiParameter.PATH,
-                    description = "Unique identifier for the scope (id or pk)",
-                ),
-            ],
-            responses=ScopeTypeRetrieveSerializer,
-        )
+    @extend_schema(parameters=[scope_type_parameter], responses=ScopeTypeRetrieveSerializer)
     def retrieve(self, request, *args, **kwargs):
         """
-        GET Scope Type: Return an object with all scopes and allowed permissions.
+        GET Scope Type: Return an object with the allowed permissions of the scope type. These
+        are served from the cached permission catalog, translated into the request language.
         """
-        scope_type   = self.request.parser_context["kwargs"].get("id")
-        content_type = None
-
-        try:
-            try:
-                content_type = ContentType.objects.get(pk=int(scope_type))
-            except ValueError:
-                content_type = content_type_for_model_string(scope_type)
-        except:
-            pass
+        content_type = self.get_scope_content_type()
 
         if not content_type:
             return Response(status=status.HTTP_404_NOT_FOUND, data=[])
 
-        try:
-            query_set = content_type.get_all_objects_for_this_type().only("id", "name").order_by("name")
-        except FieldError:
-            # PK references content type without id or name field
-            return Response(status=status.HTTP_404_NOT_FOUND, data=[])
-        
+        model_string = model_string_for_content_type(content_type)
+        language     = getattr(request, "LANGUAGE_CODE", "") or settings.LANGUAGE_CODE
+        catalog      = get_permission_catalog_by_scope_type(language)
+
         result = {
             "pk":                  content_type.pk,
-            "id":                  model_string_for_content_type(content_type),
+            "id":                  model_string,
             "label":               content_type.name,
-            "objects":             [],
-            "allowed_permissions": [],
+            "allowed_permissions": [{
+                "id":    entry["id"],
+                "perm":  entry["perm_string"],
+                "app":   entry["app_display_name"],
+                "model": entry["model_display_name"],
+                "name":  entry["perm_display_name"],
+            } for entry in catalog.get(model_string, [])],
         }
         
-        for scope in query_set.all():
-            result["objects"].append({    
-                "uuid":  scope.id,
-                "name":  scope.name if hasattr(scope, "name") else scope.id,
-            })
+        serializer = ScopeTypeRetrieveSerializer(data=result)
+        serializer.is_valid()
+        return Response(serializer.data)
 
-        allowed_role_permissions = AllowedRolePermission.get_for_scope_type(content_type).all()
-        allowed_permissions = []
+    @extend_schema(
+        operation_id = "auth_scope_types_objects_list",
+        summary      = "List Scope Objects",
+        parameters   = [
+            scope_type_parameter,
+            OpenApiParameter(
+                name        = api_settings.SEARCH_PARAM,
+                type        = str,
+                location    = OpenApiParameter.QUERY,
+                description = "Only objects whose name or slug starts with the given text",
+            ),
+        ],
+        responses = ScopeObjectSerializer(many=True),
+    )
+    @action(detail=True, methods=["get"], url_path="objects", pagination_class=PageNumberPagination)
+    def objects(self, request, *args, **kwargs):
+        """
+        GET Scope Objects: Return the objects of the scope type page by page, ordered by name
+        and optionally filtered by a prefix of their name or slug.
+        """
+        content_type = self.get_scope_content_type()
+        model        = content_type.model_class() if content_type else None
 
-        for allowed_role_permission in allowed_role_permissions:
-            if allowed_role_permission.permission:
-                allowed_permissions.append(allowed_role_permission.permission)
-        
-        translations = PermissionText.objects.filter(parent__in=allowed_permissions).all()
+        if not model:
+            return Response(status=status.HTTP_404_NOT_FOUND, data=[])
 
-        for allowed_role_permission in allowed_role_permissions:
-            permission = allowed_role_permission.permission
+        fields = []
 
-            if not permission:
-                continue
+        for field_name in self.search_fields:
+            try:
+                model._meta.get_field(field_name)
+                fields.append(field_name)
+            except FieldDoesNotExist:
+                pass
 
-            translation = next((t for t in translations if t.parent == permission), None)
-            model = permission.content_type.model_class()
+        queryset = model._default_manager.only("pk", *fields)
+        queryset = queryset.order_by("name", "pk") if "name" in fields else queryset.order_by("pk")
+        search   = request.query_params.get(api_settings.SEARCH_PARAM, "").strip()
 
-            result["allowed_permissions"].append({
-                "id":    permission.pk,
-                "perm":  perm_string_for_permission(permission),
-                "app":   model._meta.app_config.verbose_name,
-                "model": model._meta.verbose_name,
-                "name":  translation.name if translation else permission.name,
-            })
-        
-        serializer = ScopeTypeRetrieveSerializer(data=result)
-        serializer.is_valid()
-        return Response(serializer.data)
+        if search and fields:
+            condition = Q()
+
+            for field_name in fields:
+                condition |= Q(**{f"{field_name}__istartswith": search})
+
+            queryset = queryset.filter(condition)
+
+        page = self.paginate_queryset(queryset)
+
+        serializer = ScopeObjectSerializer([{
+            "uuid": obj.pk,
+            "name": getattr(obj, "name", obj.pk),
+        } for obj in page], many=True)
+
+        return self.get_paginated_response(serializer.data)
@@ -23,4 +23,7 @@ class OpenBookServerApp(AppConfig):
             return self.name
 
         from django.contrib.contenttypes.models import ContentType
-        ContentType.__str__ = content_type_str
\ No newline at end of file
+        ContentType.__str__ = content_type_str
+
+        # Connect signal handlers for cache invalidation
+        from . import signals
\ No newline at end of file
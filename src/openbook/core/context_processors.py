@@ -10,21 +10,20 @@ from django.conf              import settings
 from django.contrib           import messages
 from django.http              import HttpRequest
 from django.utils.translation import gettext_lazy as _
-from .models                  import Site
+from .utils.site_config       import get_site_config
 
 def site(request: HttpRequest = None) -> dict:
     """
     Add the current site as customized in Django's Sites app to all templates.
     """
-    try:
-        site_id   = settings.SITE_ID or 1
-        site_obj  = Site.objects.get(pk=site_id)
+    site_config = get_site_config(settings.SITE_ID or 1)
 
+    if site_config.site:
         return {
-            "site": site_obj,
+            "site": site_config.site,
         }
-    except Site.DoesNotExist:
-        warning = _("WARNING: Website %s is not customized. Please login to the Admin and maintain its data.") % site_id
+    else:
+        warning = _("WARNING: Website %s is not customized. Please login to the Admin and maintain its data.") % site_config.site_id
         messages.warning(request, warning)
         print(warning)
 
@@ -0,0 +1,124 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+import asyncio, time
+
+from django.core.handlers.asgi   import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.db.backends.signals  import connection_created
+from django.urls                 import reverse
+
+class Command(BaseCommand):
+    """
+    Requests are sent directly to Django's ASGI handler, i.e. the same code path as with Daphne
+    but without network overhead. Each request gets its own thread for synchronous code there
+    (see `asgiref.sync.ThreadSensitiveContext`), so that concurrent requests only wait for each
+    other while holding the GIL. The gain therefor depends on the time spent waiting for the
+    database. With a local SQLite database there is hardly any, which can be simulated with
+    `--query-delay`.
+    """
+    help = "Compare the throughput of read-only API requests sent one after another and concurrently via ASGI"
+
+    URL_NAMES = [
+        "current_user-list",
+        "course-list",
+        "language-list",
+        "site-list",
+        "permission-list",
+        "html_library-list",
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests",    type=int,   default=200, help="Total number of requests per run")
+        parser.add_argument("--concurrency", type=int,   default=20,  help="Number of requests in flight at once")
+        parser.add_argument("--query-delay", type=float, default=0,   help="Simulated database latency per query in milliseconds")
+        parser.add_argument("--url",         action="append",         help="URL to request (repeatable, default: some list endpoints)")
+
+    def handle(self, *args, **options):
+        urls        = options["url"] or [reverse(url_name) for url_name in self.URL_NAMES]
+        application = ASGIHandler()
+        results     = {}
+
+        def delay_queries(execute, sql, params, many, context):
+            time.sleep(options["query_delay"] / 1000)
+            return execute(sql, params, many, context)
+
+        def add_query_delay(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay_queries)
+
+        if options["query_delay"]:
+            connection_created.connect(add_query_delay)
+
+        try:
+            for concurrency in (1, options["concurrency"]):
+                results[concurrency] = asyncio.run(self.run_requests(application, urls, options["requests"], concurrency))
+        finally:
+            connection_created.disconnect(add_query_delay)
+
+        for concurrency, (elapsed, errors) in results.items():
+            self.stdout.write(f"Concurrency {concurrency:>4}: {options['requests'] / elapsed:8.1f} requests/s ({errors} errors)")
+
+        self.stdout.write(f"Speed-up        : {results[1][0] / results[options['concurrency']][0]:8.2f}x")
+
+    async def run_requests(self, application, urls: list[str], requests: int, concurrency: int) -> tuple[float, int]:
+        """
+        Send the requests and return the elapsed time and number of failed requests.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        errors    = 0
+
+        async def request(url):
+            nonlocal errors
+
+            async with semaphore:
+                status = await self.send_request(application, url)
+
+                if status >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[request(urls[i % len(urls)]) for i in range(requests)])
+
+        return (time.perf_counter() - start, errors)
+
+    async def send_request(self, application, url: str) -> int:
+        """
+        Send a single anonymous `GET` request to the ASGI application and return the status code.
+        """
+        path, _, query_string = url.partition("?")
+        request_body = [{"type": "http.request", "body": b"", "more_body": False}]
+        status_code  = 500
+
+        scope = {
+            "type":         "http",
+            "asgi":         {"version": "3.0"},
+            "http_version": "1.1",
+            "method":       "GET",
+            "scheme":       "http",
+            "path":         path,
+            "query_string": query_string.encode(),
+            "headers":      [(b"host", b"localhost"), (b"accept", b"application/json")],
+            "server":       ("localhost", 80),
+            "client":       ("127.0.0.1", 0),
+        }
+
+        async def receive():
+            if request_body:
+                return request_body.pop()
+
+            # Client disconnect is never signalled
+            await asyncio.Event().wait()
+
+        async def send(message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        await application(scope, receive, send)
+        return status_code
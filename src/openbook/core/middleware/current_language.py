@@ -6,19 +6,36 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-import threading
+import contextvars
 
-thread_local = threading.local()
+from asgiref.sync            import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
 
+current_language = contextvars.ContextVar("current_language", default=None)
+
+@sync_and_async_middleware
 def CurrentLanguageMiddleware(get_response):
     """
-    Save the current language in a thread-local variable so that it can be accessed
+    Save the current language in a context variable so that it can be accessed
     within the other layers. This is done to get the language in DRF serializers that
-    needs to handle translation themselves.
+    needs to handle translation themselves. Works for sync and async views alike.
     """
-    def middleware(request):
-        thread_local.current_language = request.LANGUAGE_CODE
-        return get_response(request)
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = current_language.set(request.LANGUAGE_CODE)
+
+            try:
+                return await get_response(request)
+            finally:
+                current_language.reset(token)
+    else:
+        def middleware(request):
+            token = current_language.set(request.LANGUAGE_CODE)
+
+            try:
+                return get_response(request)
+            finally:
+                current_language.reset(token)
 
     return middleware
 
@@ -26,4 +43,4 @@ def get_current_language():
     """
     Get the current request language, if any. Returns `None` otherwise.
     """
-    return getattr(thread_local, "current_language", None)
+    return current_language.get()
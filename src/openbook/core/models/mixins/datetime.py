@@ -13,6 +13,7 @@ from datetime                   import datetime, timedelta
 from django.contrib             import admin
 from django.core.exceptions     import ValidationError
 from django.db                  import models
+from django.utils.timezone      import now
 from django.utils.translation   import gettext_lazy as _
 
 class ValidityTimeSpanMixin(models.Model):
@@ -38,6 +39,17 @@ class ValidityTimeSpanMixin(models.Model):
         if self.start_date is not None and self.end_date is not None and self.start_date >= self.end_date:
             raise ValidationError(_("End date must be later than start date."))
 
+    @classmethod
+    def get_validity_filter(cls, timestamp: datetime|None = None) -> models.Q:
+        """
+        Get a `Q` object matching all objects that are valid at the given point in time
+        (default: now), i.e. whose validity time span has started and not ended, yet.
+        """
+        timestamp = timestamp or now()
+
+        return (models.Q(start_date__isnull=True) | models.Q(start_date__lte=timestamp)) \
+             & (models.Q(end_date__isnull=True) | models.Q(end_date__gt=timestamp))
+
     @property
     @admin.display(description=_("Limited Validity"))
     def validity_time_span(self):
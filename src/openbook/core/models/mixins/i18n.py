@@ -9,7 +9,7 @@
 from typing                     import Optional
 from django.conf                import settings
 from django.db                  import models
-from django.db.models           import Q
+from django.db.models           import Prefetch
 from django.utils.translation   import gettext_lazy as _, get_language
 
 def LanguageField():
@@ -52,6 +52,53 @@ class TranslatableMixin(models.Model):
     def __str__(self):
         return self.language.name
 
+# Prefix of the attribute of the parent objects with the translations loaded by `prefetch_translations()`
+PREFETCHED_TRANSLATIONS = "prefetched_translations"
+
+def get_language_candidates(language: str = "") -> list[str]:
+    """
+    Get the language codes to look for translations, best match first: The given language
+    (default: language of the current thread) and the `LANGUAGE_CODE` setting as fallback,
+    each followed by its primary language, if it is a regional variant like `en-us`.
+    """
+    candidates = []
+
+    for language_code in (language or get_language() or "", settings.LANGUAGE_CODE or ""):
+        for code in (language_code, language_code.split("-")[0]):
+            if code and code not in candidates:
+                candidates.append(code)
+
+    return candidates
+
+def get_prefetched_translations_attr(candidates: list[str]) -> str:
+    """
+    Name of the attribute with the prefetched translations for the given language candidates.
+    The candidates are part of the name, so that translations prefetched for one language are
+    never mistaken for those of another language.
+    """
+    return f"{PREFETCHED_TRANSLATIONS}:{','.join(candidates)}"
+
+def prefetch_translations(model: type[TranslatableMixin], lookup: str = "translations", language: str = "",
+                          attr_t_language: str = "language") -> Prefetch:
+    """
+    Create a `Prefetch` object that loads the translations of many parent objects with a single
+    query, e.g. for a whole page of a list view. Only the translations that `get_translations()`
+    might choose for the given language (default: language of the current thread) are loaded
+    and attached to the parent objects, so that `get_translations()` needs no further queries.
+
+    ```python
+    HTMLLibrary.objects.prefetch_related(prefetch_translations(HTMLLibraryText))
+    AnonymousPermission.objects.prefetch_related(prefetch_translations(PermissionText, "permission__translations"))
+    ```
+
+    Because the language is evaluated immediately, the `Prefetch` object must be created for
+    each request, e.g. in `get_queryset()`, instead of once in a class attribute.
+    `get_translations()` only uses the prefetched translations for the same language.
+    """
+    candidates = get_language_candidates(language)
+    queryset   = model.objects.filter(**{f"{attr_t_language}__in": candidates})
+    return Prefetch(lookup, queryset=queryset, to_attr=get_prefetched_translations_attr(candidates))
+
 def get_translations(object: models.Model, language: str = "",
                      attr_id: str = "id", attr_translations: str = "translations",
                      attr_t_parent: str = "parent", attr_t_language: str = "language") -> Optional[models.Model]:
@@ -62,32 +109,30 @@ def get_translations(object: models.Model, language: str = "",
     model and `language` ("attr_t_language") with the language code.
 
     Tries to find translations for the given language (default: language of the current thread)
-    or the `LANGUAGE_CODE` setting as fallback, if different.
+    or the `LANGUAGE_CODE` setting as fallback, if different. Translations that have been loaded
+    with `prefetch_translations()` for the same language are used without a query. Otherwise a
+    single query is needed.
 
     Returns the best found translation or None, if none exists.
     """
-    if not language:
-        language = get_language()
+    candidates   = get_language_candidates(language)
+    translations = getattr(object, get_prefetched_translations_attr(candidates), None)
 
-    id = getattr(object, attr_id)
+    if translations is None:
+        id = getattr(object, attr_id)
 
-    default_language = settings.LANGUAGE_CODE or ""
-    default_kwargs   = {attr_t_parent: id, attr_t_language: default_language}
-    language_kwargs  = {attr_t_parent: id, attr_t_language: language}
+        translations = getattr(object, attr_translations).filter(**{
+            attr_t_parent: id,
+            f"{attr_t_language}__in": candidates,
+        })
 
-    translations = getattr(object, attr_translations)
+    by_language = {getattr(translation, f"{attr_t_language}_id"): translation for translation in translations}
 
-    if default_kwargs == language_kwargs:
-        results = translations.filter(**language_kwargs);
-    else:
-        results = translations.filter(Q(**language_kwargs) | Q(**default_kwargs))
+    for code in candidates:
+        if code in by_language:
+            return by_language[code]
 
-    if results.count() == 0:
-        return None
-    elif results.count() == 1:
-        return results.first()
-    else:
-        return results.get(**language_kwargs)
+    return None
 
 class TranslationMissing(Exception):
     """
@@ -0,0 +1,34 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals           import post_delete
+from django.db.models.signals           import post_migrate
+from django.db.models.signals           import post_save
+from django.dispatch                    import receiver
+
+from .models.site                       import Site
+from .utils.content_type                import content_type_registry
+from .utils.site_config                 import bump_site_config_version
+
+@receiver(post_migrate)
+@receiver(post_save, sender=ContentType)
+@receiver(post_delete, sender=ContentType)
+def content_types_changed(sender, **kwargs):
+    """
+    Reload content types after migrations or when they have been changed.
+    """
+    content_type_registry.reset()
+
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+def site_changed(sender, instance, **kwargs):
+    """
+    Reload the site configuration when the site has been changed.
+    """
+    bump_site_config_version(instance.pk)
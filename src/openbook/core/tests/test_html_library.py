@@ -16,6 +16,8 @@ from ..models.html_library                 import HTMLLibrary
 from ..models.html_library                 import HTMLLibraryText
 from ..models.html_library                 import HTMLLibraryVersion
 from ..models.language                     import Language
+from ..models.mixins.i18n                  import get_translations
+from ..models.mixins.i18n                  import prefetch_translations
 
 class HTMLLibrary_Test_Mixin:
     def setUp(self):
@@ -153,6 +155,42 @@ class HTMLLibraryText_ViewSet_Tests(ModelViewSetTestMixin, HTMLLibrary_Test_Mixi
     def pk_found(self):
         return self.lib1_text_en.pk
 
+    def test_get_translations(self):
+        """
+        The best translation should be chosen with a single query, falling back to the default
+        language and the primary language of regional variants.
+        """
+        with self.settings(LANGUAGE_CODE="en-us"), self.assertNumQueries(3):
+            self.assertEqual(get_translations(self.lib1, "de"), self.lib1_text_de)
+            self.assertEqual(get_translations(self.lib2, "de"), self.lib2_text_en)
+            self.assertEqual(get_translations(self.lib1, "fr-ca"), self.lib1_text_en)
+
+        with self.settings(LANGUAGE_CODE="fr"):
+            self.assertIsNone(get_translations(self.lib2, "de"))
+
+    def test_prefetch_translations(self):
+        """
+        The translations of many parents should be prefetched with one query and then be
+        chosen without further queries.
+        """
+        with self.settings(LANGUAGE_CODE="en"), self.assertNumQueries(2):
+            libraries = list(HTMLLibrary.objects.order_by("name").prefetch_related(prefetch_translations(HTMLLibraryText, language="de")))
+            texts     = [get_translations(library, "de") for library in libraries]
+
+        self.assertEqual(texts, [self.lib1_text_de, self.lib2_text_en])
+
+    def test_prefetch_translations_other_language(self):
+        """
+        Translations prefetched for one language must not be used for another language.
+        """
+        with self.settings(LANGUAGE_CODE="en"):
+            libraries = list(HTMLLibrary.objects.order_by("name").prefetch_related(prefetch_translations(HTMLLibraryText, language="de")))
+
+            with self.assertNumQueries(2):
+                texts = [get_translations(library, "fr") for library in libraries]
+
+        self.assertEqual(texts, [self.lib1_text_en, self.lib2_text_en])
+
 class HTMLLibraryVersion_ViewSet_Tests(ModelViewSetTestMixin, HTMLLibrary_Test_Mixin, TestCase):
     """
     Tests for the `HTMLLibraryVersionViewSet` REST API.
@@ -0,0 +1,91 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from django.test                      import RequestFactory
+from django.test                      import TestCase
+
+from openbook.auth.allauth.adapter    import AccountAdapter
+from openbook.auth.models.auth_config import AuthConfig
+from openbook.auth.models.auth_config import AuthConfigText
+from ..context_processors             import site
+from ..models.language                import Language
+from ..models.site                    import Site
+from ..utils.site_config              import bump_site_config_version
+from ..utils.site_config              import get_site_config
+
+class SiteConfig_Tests(TestCase):
+    """
+    Test cases for the cached site configuration.
+    """
+    def setUp(self):
+        bump_site_config_version(1)
+
+        self.site = Site.objects.update_or_create(pk=1, defaults={
+            "domain":     "example.com",
+            "name":       "Example Site",
+            "short_name": "Example",
+            "about_url":  "https://example.com/about",
+        })[0]
+
+        self.auth_config = AuthConfig.objects.create(site=self.site, signup_email_suffix="@example.com")
+        self.language_en = Language.objects.get_or_create(language="en", defaults={"name": "English"})[0]
+        self.language_de = Language.objects.get_or_create(language="de", defaults={"name": "Deutsch"})[0]
+
+        AuthConfigText.objects.create(parent=self.auth_config, language=self.language_en, logout_next_text="Home")
+        AuthConfigText.objects.create(parent=self.auth_config, language=self.language_de, logout_next_text="Startseite")
+
+    def test_cached(self):
+        """
+        The configuration should be read only once and then be served from the cache.
+        """
+        site_config = get_site_config(1)
+
+        self.assertEqual(site_config.site, self.site)
+        self.assertEqual(site_config.auth_config, self.auth_config)
+        self.assertEqual(site_config.get_auth_config_text("de").logout_next_text, "Startseite")
+        self.assertEqual(site_config.get_auth_config_text("fr").logout_next_text, "Home")
+
+        request = RequestFactory().post("/")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(site(request)["site"], self.site)
+            self.assertTrue(AccountAdapter(request).is_open_for_signup(request))
+            self.assertEqual(AccountAdapter(request).clean_email("user@example.com"), "user@example.com")
+            self.assertEqual(get_site_config(1).auth_config.site, self.site)
+
+    def test_invalidated_on_save(self):
+        """
+        Changes to the site, the authentication settings or their texts must be visible at once.
+        """
+        get_site_config(1)
+
+        self.site.name = "Changed Site"
+        self.site.save()
+        self.assertEqual(get_site_config(1).site.name, "Changed Site")
+
+        self.auth_config.local_signup_allowed = False
+        self.auth_config.save()
+        self.assertFalse(get_site_config(1).auth_config.local_signup_allowed)
+
+        AuthConfigText.objects.filter(language=self.language_de).get().delete()
+        self.assertEqual(get_site_config(1).get_auth_config_text("de").logout_next_text, "Home")
+
+        self.auth_config.delete()
+        self.assertIsNone(get_site_config(1).auth_config)
+        self.assertEqual(get_site_config(1).auth_config_texts, {})
+
+    def test_missing_site(self):
+        """
+        Sites that have not been maintained yet should result in an empty configuration.
+        """
+        self.site.delete()
+        site_config = get_site_config(1)
+
+        self.assertIsNone(site_config.site)
+        self.assertIsNone(site_config.auth_config)
+        self.assertIsNone(site_config.get_auth_config_text("en"))
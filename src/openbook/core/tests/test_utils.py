@@ -6,10 +6,14 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from unittest                           import mock
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache                  import cache
 from django.test                        import TestCase
 from django.utils.translation           import activate
 from ..utils                            import content_type
+from ..utils.cache                      import VersionedMemo
+from ..utils.cache                      import bump_cache_version
 
 class Utils_Test(TestCase):
     """
@@ -40,4 +44,39 @@ class Utils_Test(TestCase):
         with self.assertRaises(ContentType.DoesNotExist):
             content_type.content_type_for_model_string("invalid_app.logentry")
 
+    def test_registry_no_queries(self):
+        """
+        Once loaded, lookups should be answered from the registry without queries.
+        """
+        content_type.content_type_for_model_string(self.model_string)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(content_type.content_type_for_model_string(self.model_string), self.content_type)
+            self.assertEqual(content_type.content_type_registry.get_for_id(self.content_type.pk), self.content_type)
+
+    def test_versioned_memo(self):
+        """
+        Values should be loaded once per key and again after the version has been bumped.
+        """
+        loader = mock.Mock(side_effect=lambda: object())
+        memo   = VersionedMemo()
+
+        value = memo.get("test:memo", loader, key=1)
+        self.assertIs(memo.get("test:memo", loader, key=1), value)
+        self.assertIsNot(memo.get("test:memo", loader, key=2), value)
+        self.assertEqual(loader.call_count, 2)
+
+        bump_cache_version("test:memo")
+        self.assertIsNot(memo.get("test:memo", loader, key=1), value)
+        self.assertEqual(loader.call_count, 3)
+
+    def test_versioned_memo_shared(self):
+        """
+        Shared values should be loaded only once by all processes.
+        """
+        cache.clear()
+        loader = mock.Mock(return_value="value")
 
+        self.assertEqual(VersionedMemo(shared=True).get("test:memo", loader), "value")
+        self.assertEqual(VersionedMemo(shared=True).get("test:memo", loader), "value")
+        self.assertEqual(loader.call_count, 1)
@@ -0,0 +1,116 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+import uuid
+
+from typing                            import Callable
+from typing                            import Generic
+from typing                            import Hashable
+from typing                            import TypeVar
+from django.core.cache                 import cache
+from django.core.cache                 import caches
+from django.core.cache.backends.dummy  import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+def get_cache_version(name: str) -> str:
+    """
+    Get the current version token of a group of cache entries. Cache keys that include the token
+    are implicitly invalidated when the version is bumped with `bump_cache_version()`. This avoids
+    having to know (and delete) each single cache key when the underlying data changes, and works
+    across all worker processes that share the same cache.
+
+    Random tokens are used instead of counters, so that a version can never be reached again,
+    e.g. after the cache has been cleared.
+    """
+    key     = f"openbook:cache_version:{name}"
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+
+    return version
+
+def get_cache_versions(names: list[str]) -> dict[str, str]:
+    """
+    Batch version of `get_cache_version()`: Get the version tokens of several groups of cache
+    entries at once, keyed by name.
+    """
+    keys   = {f"openbook:cache_version:{name}": name for name in names}
+    result = {keys[key]: version for key, version in cache.get_many(keys.keys()).items()}
+
+    for name in names:
+        if name not in result:
+            result[name] = get_cache_version(name)
+
+    return result
+
+def bump_cache_version(name: str):
+    """
+    Invalidate all cache entries whose key contains the version token of the given name.
+    """
+    cache.set(f"openbook:cache_version:{name}", uuid.uuid4().hex, timeout=None)
+
+T = TypeVar("T")
+
+class VersionedMemo(Generic[T]):
+    """
+    Process-local copies of values that are expensive to load, each remembered together with
+    the version token of `get_cache_version()` that was current when it was loaded. The values
+    are kept in the process until the version is bumped, e.g. by a signal handler in another
+    worker process, and must be treated as read-only.
+
+    With `shared=True` the values are also stored in the Django cache under a key containing
+    the version token, so that only one worker process needs to load them after each change.
+    """
+    def __init__(self, shared: bool = False):
+        self.shared   = shared
+        self._entries = {}
+
+    def get(self, version_name: str, loader: Callable[[], T], key: Hashable = None) -> T:
+        """
+        Get the value with the given key (for memos holding more than one value), calling
+        `loader()` when it is missing or the version with the given name has changed.
+        """
+        version = get_cache_version(version_name)
+        cached  = self._entries.get(key)
+
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        if self.shared:
+            cache_key = f"{version_name}:{key}:{version}" if key is not None else f"{version_name}:{version}"
+            value     = cache.get(cache_key)
+
+            if value is None:
+                value = loader()
+                cache.set(cache_key, value)
+        else:
+            value = loader()
+
+        self._entries[key] = (version, value)
+        return value
+
+    def discard(self, key: Hashable = None):
+        """
+        Forget the value with the given key in this process.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Forget all values in this process.
+        """
+        self._entries.clear()
+
+def is_cache_shared() -> bool:
+    """
+    Check whether the default cache is shared by all processes. Otherwise management commands
+    cannot see the data cached by the web server and their cache invalidation doesn't reach it.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
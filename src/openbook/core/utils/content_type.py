@@ -6,8 +6,113 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+import threading
+
 from django.contrib.contenttypes.models import ContentType
 
+class ContentTypeRegistry:
+    """
+    Thread-safe in-process registry of all content types, indexed by model string and by id.
+    All content types are loaded with a single query on first use, which is much cheaper than
+    querying the database for each lookup. Content types that are not yet known (e.g. because
+    they were created after the registry has been loaded) are looked up in the database and
+    added to the registry.
+
+    Additionally, the (lazily translated) app and model verbose names are kept for each content
+    type, so that `model_class()` must not be called over and over again.
+
+    The registry is cleared by signal handlers after migrations and when content types are deleted.
+    """
+    def __init__(self):
+        self._lock            = threading.RLock()
+        self._by_model_string = {}
+        self._by_id           = {}
+        self._verbose_names   = {}
+        self._loaded          = False
+
+    def _load(self):
+        """
+        Load all content types, if not done already.
+        """
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            for content_type in ContentType.objects.all():
+                self._add(content_type)
+
+            self._loaded = True
+
+    def _add(self, content_type: ContentType):
+        """
+        Add a single content type to the registry.
+        """
+        with self._lock:
+            self._by_model_string[f"{content_type.app_label}.{content_type.model}"] = content_type
+            self._by_id[content_type.pk] = content_type
+
+    def reset(self):
+        """
+        Forget all content types. They will be reloaded on next access.
+        """
+        with self._lock:
+            self._by_model_string = {}
+            self._by_id           = {}
+            self._verbose_names   = {}
+            self._loaded          = False
+
+    def get_for_model_string(self, model_string: str) -> ContentType:
+        """
+        Get content type by model string (`{app_label}.{model}`) or raise `ContentType.DoesNotExist`.
+        """
+        self._load()
+        content_type = self._by_model_string.get(model_string)
+
+        if content_type is None:
+            app_label, model = model_string.split(".", 1)
+            content_type = ContentType.objects.get(app_label=app_label, model=model)
+            self._add(content_type)
+
+        return content_type
+
+    def get_for_id(self, id: int) -> ContentType:
+        """
+        Get content type by id or raise `ContentType.DoesNotExist`.
+        """
+        self._load()
+        content_type = self._by_id.get(id)
+
+        if content_type is None:
+            content_type = ContentType.objects.get(pk=id)
+            self._add(content_type)
+
+        return content_type
+
+    def get_verbose_names(self, content_type: ContentType) -> tuple[str, str]:
+        """
+        Get the translated app name and model name of a content type. Falls back to the
+        app label and an empty model name when the model class doesn't exist (anymore).
+        """
+        result = self._verbose_names.get(content_type.pk)
+
+        if result is None:
+            model = content_type.model_class()
+
+            if model:
+                result = (model._meta.app_config.verbose_name or content_type.app_label, model._meta.verbose_name)
+            else:
+                result = (content_type.app_label, "")
+
+            with self._lock:
+                self._verbose_names[content_type.pk] = result
+
+        return result
+
+content_type_registry = ContentTypeRegistry()
+
 def model_string_for_content_type(content_type: "ContentType") -> str:
     """
     Serialize content type objet into model string as used by Django: `{app_label}.{model}`
@@ -22,5 +127,4 @@ def content_type_for_model_string(model_string: str) -> "ContentType":
     if not model_string:
         return None
     
-    app_label, model = model_string.split(".", 1)
-    return ContentType.objects.get(app_label=app_label, model=model)
+    return content_type_registry.get_for_model_string(model_string)
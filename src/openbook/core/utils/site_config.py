@@ -0,0 +1,86 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from dataclasses                      import dataclass
+from dataclasses                      import field
+from django.conf                      import settings
+
+from openbook.auth.models.auth_config import AuthConfig
+from openbook.auth.models.auth_config import AuthConfigText
+from ..models.mixins.i18n             import get_language_candidates
+from ..models.site                    import Site
+from .cache                           import bump_cache_version
+from .cache                           import VersionedMemo
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """
+    Configuration of a single site: The customized `Site` itself, its `AuthConfig` and the
+    `AuthConfigText` translations keyed by language code. Each attribute is `None` (or empty),
+    if the site has not been maintained, yet.
+    """
+    site_id:           int
+    site:              Site|None                 = None
+    auth_config:       AuthConfig|None           = None
+    auth_config_texts: dict[str, AuthConfigText] = field(default_factory=dict)
+
+    def get_auth_config_text(self, language: str = "") -> AuthConfigText|None:
+        """
+        Get the authentication texts for the given language (default: language of the current
+        thread) with the `LANGUAGE_CODE` setting as fallback, like `get_translations()` does.
+        """
+        for code in get_language_candidates(language):
+            if code in self.auth_config_texts:
+                return self.auth_config_texts[code]
+
+        return None
+
+# Process-local copies of the site configurations, keyed by site id
+_site_configs: VersionedMemo[SiteConfig] = VersionedMemo(shared=True)
+
+def get_site_config_version_name(site_id: int) -> str:
+    """
+    Name of the cache version that is bumped, whenever the configuration of a site changes.
+    """
+    return f"openbook_core:site_config:{site_id}"
+
+def get_site_config(site_id: int|None = None) -> SiteConfig:
+    """
+    Get the configuration of the given site (default: `SITE_ID` setting). It is loaded from
+    the database once, shared with other worker processes via the cache and kept in the process,
+    until the cache version is bumped by `bump_site_config_version()`. The result must be treated
+    as read-only.
+    """
+    site_id = site_id or settings.SITE_ID or 1
+    return _site_configs.get(get_site_config_version_name(site_id), lambda: _load_site_config(site_id), key=site_id)
+
+def _load_site_config(site_id: int) -> SiteConfig:
+    """
+    Read the configuration of the given site from the database.
+    """
+    site = Site.objects.filter(pk=site_id).first()
+
+    if site is None:
+        return SiteConfig(site_id=site_id)
+
+    auth_config = AuthConfig.objects.filter(site=site_id).prefetch_related("translations").first()
+
+    if auth_config is None:
+        return SiteConfig(site_id=site_id, site=site)
+
+    auth_config.site  = site
+    auth_config_texts = {text.language_id: text for text in auth_config.translations.all()}
+
+    return SiteConfig(site_id=site_id, site=site, auth_config=auth_config, auth_config_texts=auth_config_texts)
+
+def bump_site_config_version(site_id: int):
+    """
+    Invalidate the cached configuration of the given site in all worker processes.
+    """
+    _site_configs.discard(site_id)
+    bump_cache_version(get_site_config_version_name(site_id))
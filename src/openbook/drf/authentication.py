@@ -6,6 +6,7 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
+from django.core.cache               import cache
 from django.utils.translation        import gettext_lazy as _
 from rest_framework.authentication   import BaseAuthentication
 from rest_framework.authentication   import TokenAuthentication
@@ -13,13 +14,29 @@ from rest_framework.authentication   import get_authorization_header
 from rest_framework.exceptions       import AuthenticationFailed
 
 from openbook.auth.models.auth_token import AuthToken
+from openbook.auth.models.user       import User
+from openbook.core.utils.cache       import get_cache_version
 
 class TokenAuthentication(BaseAuthentication):
     """
     Token authentication for app users. Works hand in hand with the `AuthToken` model
     in the `openbook_auth` app. Based on the class `TokenAuthentication` in DRF.
+
+    Verified tokens are kept in the Django cache for a short time, so that clients sending many
+    requests don't cost database queries for authentication. Unknown tokens are cached, too, to
+    keep brute-force attempts away from the database. The cache key is a hash of the token and
+    only the fields needed for authentication are cached: The token's user id, activation state
+    and validity time span. The user is cached separately under the cache version of the user,
+    which is bumped when the user changes. Neither the token itself nor the password hash of the
+    user are ever written to the cache, both remain deferred fields of the returned objects.
+    Activation state and validity time span are checked on each request, though.
+
+    Token usage is only recorded in the cache. See `AuthToken.record_usage()`.
     """
-    keyword = "Token"
+    keyword               = "Token"
+    cache_timeout         = 60
+    invalid_cache_timeout = 60
+    token_fields          = ("id", "user_id", "is_active", "start_date", "end_date")
 
     def authenticate(self, request):
         """
@@ -40,16 +57,81 @@ class TokenAuthentication(BaseAuthentication):
             raise AuthenticationFailed(_("Invalid token received."))
         
         # Authenticate with the token
-        try:
-            auth_token = AuthToken.objects.get(token=token)
-        except AuthToken.DoesNotExist:
+        cache_key    = AuthToken.get_cache_key(token)
+        token_values = cache.get(cache_key)
+        user_values  = None
+
+        if token_values is None:
+            user_fields = self.get_user_fields()
+            row         = AuthToken.objects.filter(token=token).values_list(
+                *self.token_fields,
+                *[f"user__{field}" for field in user_fields],
+            ).first()
+
+            if row is None:
+                cache.set(cache_key, False, self.invalid_cache_timeout)
+                raise AuthenticationFailed(_("Invalid token received."))
+
+            token_values = row[:len(self.token_fields)]
+            user_values  = row[len(self.token_fields):]
+            cache.set(cache_key, token_values, self.cache_timeout)
+        elif token_values is False:
             raise AuthenticationFailed(_("Invalid token received."))
-        
+
+        auth_token      = self.from_values(AuthToken, self.token_fields, token_values)
+        auth_token.user = self.get_user(auth_token.user_id, user_values)
+
         if not auth_token.user.is_active:
             raise AuthenticationFailed(_("User is inactive or deleted."))
 
+        if not auth_token.is_valid():
+            raise AuthenticationFailed(_("Token is inactive or expired."))
+
+        auth_token.record_usage()
         return (auth_token.user, auth_token)
-        
+
+    @staticmethod
+    def get_user_fields() -> list[str]:
+        """
+        Names of the user fields that are cached, i.e. all concrete fields except the password.
+        """
+        return [field.attname for field in User._meta.concrete_fields if field.attname != "password"]
+
+    def get_user(self, user_id: int, user_values: tuple|None = None) -> User:
+        """
+        Get the user of a token from the cache or the database. The entry is keyed by the cache
+        version of the user, so that changes to the user are visible at once. If the values have
+        just been read together with the token, they are cached for the next requests.
+        """
+        user_fields = self.get_user_fields()
+        version     = get_cache_version(AuthToken.get_user_cache_version_name(user_id))
+        cache_key   = f"openbook_auth:auth_token_user:{user_id}:{version}"
+
+        if user_values is None:
+            user_values = cache.get(cache_key)
+
+            if user_values is None:
+                user_values = User.objects.filter(pk=user_id).values_list(*user_fields).first()
+
+                if user_values is None:
+                    raise AuthenticationFailed(_("User is inactive or deleted."))
+
+                cache.set(cache_key, user_values, self.cache_timeout)
+        else:
+            cache.set(cache_key, user_values, self.cache_timeout)
+
+        return self.from_values(User, user_fields, user_values)
+
+    @staticmethod
+    def from_values(model, field_names, values):
+        """
+        Create a model instance from the given field values, like it was loaded with `only()`.
+        The remaining fields are deferred and loaded from the database when accessed.
+        """
+        values = dict(zip(field_names, values))
+        names  = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+        return model.from_db(None, names, [values[name] for name in names])
+
     def authenticate_header(self, request):
         """
         Return string to be used as the value of the `WWW-Authenticate` header in a
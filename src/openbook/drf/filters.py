@@ -6,21 +6,20 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from rest_framework.filters import BaseFilterBackend
+from rest_framework.filters    import BaseFilterBackend
+from openbook.auth.backends    import RoleBasedObjectPermissionsBackend
 
 class DjangoObjectPermissionsFilter(BaseFilterBackend):
     """
     Filter implementation inspired by `django-rest-framework-guardian2` `ObjectPermissionsFilter`.
     Filters out all objects from a queryset for which the user has no object-level view permission.
+
+    The permission rules are evaluated by the database (see `RoleBasedObjectPermissionsBackend.filter_queryset()`),
+    so that the queryset stays lazy and pagination only fetches the objects of the current page.
     """
     def filter_queryset(self, request, queryset, view):
         app_label   = queryset.model._meta.app_label
         model_name  = queryset.model._meta.model_name
         perm_string = f"{app_label}.view_{model_name}"
-        allowed_pks = []
-
-        for obj in queryset:
-            if request.user.has_perm(perm_string, obj):
-                allowed_pks.append(obj.pk)
 
-        return queryset.model.objects.filter(pk__in=allowed_pks)
\ No newline at end of file
+        return RoleBasedObjectPermissionsBackend().filter_queryset(request.user, perm_string, queryset)
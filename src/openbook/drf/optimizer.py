@@ -0,0 +1,164 @@
+# OpenBook: Interactive Online Textbooks - Server
+# © 2025 Dennis Schulmeister-Zimolong <dennis@wpvs.de>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+from collections.abc                    import Iterable
+from dataclasses                        import dataclass
+from dataclasses                        import field
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions             import FieldDoesNotExist
+from django.db.models                   import Model
+from django.db.models                   import Prefetch
+from django.db.models                   import QuerySet
+from rest_framework.relations           import ManyRelatedField
+from rest_framework.relations           import PrimaryKeyRelatedField
+from rest_framework.relations           import RelatedField
+from rest_framework.relations           import SlugRelatedField
+from rest_framework.serializers         import BaseSerializer
+from rest_framework.serializers         import ListSerializer
+
+@dataclass
+class QuerySetPlan:
+    """
+    Fields to load and relations to join or prefetch, so that a serializer can render the
+    objects of a queryset without additional queries per object.
+    """
+    only:             list[str]          = field(default_factory=list)
+    select_related:   list[str]          = field(default_factory=list)
+    prefetch_related: list[str|Prefetch] = field(default_factory=list)
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        """
+        Apply the plan to the given queryset. Lookups that the queryset already prefetches
+        are skipped, because Django refuses to prefetch the same lookup twice.
+        """
+        prefetched       = {getattr(lookup, "prefetch_to", lookup) for lookup in queryset._prefetch_related_lookups}
+        prefetch_related = [lookup for lookup in self.prefetch_related if getattr(lookup, "prefetch_to", lookup) not in prefetched]
+
+        if self.only:
+            queryset = queryset.only(*self.only)
+
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+def optimize_queryset(queryset: QuerySet, serializer: BaseSerializer, required_fields: Iterable[str] = ()) -> QuerySet:
+    """
+    Join, prefetch and restrict the columns of the given queryset to what the serializer
+    actually renders, including nested serializers of expanded fields. Additional fields
+    that must always be loaded can be given as `required_fields`.
+    """
+    plan = get_queryset_plan(serializer, queryset.model)
+    plan.only.extend(required_fields)
+    return plan.apply(queryset)
+
+def get_queryset_plan(serializer: BaseSerializer, model: type[Model], prefix: str = "", plan: QuerySetPlan|None = None) -> QuerySetPlan:
+    """
+    Walk the fields of a serializer and collect the query plan for the given model. Relations
+    reached via `select_related()` are added to the same plan with the lookup path as prefix.
+    Relations with many objects get a `Prefetch` with their own optimized queryset.
+
+    Columns are only restricted with `only()`, if all fields of the serializer can be mapped
+    to model fields. Method fields, properties and `source="*"` may access any attribute, so
+    that all concrete fields are loaded for them.
+    """
+    plan       = plan if plan is not None else QuerySetPlan()
+    only       = {model._meta.pk.name}
+    restricted = True
+
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+
+    for serializer_field in serializer.fields.values():
+        if serializer_field.write_only:
+            continue
+
+        if not serializer_field.source_attrs:
+            restricted = False
+            continue
+
+        try:
+            model_field = model._meta.get_field(serializer_field.source_attrs[0])
+        except FieldDoesNotExist:
+            restricted = False
+            continue
+
+        if not model_field.is_relation:
+            only.add(model_field.name)
+            continue
+
+        lookup = f"{prefix}{model_field.name}"
+
+        if isinstance(model_field, GenericForeignKey):
+            only.update((model_field.ct_field, model_field.fk_field))
+            plan.prefetch_related.append(lookup)
+            continue
+
+        if model_field.concrete and not model_field.many_to_many:
+            only.add(model_field.name)
+
+        if model_field.one_to_many and not model_field.concrete:
+            remote_field = model_field.field.name
+        else:
+            remote_field = None
+
+        related_model = model_field.related_model
+        single        = model_field.many_to_one or model_field.one_to_one
+        nested        = serializer_field.child if isinstance(serializer_field, ListSerializer) else serializer_field
+
+        if isinstance(serializer_field, ManyRelatedField):
+            nested = serializer_field.child_relation
+
+        if len(serializer_field.source_attrs) > 1 or not isinstance(nested, (BaseSerializer, RelatedField)):
+            # Dotted source or custom field: Load the whole related object
+            if single:
+                plan.select_related.append(lookup)
+            else:
+                plan.prefetch_related.append(lookup)
+        elif isinstance(nested, PrimaryKeyRelatedField):
+            # Only the primary key is needed, which is the foreign key column for forward relations
+            if not single:
+                related_only = [related_model._meta.pk.name, *([remote_field] if remote_field else [])]
+                plan.prefetch_related.append(Prefetch(lookup, queryset=related_model._default_manager.only(*related_only)))
+            elif not model_field.concrete:
+                plan.select_related.append(lookup)
+        elif isinstance(nested, SlugRelatedField) and "__" not in nested.slug_field:
+            related_only = [related_model._meta.pk.name, nested.slug_field, *([remote_field] if remote_field else [])]
+
+            if single:
+                plan.select_related.append(lookup)
+                plan.only.extend(f"{lookup}__{name}" for name in related_only)
+            else:
+                plan.prefetch_related.append(Prefetch(lookup, queryset=related_model._default_manager.only(*related_only)))
+        elif isinstance(nested, BaseSerializer):
+            # Expanded field with nested serializer
+            if single:
+                plan.select_related.append(lookup)
+                get_queryset_plan(nested, related_model, f"{lookup}__", plan)
+            else:
+                nested_plan = get_queryset_plan(nested, related_model)
+
+                if remote_field:
+                    nested_plan.only.append(remote_field)
+
+                plan.prefetch_related.append(Prefetch(lookup, queryset=nested_plan.apply(related_model._default_manager.all())))
+        else:
+            # Other related field, whose representation might need any attribute
+            if single:
+                plan.select_related.append(lookup)
+            else:
+                plan.prefetch_related.append(lookup)
+
+    if not restricted:
+        only.update(model_field.name for model_field in model._meta.concrete_fields)
+
+    plan.only.extend(f"{prefix}{name}" for name in sorted(only))
+    return plan
@@ -6,13 +6,350 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from django.conf                import settings
-from rest_framework.pagination  import PageNumberPagination as DRFPageNumberPagination
+import base64, binascii, datetime, hashlib, json
+
+from django.conf                   import settings
+from django.core.serializers.json  import DjangoJSONEncoder
+from django.core.exceptions        import FieldDoesNotExist
+from django.core.exceptions        import ValidationError
+from django.db.models              import F
+from django.db.models              import Q
+from django.template               import loader
+from django.utils.translation      import gettext_lazy as _
+from rest_framework.exceptions     import NotFound
+from rest_framework.pagination     import BasePagination
+from rest_framework.pagination     import PageNumberPagination as DRFPageNumberPagination
+from rest_framework.pagination     import _positive_int
+from rest_framework.response       import Response
+from rest_framework.settings       import api_settings
+from rest_framework.utils.urls     import replace_query_param
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for the cursor values. Unlike `DjangoJSONEncoder`, times keep their microseconds,
+    since otherwise the keyset filter would compare with truncated values.
+    """
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+
+        return super().default(o)
+
+class CursorPagination(BasePagination):
+    """
+    Keyset pagination for large collections. Other than with page numbers, no `COUNT(*)` and
+    no `OFFSET` is needed, so that all pages are equally fast, no matter how deep. Instead, the
+    response contains opaque links to the next and previous page, whose cursor contains the sort
+    values of the last (or first) object of the current page.
+
+    The ordering is taken from the `OrderingFilter` (`_sort` query parameter) or the `ordering`
+    attribute of the view set, with the primary key appended as unique tiebreaker. All ordering
+    fields are compared as a whole, so that the ordering fields need not be unique. Nullable
+    fields are sorted with `NULL` as the highest value, i.e. last in ascending order and first
+    in descending order, and the keyset filter has explicit `IS NULL` branches for them.
+
+    View sets can use this class as their `pagination_class`. Otherwise clients can select it
+    with the `_pagination=cursor` query parameter of the default `PageNumberPagination`.
+    """
+    cursor_query_param          = settings.REST_FRAMEWORK.get("CURSOR_PARAM", "_cursor")
+    cursor_query_description    = _("The pagination cursor value.")
+    page_size                   = api_settings.PAGE_SIZE
+    page_size_query_param       = settings.REST_FRAMEWORK.get("PAGE_SIZE_PARAM", "_page_size")
+    page_size_query_description = _("Number of results to return per page.")
+    max_page_size               = None
+    invalid_cursor_message      = _("Invalid cursor")
+    template                    = "rest_framework/pagination/previous_and_next.html"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request   = request
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        self.ordering   = self.get_ordering(request, queryset, view)
+        self.keys       = [f"_cursor_{index}" for index in range(len(self.ordering))]
+        self.descending = [field.startswith("-") for field in self.ordering]
+        self.nullable   = [self.is_nullable(queryset.model, field.lstrip("-")) for field in self.ordering]
+        values, reverse = self.decode_cursor(request)
+
+        queryset = queryset.annotate(**{key: F(field.lstrip("-")) for key, field in zip(self.keys, self.ordering)})
+        queryset = queryset.order_by(*[
+            F(key).desc(nulls_first=True) if descending != reverse else F(key).asc(nulls_last=True)
+            for key, descending in zip(self.keys, self.descending)
+        ])
+
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (TypeError, ValueError, ValidationError):
+            # Tampered cursor with values that don't match the field types
+            raise NotFound(self.invalid_cursor_message)
+
+        has_more = len(results) > self.page_size
+        results  = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next     = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next     = has_more
+            self.has_previous = values is not None
+
+        self.next_values     = self.get_values(results[-1]) if results and self.has_next else None
+        self.previous_values = self.get_values(results[0]) if results and self.has_previous else None
+
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view) -> list[str]:
+        """
+        Get the ordering fields with a unique tiebreaker at the end.
+        """
+        ordering = None
+
+        for backend in getattr(view, "filter_backends", None) or []:
+            if hasattr(backend, "get_ordering"):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+
+        ordering = ordering or getattr(view, "ordering", None) or queryset.query.order_by or queryset.model._meta.ordering or []
+        ordering = [field for field in ordering if isinstance(field, str) and field != "?"]
+        pk_names = ("pk", queryset.model._meta.pk.name)
+
+        if not any(field.lstrip("-") in pk_names for field in ordering):
+            ordering.append("-pk" if ordering and ordering[0].startswith("-") else "pk")
+
+        return ordering
+
+    @staticmethod
+    def is_nullable(model, field: str) -> bool:
+        """
+        Check whether the given ordering field can be `NULL`, either because the field itself is
+        nullable or because it is reached via a nullable or reverse relation. Unknown fields like
+        annotations are assumed to be nullable.
+        """
+        if field == "pk":
+            return False
+
+        try:
+            for name in field.split("__"):
+                model_field = model._meta.get_field(name)
+
+                if model_field.null or (model_field.is_relation and not model_field.concrete):
+                    return True
+
+                model = model_field.related_model
+        except (FieldDoesNotExist, AttributeError):
+            return True
+
+        return False
+
+    def get_keyset_filter(self, values: list, reverse: bool) -> Q:
+        """
+        Get the filter condition for all objects after (or before) the given sort values:
+        `(a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) …`
+
+        For nullable fields `NULL` counts as highest value: In ascending direction `a > x` also
+        matches `NULL`, and after `NULL` no other value follows. In descending direction all
+        non-`NULL` values follow `NULL`.
+        """
+        condition = Q()
+        equal     = Q()
+
+        for index, key in enumerate(self.keys):
+            value      = values[index]
+            descending = self.descending[index] != reverse
+
+            if value is None:
+                after = Q(**{f"{key}__isnull": False}) if descending else Q(pk__in=[])
+            elif descending:
+                after = Q(**{f"{key}__lt": value})
+            elif self.nullable[index]:
+                after = Q(**{f"{key}__gt": value}) | Q(**{f"{key}__isnull": True})
+            else:
+                after = Q(**{f"{key}__gt": value})
+
+            condition |= equal & after
+            equal     &= Q(**{f"{key}__isnull": True}) if value is None else Q(**{key: value})
+
+        return condition
+
+    def get_values(self, obj) -> list:
+        """
+        Get the sort values of an object for the cursor.
+        """
+        return [getattr(obj, key) for key in self.keys]
+
+    def get_ordering_hash(self) -> str:
+        """
+        Short hash of the ordering fields. It is part of the cursor, so that a cursor cannot be
+        used with a different ordering, whose keyset filter would skip or repeat objects.
+        """
+        return hashlib.sha256(",".join(self.ordering).encode()).hexdigest()[:16]
+
+    def decode_cursor(self, request) -> tuple[list|None, bool]:
+        """
+        Get the sort values and direction from the cursor query parameter. Cursors created
+        for another ordering are rejected.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return (None, False)
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values = cursor["v"]
+
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError()
+
+            if cursor.get("o") != self.get_ordering_hash():
+                raise ValueError()
+
+            return (values, bool(cursor.get("r", False)))
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values: list, reverse: bool) -> str:
+        """
+        Get the URL of the current request with the given cursor.
+        """
+        cursor  = {"v": values, "r": reverse, "o": self.get_ordering_hash()}
+        cursor  = json.dumps(cursor, cls=CursorJSONEncoder, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> str|None:
+        return self.encode_cursor(self.next_values, False) if self.next_values is not None else None
+
+    def get_previous_link(self) -> str|None:
+        return self.encode_cursor(self.previous_values, True) if self.previous_values is not None else None
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next":     self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results":  data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next":     {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results":  schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [{
+            "name":        self.cursor_query_param,
+            "required":    False,
+            "in":          "query",
+            "description": str(self.cursor_query_description),
+            "schema":      {"type": "string"},
+        }]
+
+        if self.page_size_query_param:
+            parameters.append({
+                "name":        self.page_size_query_param,
+                "required":    False,
+                "in":          "query",
+                "description": str(self.page_size_query_description),
+                "schema":      {"type": "integer"},
+            })
+
+        return parameters
+
+    def get_html_context(self):
+        return {
+            "previous_url": self.get_previous_link(),
+            "next_url":     self.get_next_link(),
+        }
+
+    def to_html(self):
+        return loader.get_template(self.template).render(self.get_html_context())
 
 class PageNumberPagination(DRFPageNumberPagination):
     """
     Custom pagination class that allows changing the query parameters used for pagination
     in the Django config, following the same style the DRF uses for the filter backends.
+
+    For large collections clients can switch to the `CursorPagination` with the `_pagination=cursor`
+    query parameter, to avoid the `COUNT(*)` and the slow `OFFSET` of deep pages. The response
+    then contains no `count`, and the next and previous links contain a `_cursor` parameter.
     """
-    page_query_param      = settings.REST_FRAMEWORK.get("PAGE_PARAM", "_page")
-    page_size_query_param = settings.REST_FRAMEWORK.get("PAGE_SIZE_PARAM", "_page_size")
\ No newline at end of file
+    page_query_param        = settings.REST_FRAMEWORK.get("PAGE_PARAM", "_page")
+    page_size_query_param   = settings.REST_FRAMEWORK.get("PAGE_SIZE_PARAM", "_page_size")
+    pagination_query_param  = settings.REST_FRAMEWORK.get("PAGINATION_PARAM", "_pagination")
+    cursor_pagination_class = CursorPagination
+    cursor_pagination       = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.pagination_query_param) == "cursor" \
+        or self.cursor_pagination_class.cursor_query_param in request.query_params:
+            self.cursor_pagination     = self.cursor_pagination_class()
+            results                    = self.cursor_pagination.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_pagination.display_page_controls
+            return results
+
+        self.cursor_pagination = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination:
+            return self.cursor_pagination.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["required"] = ["results"]
+        response_schema["properties"]["count"]["description"] = "Total number of results, missing with cursor pagination"
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name":        self.pagination_query_param,
+                "required":    False,
+                "in":          "query",
+                "description": "Pagination mode: Page numbers (default) or cursor for large collections",
+                "schema":      {"type": "string", "enum": ["page", "cursor"]},
+            },
+            *[
+                parameter for parameter in self.cursor_pagination_class().get_schema_operation_parameters(view)
+                if parameter["name"] == self.cursor_pagination_class.cursor_query_param
+            ],
+        ]
+
+    def get_html_context(self):
+        if self.cursor_pagination:
+            return self.cursor_pagination.get_html_context()
+
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.cursor_pagination:
+            return self.cursor_pagination.to_html()
+
+        return super().to_html()
@@ -6,8 +6,18 @@
 # published by the Free Software Foundation, either version 3 of the
 # License, or (at your option) any later version.
 
-from django.test import TestCase
-from django.urls import reverse
+import asyncio
+
+from django.core.cache                         import cache
+from django.db                                 import connection
+from django.test                               import TestCase
+from django.test                               import TransactionTestCase
+from django.test.utils                         import CaptureQueriesContext
+from django.urls                               import reverse
+
+from openbook.auth.models.anonymous_permission import AnonymousPermission
+from openbook.auth.utils                       import permission_for_perm_string
+from openbook.core.models.language             import Language
 
 class APISchemaTestCase(TestCase):
     def test_get_schema(self):
@@ -16,3 +26,98 @@ class APISchemaTestCase(TestCase):
         """
         response = self.client.get(reverse("api-schema"))
         self.assertEqual(response.status_code, 200)
+
+class CursorPaginationTestCase(TestCase):
+    def setUp(self):
+        AnonymousPermission.objects.create(permission=permission_for_perm_string("openbook_core.view_language"))
+
+        for language, name in (("aa", "B"), ("bb", "A"), ("cc", "B"), ("dd", "C"), ("ee", "A"), ("ff", "B"), ("gg", "C")):
+            Language.objects.create(language=language, name=name)
+
+        self.url = reverse("language-list")
+
+    def get_all_pages(self, url: str, link: str = "next") -> list[list[str]]:
+        """
+        Follow the next (or previous) links and return the primary keys of each page.
+        """
+        pages = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.json())
+
+            pages.append([obj["language"] for obj in response.json()["results"]])
+            url = response.json()[link]
+
+        return pages
+
+    def test_forward_and_backward(self):
+        """
+        All objects should be returned once in the requested order, when the next links are followed
+        and the same pages again, when the previous links are followed from the last page.
+        """
+        pages = self.get_all_pages(f"{self.url}?_pagination=cursor&_page_size=3&_sort=name")
+        self.assertEqual(pages, [["bb", "ee", "aa"], ["cc", "ff", "dd"], ["gg"]])
+
+        response = self.client.get(f"{self.url}?_pagination=cursor&_page_size=3&_sort=name")
+        response = self.client.get(self.client.get(response.json()["next"]).json()["next"])
+        self.assertIsNone(response.json()["next"])
+
+        pages = self.get_all_pages(response.json()["previous"], "previous")
+        self.assertEqual(pages, [["cc", "ff", "dd"], ["bb", "ee", "aa"]])
+
+    def test_descending(self):
+        """
+        Descending sort orders should be supported, too.
+        """
+        pages = self.get_all_pages(f"{self.url}?_pagination=cursor&_page_size=4&_sort=-name")
+        self.assertEqual(pages, [["gg", "dd", "ff", "cc"], ["aa", "ee", "bb"]])
+
+    def test_no_count(self):
+        """
+        Cursor pagination must not count the objects.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"{self.url}?_pagination=cursor&_page_size=3")
+            self.assertEqual(response.status_code, 200)
+
+        self.assertFalse([query for query in context.captured_queries if "COUNT(" in query["sql"].upper()])
+
+    def test_page_number_default(self):
+        """
+        Page numbers should remain the default pagination mode.
+        """
+        response = self.client.get(f"{self.url}?_page_size=3&_page=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 7)
+        self.assertEqual([obj["language"] for obj in response.json()["results"]], ["gg"])
+
+    def test_invalid_cursor(self):
+        """
+        Invalid cursors should result in a 404 error.
+        """
+        for cursor in ("invalid", "eyJ2IjpbXX0=", "W10="):
+            response = self.client.get(f"{self.url}?_cursor={cursor}")
+            self.assertEqual(response.status_code, 404)
+
+class ASGITestCase(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        AnonymousPermission.objects.create(permission=permission_for_perm_string("openbook_core.view_language"))
+        Language.objects.create(language="en", name="English")
+        Language.objects.create(language="de", name="Deutsch")
+
+    async def test_concurrent_requests(self):
+        """
+        Concurrent requests via ASGI must be handled correctly with the async middlewares.
+        """
+        url       = reverse("language-list")
+        responses = await asyncio.gather(*[self.async_client.get(url) for i in range(4)])
+
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["count"], 2)
+
+        response = await self.async_client.get(reverse("api-schema"))
+        self.assertEqual(response.status_code, 200)
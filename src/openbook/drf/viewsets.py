@@ -10,12 +10,14 @@ from collections                      import defaultdict
 from drf_spectacular.utils            import extend_schema
 from drf_spectacular.types            import OpenApiTypes
 from drf_spectacular.utils            import OpenApiParameter
-from rest_flex_fields.filter_backends import FlexFieldsFilterBackend
+from rest_flex_fields.filter_backends import FlexFieldsDocsFilterBackend
 from rest_framework                   import status
 from rest_framework.permissions       import AllowAny
 from rest_framework.response          import Response
 from rest_framework.settings          import api_settings
 
+from .optimizer                       import optimize_queryset
+
 class ModelViewSetMixin:
     """
     Ensure that object permissions are also checked when creating new model instances.
@@ -30,10 +32,39 @@ class ModelViewSetMixin:
     class MyViewSet(ModelViewSetMixin, ModelViewSet):
         pass
     ```
+
+    Additionally, the queryset of the `list` and `retrieve` actions is optimized for the fields
+    requested with `_fields`, `_omit` and `_expand`, including nested expansions, so that the
+    number of queries doesn't grow with the number of objects. See `optimize_queryset()`.
     """
 
-    # Add FlexFieldsFilterBackend here to avoid circular import when doing in settings.py
-    filter_backends = (FlexFieldsFilterBackend, *api_settings.DEFAULT_FILTER_BACKENDS)
+    # Add FlexFieldsDocsFilterBackend here to avoid circular import when doing in settings.py.
+    # Only for the OpenAPI schema, as the queryset is optimized in `get_queryset()`.
+    filter_backends = (FlexFieldsDocsFilterBackend, *api_settings.DEFAULT_FILTER_BACKENDS)
+
+    # Optimized actions and fields that must always be loaded, e.g. for permission checks
+    optimized_actions     = ("list", "retrieve")
+    required_query_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if getattr(self, "swagger_fake_view", False) or getattr(self, "action", None) not in self.optimized_actions:
+            return queryset
+
+        return self.optimize_queryset(queryset)
+
+    def optimize_queryset(self, queryset):
+        """
+        Apply `select_related()`, `prefetch_related()` and `only()` to the queryset to match
+        the fields that the serializer will render for the current request.
+        """
+        serializer = self.get_serializer()
+
+        if hasattr(serializer, "apply_flex_fields"):
+            serializer.apply_flex_fields(serializer.fields, serializer._flex_options_rep_only)
+
+        return optimize_queryset(queryset, serializer, self.required_query_fields)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -102,6 +102,7 @@ MIDDLEWARE = [
 
     # OpenBook
     "openbook.auth.middleware.current_user.CurrentUserMiddleware",
+    "openbook.auth.middleware.permission_memo.PermissionMemoMiddleware",
     "openbook.core.middleware.current_language.CurrentLanguageMiddleware",
 ]
 
@@ -153,6 +154,16 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Cache for permissions, tokens and usage data
+# NOTE: The local memory cache is not shared between processes. In production a shared cache
+# must be configured in `local_settings.py`, as the management commands `flush_auth_token_usage`
+# and `deactivate_expired` otherwise cannot reach the data cached by the web server.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
 # Django REST framework
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -189,6 +200,8 @@ REST_FRAMEWORK = {
     "ORDERING_PARAM": "_sort",
     "PAGE_PARAM": "_page",
     "PAGE_SIZE_PARAM": "_page_size",
+    "PAGINATION_PARAM": "_pagination",
+    "CURSOR_PARAM": "_cursor",
 }
 
 # See: https://drf-spectacular.readthedocs.io/
@@ -14,6 +14,7 @@ import typing
 from collections.abc                           import Iterable
 from django.contrib.auth                       import get_user_model
 from django.contrib.auth.models                import AbstractUser
+from django.core.cache                         import cache
 from django.db.models.manager                  import Manager
 from django.db.models                          import Model
 from django.db.models                          import Manager
@@ -616,6 +617,9 @@ class ModelViewSetTestMixin:
         super().setUp()
         self.client = APIClient()
         reset_current_user()
+
+        # Cached permissions survive the rollback of the previous test's database changes
+        cache.clear()
     
     def login(self, username: str = None, password: str = None):
         """